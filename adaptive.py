@@ -0,0 +1,291 @@
+"""Adaptive question selection with Elo-style skill ratings.
+
+Every player and every question carries a rating on the Elo scale. A player
+rated ``p`` answers a question rated ``q`` correctly with expected
+probability ``1 / (1 + 10 ** ((q - p) / 400))``; after each answer both
+ratings move by ``K * (outcome - expected)`` in opposite directions, so
+questions that strong players miss drift up and easy ones drift down.
+
+The next question is the unasked one whose rating is nearest a target chosen
+so the player is expected to succeed ``target_success`` of the time.
+Questions are kept in one ``RatingIndex`` per category: integer rating slots
+with a Fenwick tree of slot counts, so finding the nearest rating and moving
+a question after a rating change both cost O(log R) for R rating slots,
+however many questions there are.
+
+Ratings are saved in ``ratings.json`` (players by name, questions by id)
+with an append-only journal of rating changes.
+"""
+import math
+import random
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from question_store import QuestionStore
+from storage import JSONFileStore
+
+DEFAULT_RATINGS_FILE = 'ratings.json'
+INITIAL_RATING = 1500.0
+# Starting question ratings by the difficulty bucket a question was filed in.
+DIFFICULTY_RATINGS = {"easy": 1300.0, "medium": 1500.0, "hard": 1700.0}
+MIN_RATING = 0
+MAX_RATING = 4000
+
+
+def expected_score(player: float, question: float) -> float:
+    """Probability that ``player`` answers a ``question``-rated question correctly."""
+    return 1.0 / (1.0 + 10.0 ** ((question - player) / 400.0))
+
+
+def replay_ratings(data: Dict, entries: Iterable[Dict]):
+    """Apply rating-change entries; each one sets absolute ratings."""
+    players = data.setdefault("players", {})
+    questions = data.setdefault("questions", {})
+    for entry in entries:
+        players[entry["player"]] = entry["rating"]
+        questions[entry["question"]] = entry["question_rating"]
+
+
+def open_ratings(path: str = DEFAULT_RATINGS_FILE) -> JSONFileStore:
+    return JSONFileStore(path, indent=None, replay=replay_ratings)
+
+
+class RatingIndex:
+    """Members ``first .. first + size - 1`` bucketed by integer rating."""
+
+    def __init__(self, first: int, size: int, low: int = MIN_RATING, high: int = MAX_RATING):
+        self.first = first
+        self.low = low
+        self.slots = high - low + 1
+        self._tree = [0] * (self.slots + 1)
+        self._members: List[List[int]] = [[] for _ in range(self.slots)]
+        # Slot and position within the slot per member; -1 when absent.
+        self._slot_of = array("l", [-1]) * size
+        self._pos_of = array("l", [0]) * size
+        self.total = 0
+
+    def _slot(self, rating: float) -> int:
+        return min(max(int(round(rating)) - self.low, 0), self.slots - 1)
+
+    def _add(self, slot: int, delta: int):
+        i = slot + 1
+        while i <= self.slots:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, slot: int) -> int:
+        """Number of members in slots ``0 .. slot``."""
+        total = 0
+        i = slot + 1
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _kth(self, k: int) -> int:
+        """Slot holding the ``k``-th member (1-based) in rating order."""
+        position = 0
+        step = 1 << self.slots.bit_length()
+        while step:
+            following = position + step
+            if following <= self.slots and self._tree[following] < k:
+                position = following
+                k -= self._tree[following]
+            step >>= 1
+        return position
+
+    def load(self, ratings: Iterable[float]):
+        """Insert members ``first, first + 1, ...`` with ``ratings`` in O(n + R)."""
+        for offset, rating in enumerate(ratings):
+            slot = self._slot(rating)
+            members = self._members[slot]
+            self._slot_of[offset] = slot
+            self._pos_of[offset] = len(members)
+            members.append(self.first + offset)
+        # Build the Fenwick tree from the slot counts in one pass.
+        tree = self._tree
+        for i in range(1, self.slots + 1):
+            tree[i] += len(self._members[i - 1])
+            parent = i + (i & -i)
+            if parent <= self.slots:
+                tree[parent] += tree[i]
+        self.total = sum(len(members) for members in self._members)
+
+    def insert(self, member: int, rating: float):
+        slot = self._slot(rating)
+        members = self._members[slot]
+        self._slot_of[member - self.first] = slot
+        self._pos_of[member - self.first] = len(members)
+        members.append(member)
+        self._add(slot, 1)
+        self.total += 1
+
+    def remove(self, member: int):
+        offset = member - self.first
+        slot = self._slot_of[offset]
+        if slot < 0:
+            return
+        members = self._members[slot]
+        position = self._pos_of[offset]
+        last = members.pop()
+        if last != member:
+            members[position] = last
+            self._pos_of[last - self.first] = position
+        self._slot_of[offset] = -1
+        self._add(slot, -1)
+        self.total -= 1
+
+    def move(self, member: int, rating: float):
+        """Re-file ``member`` under a new rating."""
+        if self._slot_of[member - self.first] != self._slot(rating):
+            self.remove(member)
+            self.insert(member, rating)
+
+    def _pick(self, slot: int, exclude, rng) -> Optional[int]:
+        """A random member of ``slot`` not in ``exclude``."""
+        members = self._members[slot]
+        start = rng.randrange(len(members))
+        for i in range(len(members)):
+            member = members[(start + i) % len(members)]
+            if member not in exclude:
+                return member
+        return None
+
+    def nearest(self, rating: float, exclude=(), rng=random) -> Optional[Tuple[int, int]]:
+        """Return ``(member, distance)`` for the member rated nearest ``rating``.
+
+        Walks outward one occupied slot at a time, so members in ``exclude``
+        cost at most one extra step per slot they fill.
+        """
+        target = self._slot(rating)
+        below = self._prefix(target)
+        down, up = below, below + 1
+        while down >= 1 or up <= self.total:
+            down_slot = self._kth(down) if down >= 1 else None
+            up_slot = self._kth(up) if up <= self.total else None
+            if up_slot is None or (down_slot is not None and target - down_slot <= up_slot - target):
+                slot = down_slot
+                down -= len(self._members[slot])
+            else:
+                slot = up_slot
+                up += len(self._members[slot])
+            member = self._pick(slot, exclude, rng)
+            if member is not None:
+                return member, abs(slot - target)
+        return None
+
+
+class AdaptiveEngine:
+    """Player and question ratings plus per-category rating indexes."""
+
+    def __init__(self, store: QuestionStore, path: Optional[str] = DEFAULT_RATINGS_FILE,
+                 k_player: float = 32.0, k_question: float = 16.0, target_success: float = 0.7):
+        self.store = store
+        self.k_player = k_player
+        self.k_question = k_question
+        # Rating gap at which the player is expected to succeed target_success of the time.
+        self.offset = 400.0 * math.log10(target_success / (1.0 - target_success))
+        self.ratings = open_ratings(path) if path else None
+        # Rating changes not yet journaled; the server flushes from a worker thread.
+        self._pending: List[Dict] = []
+        self._pending_lock = threading.Lock()
+
+        saved = {"players": {}, "questions": {}}
+        if self.ratings is not None:
+            saved, _ = self.ratings.read(default=saved)
+        self.players: Dict[str, float] = dict(saved.get("players", {}))
+
+        self.question_ratings = array("d", bytes(8 * len(store)))
+        for index in range(len(store)):
+            self.question_ratings[index] = DIFFICULTY_RATINGS.get(store.answer_key(index)[1],
+                                                                  INITIAL_RATING)
+        for key, rating in saved.get("questions", {}).items():
+            index = store.find(key)
+            if index is not None:
+                self.question_ratings[index] = rating
+
+        self.indexes: Dict[str, RatingIndex] = {}
+        for category in store.categories():
+            first, end = store.category_range(category)
+            self.indexes[category] = RatingIndex(first, end - first)
+            self.indexes[category].load(self.question_ratings[first:end])
+
+    def player_rating(self, player: str) -> float:
+        return self.players.get(player, INITIAL_RATING)
+
+    def pick(self, player: str, category: Optional[str] = None, exclude=(),
+             rng=random) -> Optional[int]:
+        """Bank position of the best next question, or None if none are left."""
+        target = self.player_rating(player) - self.offset
+        indexes = [self.indexes[category]] if category is not None else self.indexes.values()
+        best = None
+        for index in indexes:
+            found = index.nearest(target, exclude, rng)
+            if found is not None and (best is None or found[1] < best[1]):
+                best = found
+        return best[0] if best is not None else None
+
+    def record(self, player: str, position: int, correct: bool) -> Tuple[float, float]:
+        """Update both ratings after an answer; return the new ``(player, question)`` ratings."""
+        player_rating = self.player_rating(player)
+        question_rating = self.question_ratings[position]
+        surprise = (1.0 if correct else 0.0) - expected_score(player_rating, question_rating)
+        player_rating += self.k_player * surprise
+        question_rating -= self.k_question * surprise
+
+        self.players[player] = player_rating
+        self.question_ratings[position] = question_rating
+        category = self.store.location(position)[0]
+        self.indexes[category].move(position, question_rating)
+        entry = {"player": player, "rating": player_rating,
+                 "question": self.store.question_id(position),
+                 "question_rating": question_rating}
+        with self._pending_lock:
+            self._pending.append(entry)
+        return player_rating, question_rating
+
+    def flush(self):
+        """Journal the rating changes recorded since the last flush."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if pending and self.ratings is not None:
+            _, journal_size = self.ratings.append_many(pending)
+            if journal_size >= 1 << 20:
+                self.ratings.compact(default={"players": {}, "questions": {}})
+
+    def quiz(self, player: str, category: Optional[str] = None,
+             rng=random) -> "AdaptiveQuiz":
+        return AdaptiveQuiz(self, player, category, rng)
+
+
+class AdaptiveQuiz:
+    """Hands out one question at a time for a ``QuizSession`` picker."""
+
+    def __init__(self, engine: AdaptiveEngine, player: str, category: Optional[str], rng=random):
+        self.engine = engine
+        self.player = player
+        self.category = category
+        self.rng = rng
+        self.asked: set = set()
+        self.current: Optional[int] = None
+        self.start_rating = engine.player_rating(player)
+
+    def next(self) -> Optional[Dict]:
+        """Pick the next question, or None when the selection is exhausted."""
+        self.current = self.engine.pick(self.player, self.category, self.asked, self.rng)
+        if self.current is None:
+            return None
+        self.asked.add(self.current)
+        return self.engine.store.quiz_question(self.current)
+
+    def record(self, question: Dict, correct: bool):
+        if self.current is not None:
+            self.engine.record(self.player, self.current, correct)
+
+    @property
+    def rating(self) -> float:
+        return self.engine.player_rating(self.player)
+
+    def summary(self) -> str:
+        return f"Skill Rating: {self.start_rating:.0f} → {self.rating:.0f}"
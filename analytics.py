@@ -0,0 +1,404 @@
+"""Vectorized analytics over score history and recorded answers.
+
+Score history (``high_scores.log``) and answer streams (the JSONL/CSV format
+read by ``batch_scoring.py``) are loaded once into NumPy arrays; every
+statistic after that is a handful of array operations rather than a Python
+loop per record.
+
+Parsing JSON is what costs time (a few hundred thousand lines a second), so
+the parsed columns are kept in ``<file>.columns.npz`` with the byte offset
+they cover. The logs only grow: the next load maps the cache and parses
+only the lines appended since, and a file that was rewritten is noticed by
+a hash of the bytes before that offset and parsed afresh.
+
+Requires NumPy (``pip install numpy``).
+
+Usage: python analytics.py [--scores high_scores.log] [--answers answers.jsonl] [--json]
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+import zipfile
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from batch_scoring import iter_jsonl, parse_choice
+from question_store import QuestionStore
+from quiz_session import GRADES, POINTS
+from storage import atomic_write
+
+PERCENTILES = [10, 25, 50, 75, 90, 99]
+COLUMNS_VERSION = 1
+_CHUNK_BYTES = 1 << 24
+_TAIL_BYTES = 4096
+# Grade thresholds in ascending order for np.searchsorted.
+_GRADE_FLOORS = [minimum for minimum, _, _ in reversed(GRADES)]
+_GRADE_NAMES = [grade for _, grade, _ in reversed(GRADES)]
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("analytics requires NumPy: pip install numpy")
+
+
+class _Codes:
+    """Assigns small integer codes to repeated strings."""
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: List[str] = list(names)
+        # Built on the first ``encode``: a load served from the cache never needs it.
+        self.codes: Optional[Dict[str, int]] = None
+
+    def encode(self, values: List) -> "np.ndarray":
+        """Codes of ``values`` (as strings) as an int32 array.
+
+        The chunk's distinct values are found with one ``np.unique``, so only
+        those go through the dict; new values get codes in sorted order.
+        """
+        uniques, inverse = np.unique(np.array(values, dtype=str), return_inverse=True)
+        if self.codes is None:
+            self.codes = {name: code for code, name in enumerate(self.names)}
+        codes = self.codes
+        lookup = np.fromiter((codes.setdefault(value, len(codes)) for value in uniques.tolist()),
+                             dtype=np.int32, count=len(uniques))
+        if len(codes) > len(self.names):
+            self.names.extend(islice(codes, len(self.names), None))
+        return lookup[inverse.reshape(-1)]
+
+
+def columns_path(path: str) -> str:
+    return f"{path}.columns.npz"
+
+
+def _tail_hash(f, offset: int) -> str:
+    """Hash of the bytes just before ``offset``, to tell an appended log from a rewritten one."""
+    start = max(0, offset - _TAIL_BYTES)
+    f.seek(start)
+    return hashlib.blake2b(f.read(offset - start), digest_size=16).hexdigest()
+
+
+def _load_columns(path: str, kind: str) -> Tuple[Dict, int]:
+    """Columns cached for the start of ``path`` and the offset they cover, or ``({}, 0)``."""
+    try:
+        with np.load(columns_path(path), allow_pickle=False) as data:
+            columns = {name: data[name] for name in data.files}
+        meta = json.loads(str(columns.pop('meta')))
+        if meta.get('version') != COLUMNS_VERSION or meta.get('kind') != kind:
+            return {}, 0
+        offset = meta['offset']
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < offset or _tail_hash(f, offset) != meta['tail']:
+                return {}, 0
+        return columns, offset
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return {}, 0
+
+
+def _save_columns(path: str, kind: str, columns: Dict, offset: int):
+    with open(path, 'rb') as f:
+        tail = _tail_hash(f, offset)
+    meta = np.array(json.dumps({'version': COLUMNS_VERSION, 'kind': kind, 'offset': offset, 'tail': tail}))
+    try:
+        atomic_write(columns_path(path), lambda f: np.savez(f, meta=meta, **columns), mode='wb')
+    except OSError:
+        pass  # the cache only saves time; analysis goes on without it
+
+
+def _row_chunks(path: str, offset: int) -> Iterator[Tuple[List[Dict], int]]:
+    """Parse the complete lines after byte ``offset`` a chunk at a time.
+
+    Yields each chunk's rows with the offset just past it. A last line
+    without its newline is a write still in progress and is left for the
+    next run.
+    """
+    is_csv = path.endswith('.csv')
+    with open(path, 'rb') as f:
+        header = f.readline() if is_csv else b''
+        fieldnames = next(csv.reader([header.decode('utf-8')]), None) if is_csv else None
+        offset = max(offset, len(header))
+        f.seek(offset)
+        pending = b''
+        while True:
+            block = f.read(_CHUNK_BYTES)
+            data = pending + block
+            end = data.rfind(b'\n') + 1
+            if not block or end:
+                pending = data[end:]
+                text = data[:end].decode('utf-8')
+                if is_csv:
+                    rows = list(csv.DictReader(io.StringIO(text), fieldnames=fieldnames))
+                else:
+                    rows = list(iter_jsonl(io.StringIO(text)))
+                offset += end
+                yield rows, offset
+            else:
+                pending = data
+            if not block:
+                return
+
+
+def _concatenate(parts: List, dtype):
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+
+
+def _choices(rows: List[Dict]) -> "np.ndarray":
+    choices = [row['choice'] for row in rows]
+    if not all(type(choice) is int for choice in choices):
+        choices = [parse_choice(choice) for choice in choices]
+    return np.array(choices, dtype=np.int32).reshape(-1)
+
+
+class ScoreHistory:
+    """Finished games as parallel NumPy arrays.
+
+    Columns parsed from the log are cached in ``<log>.columns.npz``; since
+    the log only grows, later loads read the cache and parse just the lines
+    appended since.
+    """
+
+    def __init__(self, log_path: str = 'high_scores.log'):
+        _require_numpy()
+        exists = os.path.exists(log_path)
+        cached, offset = _load_columns(log_path, 'scores') if exists else ({}, 0)
+        categories = _Codes(cached['categories'].tolist() if cached else [])
+        difficulties = _Codes(cached['difficulties'].tolist() if cached else [])
+        columns = {'category': [], 'difficulty': [], 'score': [], 'accuracy': []}
+        for name, parts in columns.items():
+            if cached:
+                parts.append(cached[name])
+        end = offset
+        for rows, end in (_row_chunks(log_path, offset) if exists else ()):
+            columns['category'].append(categories.encode([row.get('category') for row in rows]))
+            columns['difficulty'].append(difficulties.encode([row.get('difficulty') for row in rows]))
+            for name in ('score', 'accuracy'):
+                columns[name].append(np.array([row.get(name, 0) for row in rows], dtype=np.float64))
+        columns = {name: _concatenate(parts, np.int32 if name in ('category', 'difficulty') else np.float64)
+                   for name, parts in columns.items()}
+        if end != offset:
+            _save_columns(log_path, 'scores', {
+                **columns,
+                'categories': np.array(categories.names, dtype=str),
+                'difficulties': np.array(difficulties.names, dtype=str),
+            }, end)
+
+        self.categories = categories.names
+        self.difficulties = difficulties.names
+        self.category = columns['category']
+        self.difficulty = columns['difficulty']
+        self.score = columns['score']
+        self.accuracy = columns['accuracy']
+
+    def __len__(self) -> int:
+        return len(self.score)
+
+
+class AnswerLog:
+    """Recorded answers resolved against the question bank.
+
+    Parsed columns are cached in ``<path>.columns.npz`` like the score
+    history's; resolving against the bank is redone on every load.
+    """
+
+    def __init__(self, path: str, store: QuestionStore):
+        _require_numpy()
+        cached, offset = _load_columns(path, 'answers')
+        sessions = _Codes(cached['sessions'].tolist() if cached else [])
+        question_ids = _Codes(cached['question_ids'].tolist() if cached else [])
+        session_parts = [cached['session']] if cached else []
+        question_parts = [cached['question']] if cached else []
+        choice_parts = [cached['choice']] if cached else []
+        end = offset
+        for rows, end in _row_chunks(path, offset):
+            session_parts.append(sessions.encode([row['session'] for row in rows]))
+            question_parts.append(question_ids.encode([row['question_id'] for row in rows]))
+            choice_parts.append(_choices(rows))
+        session_codes = _concatenate(session_parts, np.int32)
+        codes = _concatenate(question_parts, np.int32)
+        choices = _concatenate(choice_parts, np.int32)
+        if end != offset:
+            _save_columns(path, 'answers', {
+                'session': session_codes, 'question': codes, 'choice': choices,
+                'sessions': np.array(sessions.names, dtype=str),
+                'question_ids': np.array(question_ids.names, dtype=str),
+            }, end)
+
+        # Resolve each distinct question once, then broadcast to every answer.
+        index = np.full(len(question_ids.names), -1, dtype=np.int64)
+        correct = np.full(len(question_ids.names), -1, dtype=np.int32)
+        points = np.zeros(len(question_ids.names), dtype=np.int16)
+        for code, question_id in enumerate(question_ids.names):
+            position = store.find(question_id)
+            if position is not None:
+                answer, difficulty = store.answer_key(position)
+                index[code], correct[code] = position, answer
+                points[code] = POINTS.get(difficulty, 2)
+
+        self.sessions = sessions.names
+        self.session = session_codes
+        self.question = index[codes]
+        self.known = self.question >= 0
+        self.correct = (choices == correct[codes]) & self.known
+        self.points = np.where(self.correct, points[codes], 0)
+
+    def __len__(self) -> int:
+        return len(self.session)
+
+
+def grade_histogram(accuracy) -> Dict[str, int]:
+    """Count games per grade band."""
+    _require_numpy()
+    bands = np.searchsorted(_GRADE_FLOORS, accuracy, side='right') - 1
+    counts = np.bincount(np.clip(bands, 0, len(_GRADE_NAMES) - 1), minlength=len(_GRADE_NAMES))
+    return {name: int(count) for name, count in zip(reversed(_GRADE_NAMES), counts[::-1])}
+
+
+def distribution_by_group(values, groups, names: List[str]) -> Dict[str, Dict]:
+    """Mean, percentiles and grade histogram of ``values`` per group code."""
+    _require_numpy()
+    order = np.argsort(groups, kind='stable')
+    sorted_values = values[order]
+    bounds = np.searchsorted(groups[order], np.arange(len(names) + 1))
+    report = {}
+    for code, name in enumerate(names):
+        chunk = sorted_values[bounds[code]:bounds[code + 1]]
+        if not len(chunk):
+            continue
+        report[name] = {
+            'games': int(len(chunk)),
+            'mean': float(chunk.mean()),
+            'percentiles': dict(zip(map(str, PERCENTILES),
+                                    np.percentile(chunk, PERCENTILES).round(2).tolist())),
+            'grades': grade_histogram(chunk),
+        }
+    return report
+
+
+def question_difficulty(answers: AnswerLog, num_questions: int, prior: float = 1.0):
+    """Estimate per-question difficulty from recorded answers.
+
+    Returns ``(attempts, accuracy, difficulty)`` arrays indexed by bank
+    position. ``difficulty`` is the log-odds of a wrong answer with a
+    ``prior`` pseudo-count on each side, so rarely answered questions stay
+    near zero instead of swinging to the extremes.
+    """
+    _require_numpy()
+    known = answers.question[answers.known]
+    attempts = np.bincount(known, minlength=num_questions)
+    right = np.bincount(known, weights=answers.correct[answers.known], minlength=num_questions)
+    wrong = attempts - right
+    with np.errstate(invalid='ignore', divide='ignore'):
+        accuracy = np.where(attempts > 0, right / attempts, np.nan)
+    difficulty = np.log((wrong + prior) / (right + prior))
+    return attempts, accuracy, difficulty
+
+
+def session_results(answers: AnswerLog):
+    """Per-session answers, correct answers, score and accuracy."""
+    _require_numpy()
+    sessions = len(answers.sessions)
+    totals = np.bincount(answers.session, weights=answers.known, minlength=sessions)
+    correct = np.bincount(answers.session, weights=answers.correct, minlength=sessions)
+    score = np.bincount(answers.session, weights=answers.points, minlength=sessions)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        accuracy = np.where(totals > 0, correct / totals * 100, 0.0)
+    return totals, correct, score, accuracy
+
+
+def build_report(history: Optional[ScoreHistory], answers: Optional[AnswerLog],
+                 store: Optional[QuestionStore], hardest: int = 10) -> Dict:
+    """Collect every statistic into one JSON-serializable report."""
+    report: Dict = {}
+    if history is not None and len(history):
+        report['games'] = len(history)
+        report['overall'] = distribution_by_group(history.accuracy, np.zeros(len(history), dtype=np.int32),
+                                                  ['all'])['all']
+        report['by_category'] = distribution_by_group(history.accuracy, history.category,
+                                                      history.categories)
+        report['by_difficulty'] = distribution_by_group(history.accuracy, history.difficulty,
+                                                        history.difficulties)
+    if answers is not None and store is not None and len(answers):
+        _, _, _, accuracy = session_results(answers)
+        attempts, question_accuracy, difficulty = question_difficulty(answers, len(store))
+        answered = np.flatnonzero(attempts)
+        ranked = answered[np.argsort(-difficulty[answered], kind='stable')][:hardest]
+        report['answers'] = {
+            'answers': len(answers),
+            'unknown_questions': int((~answers.known).sum()),
+            'sessions': len(answers.sessions),
+            'session_accuracy': distribution_by_group(accuracy, np.zeros(len(accuracy), dtype=np.int32),
+                                                      ['all'])['all'],
+            'hardest_questions': [
+                {
+                    'question': store.record(int(position)).question,
+                    'attempts': int(attempts[position]),
+                    'accuracy': float(question_accuracy[position]),
+                    'difficulty': float(difficulty[position]),
+                }
+                for position in ranked
+            ],
+        }
+    return report
+
+
+def print_report(report: Dict):
+    """Print a report in the same style as the game's statistics screens."""
+    print("\n" + "=" * 60)
+    print("📈 QUIZ ANALYTICS")
+    print("=" * 60)
+    if 'games' in report:
+        print(f"Games played: {report['games']}")
+        for title, key in (("📚 Accuracy by Category", 'by_category'),
+                           ("⚡ Accuracy by Difficulty", 'by_difficulty')):
+            print(f"\n{title}:")
+            for name, stats in report[key].items():
+                percentiles = stats['percentiles']
+                print(f"  {name}: {stats['games']} games, mean {stats['mean']:.1f}%, "
+                      f"median {percentiles['50']:.1f}%, p90 {percentiles['90']:.1f}%")
+        print("\n🎯 Grades:")
+        for grade, count in report['overall']['grades'].items():
+            print(f"  {grade}: {count}")
+    if 'answers' in report:
+        answers = report['answers']
+        print(f"\nRecorded answers: {answers['answers']} in {answers['sessions']} sessions "
+              f"({answers['unknown_questions']} unknown questions)")
+        print("\n🔥 Hardest questions:")
+        for item in answers['hardest_questions']:
+            print(f"  {item['accuracy'] * 100:5.1f}% of {item['attempts']:4d} - {item['question'][:60]}")
+    if not report:
+        print("No score history or answers to analyze yet.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze score history and recorded answers.")
+    parser.add_argument("--scores", default="high_scores.log", help="score log to analyze")
+    parser.add_argument("--answers", help="recorded answers (.jsonl or .csv)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    if np is None:
+        sys.exit("❌ analytics requires NumPy: pip install numpy")
+
+    store = None
+    answers = None
+    if args.answers:
+        from backends import open_backend
+        store = open_backend().load_store()
+        answers = AnswerLog(args.answers, store)
+    report = build_report(ScoreHistory(args.scores), answers, store)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
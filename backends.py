@@ -0,0 +1,99 @@
+"""Pluggable storage for the question bank and the score history.
+
+A backend bundles everything the game and the question manager persist.
+Like quiz pickers, backends are duck-typed; each one provides:
+
+* ``path`` - where the bank lives; sidecar files such as the manager's
+  search index are named after it
+* ``bank`` - the editable bank, with ``JSONFileStore``'s interface:
+  ``read``/``write``/``update`` of the nested ``{category: {difficulty:
+  [question]}}`` dict and ``append``/``append_many``/``compact`` of
+  ``question_journal`` edit ops
+* ``load_questions()`` - the nested bank, or the default questions
+* ``load_store()`` - a ``QuestionStore`` to draw quizzes from
+* ``open_scores()`` - a score history with ``ScoreStore``'s ``add``/``top``
+* ``signature()`` - a value that changes whenever the bank does, polled
+  by ``BankProvider``
+* ``compiled_path`` - where ``BankProvider`` may compile the bank, or None
+
+``JSONBackend`` keeps ``questions.json`` and the high-score log; set
+``QUIZ_DB=<path>`` to use ``sqlite_store.SQLiteBackend`` instead.
+"""
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+import metrics
+from bank_provider import file_signature
+from compiled_bank import DEFAULT_BANK_FILE, CompiledBank, read_source, write_bank
+from question_journal import open_bank
+from question_store import QuestionStore
+from score_store import ScoreStore
+
+DEFAULT_QUESTIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                      'default_questions.json')
+
+
+def default_questions() -> Dict:
+    """The built-in starter bank, read only when there is no questions file."""
+    with open(DEFAULT_QUESTIONS_FILE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class JSONBackend:
+    """``questions.json`` with its edit journal and compiled cache, and the high-score log."""
+
+    def __init__(self, questions_file: str = 'questions.json',
+                 compiled_path: Optional[str] = DEFAULT_BANK_FILE):
+        self.path = questions_file
+        self.compiled_path = compiled_path
+        self.bank = open_bank(questions_file)
+
+    def signature(self):
+        return file_signature(self.path)
+
+    def read_questions(self) -> Tuple[Dict, Optional[Dict]]:
+        """Return the questions file's bank and source signature, or the defaults and None."""
+        if os.path.exists(self.path):
+            try:
+                return read_source(self.path)
+            except Exception as e:
+                metrics.count_error("load_questions", e)
+        return default_questions(), None
+
+    def load_questions(self) -> Dict:
+        return self.read_questions()[0]
+
+    def load_store(self) -> QuestionStore:
+        """Open the compiled bank if it is up to date, else parse the questions file.
+
+        A parsed bank is compiled on the way, so the next start only has to
+        map it.
+        """
+        if self.compiled_path is not None and os.path.exists(self.compiled_path):
+            try:
+                bank = CompiledBank(self.compiled_path)
+                if bank.matches_source(self.path):
+                    return bank
+            except (OSError, ValueError) as e:
+                metrics.count_error("load_store", e)
+        questions, signature = self.read_questions()
+        store = QuestionStore(questions)
+        if signature is not None and self.compiled_path is not None:
+            try:
+                write_bank(store, signature, self.compiled_path)
+            except (OSError, ValueError) as e:
+                metrics.count_error("write_bank", e)
+        return store
+
+    def open_scores(self) -> ScoreStore:
+        return ScoreStore()
+
+
+def open_backend(questions_file: str = 'questions.json'):
+    """The SQLite backend if ``QUIZ_DB`` names a database, else the JSON files."""
+    db_path = os.environ.get("QUIZ_DB")
+    if db_path:
+        from sqlite_store import SQLiteBackend
+        return SQLiteBackend(db_path)
+    return JSONBackend(questions_file)
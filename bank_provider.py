@@ -0,0 +1,141 @@
+"""Hot reloading of the question bank for long-running processes.
+
+A ``BankProvider`` holds the current ``QuestionStore``. A daemon thread
+polls the size, mtime and inode of ``questions.json`` and its edit journal
+(plain ``os.stat`` polling, no inotify) and, when either changed, builds a
+fresh store off to the side and swaps it in with one attribute assignment.
+Backends that are not plain files supply their own signature to poll.
+Stores are never modified once built, so quizzes and pickers that already
+hold the old store keep a consistent snapshot while new quizzes see the edit.
+
+Parsing a large ``questions.json`` holds the GIL for the whole parse, which
+would stall every player served by the same process. A reload therefore
+compiles ``questions.qbank`` in a child process, and the thread only maps
+the new file; if compiling fails the thread falls back to parsing.
+"""
+import os
+import subprocess
+import sys
+import threading
+from typing import Any, Callable, Optional, Tuple
+
+import metrics
+from compiled_bank import DEFAULT_BANK_FILE
+from question_store import QuestionStore
+
+DEFAULT_INTERVAL = 2.0  # seconds between polls
+COMPILE_TIMEOUT = 600.0
+
+# Run in the child: at the lowest CPU priority, so that on a busy or
+# single-core machine the compile yields to the process serving players.
+_COMPILE = f"""
+import os, sys
+sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})
+if hasattr(os, "nice"):
+    os.nice(19)
+from compiled_bank import compile_bank
+compile_bank(sys.argv[1], sys.argv[2])
+"""
+
+Signature = Tuple[Optional[Tuple[int, int, int]], ...]
+
+
+def _stat(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (info.st_mtime_ns, info.st_size, info.st_ino)
+
+
+def file_signature(source_path: str) -> Signature:
+    """Stat results of a bank file and its journal."""
+    return (_stat(source_path), _stat(f"{source_path}.journal"))
+
+
+class BankProvider:
+    """The current question store, reloaded in the background when its files change."""
+
+    def __init__(self, load: Callable[[], QuestionStore], source_path: str = 'questions.json',
+                 bank_path: Optional[str] = DEFAULT_BANK_FILE, interval: float = DEFAULT_INTERVAL,
+                 signature: Optional[Callable[[], Any]] = None,
+                 prepare: Optional[Callable[[QuestionStore], Any]] = None):
+        """``load`` builds a store from disk, preferring an up-to-date ``bank_path``.
+
+        With ``bank_path=None`` reloads parse the source in the watcher thread.
+        ``signature`` tells when to reload; by default the source file and
+        its journal are stat'ed. ``prepare`` is called in the watcher thread
+        with each reloaded store before it is swapped in, to build whatever
+        else depends on it.
+        """
+        self.load = load
+        self.prepare = prepare
+        self.source_path = source_path
+        self.bank_path = bank_path
+        self.interval = interval
+        if signature is not None:
+            self.signature = signature
+        self.reloads = 0
+        self._signature = self.signature()
+        self.store = load()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def signature(self) -> Signature:
+        """What the store was built from: stat results of the source and its journal."""
+        return file_signature(self.source_path)
+
+    def _compile(self) -> bool:
+        """Recompile the bank in a child process, keeping the parse off this one's GIL."""
+        if self.bank_path is None or not os.path.exists(self.source_path):
+            return False
+        try:
+            subprocess.run([sys.executable, "-c", _COMPILE, self.source_path, self.bank_path],
+                           check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                           timeout=COMPILE_TIMEOUT)
+            return True
+        except (OSError, subprocess.SubprocessError) as e:
+            metrics.count_error("bank_compile", e)
+            return False
+
+    def check(self) -> bool:
+        """Reload and swap in the store if the files changed; return whether it did."""
+        signature = self.signature()
+        if signature == self._signature:
+            return False
+        self._reload(signature)
+        return True
+
+    @metrics.timed("bank_reload")
+    def _reload(self, signature: Any):
+        # The signature was taken before loading, so an edit landing
+        # mid-reload is picked up by the next check.
+        self._compile()
+        store = self.load()
+        if self.prepare is not None:
+            self.prepare(store)
+        self.store = store
+        self._signature = signature
+        self.reloads += 1
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                # Keep serving the last good store; the next poll retries.
+                metrics.count_error("bank_reload", e)
+
+    def start(self):
+        """Start polling in a daemon thread, unless already polling or ``interval <= 0``."""
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="bank-reload", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
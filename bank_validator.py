@@ -0,0 +1,296 @@
+"""Parallel validation and linting of the question bank.
+
+The bank is split into shards of consecutive questions and every shard is
+checked in a separate process, so validation scales with the number of cores.
+Per question the checks are:
+
+* schema: a question string, a list of four non-empty option strings
+* ``correct`` is an integer index into the options
+* no two options are the same (ignoring case and whitespace)
+* the explanation is present and not empty
+* an ``id``, if present, is 16 lower-case hex digits and unique in the bank
+
+Workers also return each question's content key (see
+``question_store.question_hash``) and id, which the parent merges to find
+the same question filed more than once, within or across categories, and
+ids used twice. With ``--fuzzy`` the workers also compute MinHash
+signatures, and the parent indexes those of every distinct question in a
+``near_duplicates.NearDuplicateIndex`` to report pairs that look like
+rewordings of each other. Scoring those pairs runs in the parent, so the
+pass is opt-in. Per-category and per-difficulty balance is computed from
+the bucket sizes alone.
+
+The report is a JSON object; the command exits with status 1 if any errors
+were found.
+
+Usage: python bank_validator.py [questions.json] [--workers N] [--output report.json]
+                                [--fuzzy]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, List, Optional, Tuple
+
+from near_duplicates import NearDuplicateIndex
+from question_journal import DEFAULT_DIFFICULTIES, open_bank
+from question_store import content_key, is_question_id, normalize_text
+
+NUM_OPTIONS = 4
+SHARD_SIZE = 50_000
+# Banks smaller than this are checked in-process; starting workers costs more.
+MIN_PARALLEL = 100_000
+
+ERROR = "error"
+WARNING = "warning"
+
+Shard = Tuple[str, str, int, List]
+# Per shard: issues, each question's content key and id, and the MinHash
+# signatures of the questions with a key (empty without the fuzzy pass).
+ShardResult = Tuple[List[Dict], List[Optional[str]], List[Optional[str]], bytes]
+
+
+def lint_question(question) -> Tuple[List[Tuple[str, str, str]], Optional[str]]:
+    """Check one question.
+
+    Returns ``(severity, code, message)`` for every problem found and the
+    question's content key, or None for questions too malformed to hash.
+    The options are normalized once for both the duplicate check and the key.
+    """
+    if not isinstance(question, dict):
+        return [(ERROR, "schema", "question is not an object")], None
+
+    issues = []
+    text = question.get("question")
+    if not isinstance(text, str) or not text.strip():
+        issues.append((ERROR, "question", "question text is missing or empty"))
+
+    options = question.get("options")
+    normalized = None
+    if not isinstance(options, list) or not all(isinstance(option, str) for option in options):
+        issues.append((ERROR, "options", "options must be a list of strings"))
+        options = None
+    else:
+        normalized = [" ".join(option.split()).lower() for option in options]
+        if len(options) != NUM_OPTIONS:
+            issues.append((ERROR, "options", f"expected {NUM_OPTIONS} options, found {len(options)}"))
+        elif not all(normalized):
+            issues.append((ERROR, "options", "an option is empty"))
+        if len(set(normalized)) != len(normalized):
+            issues.append((ERROR, "duplicate_options", "two options are the same"))
+
+    correct = question.get("correct")
+    if type(correct) is not int:
+        issues.append((ERROR, "correct", "correct must be an integer option index"))
+    elif options is not None and not 0 <= correct < len(options):
+        issues.append((ERROR, "correct", f"correct index {correct} is out of range"))
+
+    explanation = question.get("explanation")
+    if explanation is None or not str(explanation).strip():
+        issues.append((WARNING, "explanation", "explanation is missing or empty"))
+
+    if "id" in question and not is_question_id(question["id"]):
+        issues.append((WARNING, "id", "id should be 16 lower-case hex digits"))
+
+    key = None
+    if normalized is not None:
+        key = content_key(normalize_text(question.get("question", "")), normalized)
+    return issues, key
+
+
+def check_question(question) -> List[Tuple[str, str, str]]:
+    """Return ``(severity, code, message)`` for every problem with one question."""
+    return lint_question(question)[0]
+
+
+def check_shard(shard: Shard, fuzzy: bool = False) -> ShardResult:
+    """Check one shard; see ``ShardResult``."""
+    category, difficulty, start, questions = shard
+    issues = []
+    keys: List[Optional[str]] = []
+    ids: List[Optional[str]] = []
+    for offset, question in enumerate(questions):
+        found, key = lint_question(question)
+        for severity, code, message in found:
+            issues.append({"category": category, "difficulty": difficulty, "index": start + offset,
+                           "severity": severity, "code": code, "message": message})
+        keys.append(key)
+        qid = question.get("id") if isinstance(question, dict) else None
+        ids.append(qid if isinstance(qid, str) else None)
+    signatures = b""
+    if fuzzy:
+        hashable = [question for question, key in zip(questions, keys) if key is not None]
+        signatures = NearDuplicateIndex().signature_bytes(hashable)
+    return issues, keys, ids, signatures
+
+
+def iter_shards(questions: Dict, shard_size: int = SHARD_SIZE):
+    """Split every bucket into runs of at most ``shard_size`` questions."""
+    for category, difficulties in questions.items():
+        for difficulty, items in difficulties.items():
+            for start in range(0, len(items), shard_size):
+                yield category, difficulty, start, items[start:start + shard_size]
+
+
+def balance(questions: Dict) -> Dict:
+    """Question counts per category and difficulty with the statistics hints."""
+    by_category = {}
+    by_difficulty: Dict[str, int] = {}
+    for category, difficulties in questions.items():
+        by_category[category] = 0
+        for difficulty, items in difficulties.items():
+            by_category[category] += len(items)
+            by_difficulty[difficulty] = by_difficulty.get(difficulty, 0) + len(items)
+    total = sum(by_category.values())
+
+    hints = []
+    if total < 50:
+        hints.append("Consider adding more questions for a richer experience")
+    low_categories = [category for category, count in by_category.items() if count < 5]
+    if low_categories:
+        hints.append(f"Add more questions to: {', '.join(low_categories)}")
+    if by_difficulty and max(by_difficulty.values()) > min(by_difficulty.values()) * 2:
+        hints.append("Consider balancing difficulty levels")
+    return {"by_category": by_category, "by_difficulty": by_difficulty, "hints": hints}
+
+
+def near_duplicate_pairs(signatures: bytes, locations: List[Tuple[str, str, int]]) -> List[Dict]:
+    """Pairs of distinct questions that look like rewordings of each other.
+
+    ``signatures`` holds one signature per entry of ``locations``, as the
+    workers computed them; only band keys are sorted here.
+    """
+    index = NearDuplicateIndex()
+    index.add_signatures(signatures, [None] * len(locations))
+    pairs = []
+    for similarity, first, second in index.pairs():
+        pairs.append({
+            "similarity": round(similarity, 2),
+            "locations": [{"category": category, "difficulty": difficulty, "index": position}
+                          for category, difficulty, position in (locations[first], locations[second])],
+        })
+    pairs.sort(key=lambda pair: pair["similarity"], reverse=True)
+    return pairs
+
+
+def validate(questions: Dict, workers: Optional[int] = None, shard_size: int = SHARD_SIZE,
+             fuzzy: bool = False) -> Dict:
+    """Validate a nested bank and return the report.
+
+    ``workers`` defaults to the number of CPUs; banks under ``MIN_PARALLEL``
+    questions, or ``workers=1``, are checked in this process. ``fuzzy``
+    adds the near-duplicate pass.
+    """
+    start_time = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    total = sum(len(items) for difficulties in questions.values() for items in difficulties.values())
+    # Each task pickles only its own shard, never the whole bank.
+    shards = [shard[:3] for shard in iter_shards(questions, shard_size)]
+
+    if workers > 1 and total >= MIN_PARALLEL:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(check_shard, iter_shards(questions, shard_size),
+                                        repeat(fuzzy)))
+    else:
+        workers = 1
+        results = [check_shard(shard, fuzzy) for shard in iter_shards(questions, shard_size)]
+
+    issues: List[Dict] = []
+    id_issues: List[Dict] = []
+    first_seen: Dict[str, Tuple[str, str, int]] = {}
+    duplicates: Dict[str, List[Tuple[str, str, int]]] = {}
+    id_owners: Dict[str, Tuple[str, str, int]] = {}
+    distinct: List[Tuple[str, str, int]] = []
+    distinct_signatures = bytearray()
+    width = NearDuplicateIndex().num_perm * 4
+    for (category, difficulty, start), (shard_issues, keys, ids, signatures) in zip(shards, results):
+        issues.extend(shard_issues)
+        hashed = 0
+        for offset, (key, qid) in enumerate(zip(keys, ids)):
+            location = (category, difficulty, start + offset)
+            if qid is not None:
+                owner = id_owners.setdefault(qid, location)
+                if owner is not location:
+                    id_issues.append({"category": category, "difficulty": difficulty,
+                                      "index": start + offset, "severity": ERROR,
+                                      "code": "duplicate_id",
+                                      "message": f"id {qid} is already used by {owner[0]}/{owner[1]} "
+                                                 f"#{owner[2] + 1}"})
+            if key is None:
+                continue
+            first = first_seen.setdefault(key, location)
+            if first is not location:
+                duplicates.setdefault(key, [first]).append(location)
+            elif fuzzy:
+                distinct.append(location)
+                distinct_signatures += signatures[hashed * width:(hashed + 1) * width]
+            hashed += 1
+    issues.extend(id_issues)
+
+    for category, difficulties in questions.items():
+        for difficulty in difficulties:
+            if difficulty not in DEFAULT_DIFFICULTIES:
+                issues.append({"category": category, "difficulty": difficulty, "index": None,
+                               "severity": WARNING, "code": "difficulty",
+                               "message": f"unknown difficulty {difficulty!r}"})
+
+    duplicate_groups = [
+        {
+            "key": key,
+            "cross_category": len({category for category, _, _ in locations}) > 1,
+            "locations": [{"category": category, "difficulty": difficulty, "index": index}
+                          for category, difficulty, index in locations],
+        }
+        for key, locations in duplicates.items()
+    ]
+    near_duplicates = near_duplicate_pairs(bytes(distinct_signatures), distinct) if fuzzy else []
+    errors = sum(1 for issue in issues if issue["severity"] == ERROR)
+    return {
+        "questions": total,
+        "categories": len(questions),
+        "errors": errors,
+        "warnings": len(issues) - errors + len(duplicate_groups) + len(near_duplicates),
+        "issues": issues,
+        "duplicates": duplicate_groups,
+        "near_duplicates": near_duplicates,
+        "balance": balance(questions),
+        "workers": workers,
+        "elapsed": time.perf_counter() - start_time,
+    }
+
+
+def validate_file(path: str = 'questions.json', workers: Optional[int] = None,
+                  fuzzy: bool = False) -> Dict:
+    """Validate the bank at ``path``, including unfolded journal edits."""
+    questions, _ = open_bank(path).read(default={})
+    return validate(questions, workers, fuzzy=fuzzy)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate and lint the question bank.")
+    parser.add_argument("bank", nargs="?", default="questions.json", help="question bank to check")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="also report questions that look like rewordings of each other")
+    args = parser.parse_args(argv)
+
+    report = validate_file(args.bank, args.workers, fuzzy=args.fuzzy)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    rate = report["questions"] / report["elapsed"] if report["elapsed"] > 0 else 0
+    print(f"{'❌' if report['errors'] else '✅'} {report['questions']} questions: "
+          f"{report['errors']} errors, {report['warnings']} warnings "
+          f"({report['workers']} workers, {rate:,.0f} questions/s)", file=sys.stderr)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""Offline scoring of recorded answer streams.
+
+Reads ``(session, question id, chosen option, timestamp)`` records from JSONL
+or CSV and scores them with the same rules as the interactive game, without
+touching stdin or sleeping. Records are streamed: memory grows with the
+number of sessions in flight, never with the number of answers.
+
+JSONL lines look like::
+
+    {"session": "s1", "question_id": "9f3c0e5d1a2b4c6d", "choice": 2, "timestamp": 1700000000.5}
+
+CSV files use the same column names. ``choice`` may be an option index or a
+letter (A-D); ``timestamp`` may be epoch seconds or an ISO 8601 string. The
+question id is the stable id from ``question_store.question_id``.
+
+Usage: python batch_scoring.py answers.jsonl [--sorted] [--output results.jsonl]
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import metrics
+from question_store import QuestionStore
+from quiz_session import get_points, grade_for
+
+AnswerRecord = Tuple[str, str, int, Optional[float]]
+
+
+def parse_choice(value) -> int:
+    """Turn an option index or letter into an option index."""
+    if isinstance(value, int):
+        return value
+    value = str(value).strip()
+    if len(value) == 1 and value.isalpha():
+        return ord(value.upper()) - ord('A')
+    return int(value)
+
+
+def parse_timestamp(value) -> Optional[float]:
+    """Turn epoch seconds or an ISO 8601 string into epoch seconds."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value)).timestamp()
+
+
+def iter_jsonl(f, chunk_size: int = 4096) -> Iterator[Dict]:
+    """Parse JSON lines a chunk at a time.
+
+    Decoding a few thousand lines as one JSON array costs a fraction of the
+    per-call overhead of ``json.loads`` on every line. Lines that are not
+    valid JSON, such as one cut short by a crash mid-append, are skipped and
+    counted as ``iter_jsonl`` errors.
+    """
+    while True:
+        lines = [line for line in islice(f, chunk_size) if line.strip()]
+        if not lines:
+            return
+        try:
+            rows = json.loads("[" + ",".join(lines) + "]")
+        except ValueError:
+            # Re-parse line by line to drop only the bad records.
+            rows = []
+            for line in lines:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError as e:
+                    metrics.count_error("iter_jsonl", e)
+        yield from rows
+
+
+def read_records(path: str) -> Iterator[AnswerRecord]:
+    """Stream answer records from a ``.csv`` or JSON-lines file."""
+    with open(path, 'r', newline='') as f:
+        if path.endswith('.csv'):
+            rows: Iterable[Dict] = csv.DictReader(f)
+        else:
+            rows = iter_jsonl(f)
+        for row in rows:
+            # Fast path for the common JSONL shape: integer choice and numeric
+            # timestamp need no parsing.
+            choice = row['choice']
+            if type(choice) is not int:
+                choice = parse_choice(choice)
+            timestamp = row.get('timestamp')
+            if type(timestamp) is not float:
+                timestamp = parse_timestamp(timestamp)
+            yield str(row['session']), row['question_id'], choice, timestamp
+
+
+class SessionTotals:
+    """Running totals for one session."""
+
+    __slots__ = ("answers", "correct", "score", "unknown", "first", "last")
+
+    def __init__(self):
+        self.answers = 0
+        self.correct = 0
+        self.score = 0
+        self.unknown = 0
+        self.first: Optional[float] = None
+        self.last: Optional[float] = None
+
+    def result(self, session: str) -> Dict:
+        """Return the per-session result with accuracy and grade."""
+        scored = self.answers - self.unknown
+        accuracy = (self.correct / scored) * 100 if scored > 0 else 0
+        grade, message = grade_for(accuracy)
+        return {
+            "session": session,
+            "answers": self.answers,
+            "correct": self.correct,
+            "score": self.score,
+            "accuracy": accuracy,
+            "grade": grade,
+            "message": message,
+            "unknown_questions": self.unknown,
+            "started": self.first,
+            "finished": self.last,
+        }
+
+
+class BatchScorer:
+    """Scores answer records against a question bank."""
+
+    def __init__(self, store: QuestionStore):
+        self.store = store
+        # question id -> (correct option, points), or None for unknown ids.
+        self._answer_keys: Dict[str, Optional[Tuple[int, int]]] = {}
+        self.answers_scored = 0
+
+    def answer_key(self, question_id: str) -> Optional[Tuple[int, int]]:
+        """Return ``(correct option, points)`` for a question id, cached."""
+        try:
+            return self._answer_keys[question_id]
+        except KeyError:
+            pass
+        index = self.store.find(question_id)
+        key = None
+        if index is not None:
+            correct, difficulty = self.store.answer_key(index)
+            key = (correct, get_points(difficulty))
+        self._answer_keys[question_id] = key
+        return key
+
+    def score(self, records: Iterable[AnswerRecord], sorted_input: bool = False) -> Iterator[Dict]:
+        """Yield one result per session.
+
+        With ``sorted_input`` the records must be grouped by session, and each
+        session is emitted as soon as the next one starts, so memory stays
+        constant. Otherwise sessions are emitted once the stream ends.
+        """
+        sessions: Dict[str, SessionTotals] = {}
+        answer_keys = self._answer_keys
+        scored = 0
+        current = None
+        totals = None
+        for session, question_id, choice, timestamp in records:
+            if session != current:
+                if sorted_input and current is not None:
+                    yield sessions.pop(current).result(current)
+                current = session
+                totals = sessions.get(session)
+                if totals is None:
+                    totals = sessions[session] = SessionTotals()
+
+            totals.answers += 1
+            key = answer_keys[question_id] if question_id in answer_keys else self.answer_key(question_id)
+            if key is None:
+                totals.unknown += 1
+            elif choice == key[0]:
+                totals.correct += 1
+                totals.score += key[1]
+            if timestamp is not None:
+                if totals.first is None or timestamp < totals.first:
+                    totals.first = timestamp
+                if totals.last is None or timestamp > totals.last:
+                    totals.last = timestamp
+            scored += 1
+
+        self.answers_scored += scored
+        for session, totals in sessions.items():
+            yield totals.result(session)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score recorded answer streams offline.")
+    parser.add_argument("answers", help="answer records (.jsonl or .csv)")
+    parser.add_argument("--sorted", action="store_true",
+                        help="records are grouped by session; emit each session when it ends")
+    parser.add_argument("--output", help="write per-session results here instead of stdout")
+    args = parser.parse_args()
+
+    from backends import open_backend
+    scorer = BatchScorer(open_backend().load_store())
+
+    start = time.perf_counter()
+    out = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        sessions = 0
+        for result in scorer.score(read_records(args.answers), sorted_input=args.sorted):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            sessions += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    rate = scorer.answers_scored / elapsed if elapsed > 0 else 0
+    print(f"✅ Scored {scorer.answers_scored} answers in {sessions} sessions "
+          f"({rate:,.0f} answers/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
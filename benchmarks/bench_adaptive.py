@@ -0,0 +1,59 @@
+"""Adaptive selection: cost per pick and rating update as the bank grows.
+
+Simulated players with a hidden skill answer adaptively chosen questions; a
+linear scan for the nearest rating is timed alongside for comparison.
+
+Usage: python benchmarks/bench_adaptive.py [max_questions]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adaptive import AdaptiveEngine, expected_score
+from question_store import QuestionStore
+from synthetic import make_bank
+
+ANSWERS = 5_000
+
+
+def main():
+    max_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sizes = []
+    size = 10_000
+    while size <= max_questions:
+        sizes.append(size)
+        size *= 10
+
+    print(f"{'questions':>10}  {'build':>7}  {'pick+update':>12}  {'linear pick':>12}")
+    for size in sizes:
+        store = QuestionStore(make_bank(size))
+        start = time.perf_counter()
+        engine = AdaptiveEngine(store, path=None)
+        build = time.perf_counter() - start
+
+        rng = random.Random(5)
+        skills = {f"player{i}": rng.gauss(1500, 200) for i in range(100)}
+        start = time.perf_counter()
+        for i in range(ANSWERS):
+            player = f"player{i % 100}"
+            position = engine.pick(player, rng=rng)
+            correct = rng.random() < expected_score(skills[player], engine.question_ratings[position])
+            engine.record(player, position, correct)
+        adaptive_us = (time.perf_counter() - start) / ANSWERS * 1e6
+
+        ratings = engine.question_ratings
+        scans = 20
+        start = time.perf_counter()
+        for i in range(scans):
+            target = engine.player_rating(f"player{i}") - engine.offset
+            min(range(len(ratings)), key=lambda j: abs(ratings[j] - target))
+        linear_us = (time.perf_counter() - start) / scans * 1e6
+
+        print(f"{size:>10,}  {build:>6.2f}s  {adaptive_us:>9.1f} µs  {linear_us:>9.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
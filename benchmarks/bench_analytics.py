@@ -0,0 +1,89 @@
+"""Time the analytics from log files to report on synthetic history and answers.
+
+Writes a score log and a JSONL answer stream, then times loading both
+cold (parsing every line and writing the ``.columns.npz`` caches), warm
+(reading the caches) and after 1% more lines were appended (cache plus the
+new tail), and finally the analysis itself.
+
+Usage: python benchmarks/bench_analytics.py [num_answers] [num_games]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import (AnswerLog, ScoreHistory, distribution_by_group, question_difficulty,
+                       session_results)
+from question_store import QuestionStore, assign_id
+from synthetic import DEFAULT_CATEGORIES, DEFAULT_DIFFICULTIES, make_bank
+
+NUM_QUESTIONS = 100_000
+
+
+def write_games(path: str, count: int, rng: random.Random):
+    with open(path, "a") as f:
+        for _ in range(count):
+            f.write(json.dumps({"name": "player", "score": rng.randrange(40),
+                                "accuracy": rng.random() * 100,
+                                "category": rng.choice(DEFAULT_CATEGORIES),
+                                "difficulty": rng.choice(DEFAULT_DIFFICULTIES),
+                                "timestamp": "2024-01-01 12:00:00"}, separators=(",", ":")) + "\n")
+
+
+def write_answers(path: str, count: int, ids, rng: random.Random, first_session: int = 0):
+    with open(path, "a") as f:
+        for index in range(count):
+            f.write(json.dumps({"session": f"s{first_session + index // 10}",
+                                "question_id": rng.choice(ids), "choice": rng.randrange(4),
+                                "timestamp": 1700000000.0 + index}, separators=(",", ":")) + "\n")
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    num_answers = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    num_games = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    rng = random.Random(0)
+    bank = make_bank(NUM_QUESTIONS)
+    for buckets in bank.values():
+        for questions in buckets.values():
+            for question in questions:
+                assign_id(question)
+    store = QuestionStore(bank)
+    ids = [store.question_id(index) for index in range(len(store))]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        scores = os.path.join(workdir, "high_scores.log")
+        answers = os.path.join(workdir, "answers.jsonl")
+        write_games(scores, num_games, rng)
+        write_answers(answers, num_answers, ids, rng)
+
+        print(f"{'':>22}  {f'{num_games:,} games':>14}  {f'{num_answers:,} answers':>18}")
+        for label in ("cold (parse + cache)", "warm (cache)", "+1% appended"):
+            if label == "+1% appended":
+                write_games(scores, num_games // 100, rng)
+                write_answers(answers, num_answers // 100, ids, rng, num_answers)
+            history, history_s = timed(lambda: ScoreHistory(scores))
+            log, answers_s = timed(lambda: AnswerLog(answers, store))
+            print(f"{label:>22}  {history_s:>12.2f} s  {answers_s:>16.2f} s")
+            if label.startswith("cold"):
+                cold_rate = num_answers / answers_s
+
+    _, history_s = timed(lambda: (
+        distribution_by_group(history.accuracy, history.category, history.categories),
+        distribution_by_group(history.accuracy, history.difficulty, history.difficulties)))
+    _, answers_s = timed(lambda: (session_results(log), question_difficulty(log, len(store))))
+    print(f"{'analysis':>22}  {history_s:>12.2f} s  {answers_s:>16.2f} s")
+    print(f"cold parse: {cold_rate:,.0f} answers/s")
+
+
+if __name__ == "__main__":
+    main()
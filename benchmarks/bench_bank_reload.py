@@ -0,0 +1,140 @@
+"""Quiz-drawing latency while the bank is edited and hot-reloaded.
+
+One thread keeps drawing, as a server would: a 10-question quiz, the first
+question of an adaptive quiz and the first of a review quiz in turn, while
+another journals a new question every half second and the bank provider
+polls for changes. Runs without edits, with reloads through a compiled bank
+rebuilt in a child process (the default), with the adaptive and review
+engines rebuilt on first use instead of in the reload thread, and with
+reloads that parse questions.json in the watcher thread. Prints latency
+percentiles per kind of draw, the worst stall, and the worst draw right
+after a new store was swapped in. Once the edits stop, drawing goes on
+until the last one is live, so that every reloading mode swaps at least
+once under load.
+
+Usage: python benchmarks/bench_bank_reload.py [num_questions] [seconds]
+"""
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compiled_bank import compile_bank
+from question_journal import add_op, open_bank
+from question_store import assign_id
+from quiz_game import QuizGame
+from synthetic import make_bank, make_question
+
+EDIT_EVERY = 0.5
+POLL_EVERY = 0.1
+SETTLE = 120.0  # longest to keep drawing after the edits stop
+
+
+def edit_loop(stop: threading.Event, seed: int):
+    """Journal one new question every ``EDIT_EVERY`` seconds, like the manager does."""
+    rng = random.Random(seed)
+    bank = open_bank("questions.json")
+    while not stop.wait(EDIT_EVERY):
+        question = make_question(rng)
+        assign_id(question)
+        bank.append(add_op("Science", "easy", question))
+
+
+def run(mode: str, seconds: float, seed: int):
+    compile_bank("questions.json")
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = QuizGame(seed=0)
+    if mode == "reload in thread":
+        game.bank.bank_path = None
+    if mode == "engines on first use":
+        game.bank.prepare = None
+    game.bank.interval = POLL_EVERY
+    draws = {
+        "quiz": lambda: game.get_questions_for_quiz("Science", "easy", 10),
+        "adaptive": lambda: game.get_picker("bench", "Science", "adaptive").next(),
+        "review": lambda: game.get_picker("bench", "Science", "review").next(),
+    }
+    for draw in draws.values():
+        draw()  # build the engines before the first reload
+    stop = threading.Event()
+    editor = threading.Thread(target=edit_loop, args=(stop, seed))
+    if mode != "no edits":
+        game.bank.start()
+        editor.start()
+
+    latencies = {kind: [] for kind in draws}
+    after_swap = {kind: 0.0 for kind in draws}
+    first = len(game.store)
+    seen = game.store
+    end = time.perf_counter() + seconds
+    while True:
+        now = time.perf_counter()
+        if now >= end and not stop.is_set():
+            stop.set()
+            if editor.is_alive():
+                editor.join()
+        if stop.is_set() and (mode == "no edits" or now >= end + SETTLE
+                              or game.bank.signature() == game.bank._signature):
+            break
+        swapped = game.store is not seen
+        seen = game.store
+        for kind, draw in draws.items():
+            start = time.perf_counter()
+            draw()
+            elapsed = time.perf_counter() - start
+            latencies[kind].append(elapsed)
+            if swapped:
+                after_swap[kind] = max(after_swap[kind], elapsed)
+
+    game.bank.stop()
+    added = len(game.store) - first
+
+    for kind, samples in latencies.items():
+        samples.sort()
+
+        def percentile(p: float) -> float:
+            return samples[min(len(samples) - 1, int(p * len(samples)))] * 1e6
+
+        print(f"{mode:>20}  {kind:>8}  {game.bank.reloads:>7}  {added:>5}  {len(samples):>7,}  "
+              f"{percentile(0.5):>7.0f}  {percentile(0.99):>7.0f}  {samples[-1] * 1e3:>8.1f}  "
+              f"{after_swap[kind] * 1e3:>10.1f}")
+
+
+def main():
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    with tempfile.TemporaryDirectory() as workdir:
+        previous = os.getcwd()
+        os.chdir(workdir)
+        try:
+            bank = make_bank(num_questions)
+            for buckets in bank.values():
+                for questions in buckets.values():
+                    for question in questions:
+                        assign_id(question)
+            with open("questions.json", "w") as f:
+                json.dump(bank, f)
+
+            print(f"{num_questions:,} questions, one edit every {EDIT_EVERY}s, "
+                  f"polling every {POLL_EVERY}s, {seconds:g}s per mode")
+            print(f"{'mode':>20}  {'draw':>8}  {'reloads':>7}  {'added':>5}  {'draws':>7}  "
+                  f"{'p50 µs':>7}  {'p99 µs':>7}  {'worst ms':>8}  {'after swap':>10}")
+            for seed, mode in enumerate(("no edits", "reload via child", "engines on first use",
+                                         "reload in thread")):
+                # Fold the previous mode's edits in so every mode starts without a journal.
+                if os.path.exists("questions.json.journal"):
+                    open_bank("questions.json").compact(default={})
+                run(mode, seconds, seed)
+        finally:
+            os.chdir(previous)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Throughput of the offline batch scorer on a synthetic answer stream.
+
+Usage: python benchmarks/bench_batch_scoring.py [num_answers] [num_questions]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_scoring import BatchScorer, read_records
+from question_store import QuestionStore
+from synthetic import make_bank
+
+
+def main():
+    num_answers = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    num_questions = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    store = QuestionStore(make_bank(num_questions))
+    ids = [store.question_id(i) for i in range(len(store))]
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "answers.jsonl")
+        with open(path, "w") as f:
+            for i in range(num_answers):
+                f.write(json.dumps({"session": f"s{i // 10}", "question_id": rng.choice(ids),
+                                    "choice": rng.randrange(4), "timestamp": 1.7e9 + i}) + "\n")
+
+        for sorted_input in (True, False):
+            scorer = BatchScorer(store)
+            store.find(ids[0])  # build the id index outside the timed region
+            start = time.perf_counter()
+            sessions = sum(1 for _ in scorer.score(read_records(path), sorted_input=sorted_input))
+            elapsed = time.perf_counter() - start
+            mode = "sorted" if sorted_input else "unsorted"
+            print(f"{mode:9s} {num_answers} answers, {sessions} sessions: "
+                  f"{num_answers / elapsed:12,.0f} answers/s")
+
+
+if __name__ == "__main__":
+    main()
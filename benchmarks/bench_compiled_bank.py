@@ -0,0 +1,44 @@
+"""Compare startup of a JSON bank against the compiled, memory-mapped bank.
+
+Usage: python benchmarks/bench_compiled_bank.py [num_questions]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compiled_bank import CompiledBank, compile_bank
+from question_store import QuestionStore
+from synthetic import make_bank
+
+
+def main():
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as workdir:
+        source = os.path.join(workdir, "questions.json")
+        target = os.path.join(workdir, "questions.qbank")
+        with open(source, "w") as f:
+            json.dump(make_bank(num_questions), f)
+        compile_bank(source, target)
+
+        start = time.perf_counter()
+        with open(source) as f:
+            store = QuestionStore(json.load(f))
+        store.sample(None, None, 10)
+        json_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        bank = CompiledBank(target)
+        bank.sample(None, None, 10)
+        bank_seconds = time.perf_counter() - start
+
+    print(f"Questions:              {num_questions}")
+    print(f"json.load + draw 10:      {json_seconds * 1000:10.1f} ms")
+    print(f"compiled open + draw 10: {bank_seconds * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Multi-process stress test for the locked, atomic storage layer.
+
+Several processes concurrently append scores through ScoreStore and apply
+read-modify-write updates through JSONFileStore. Afterwards every write must
+be accounted for: the score log must hold every game and the shared counter
+must equal the total number of updates.
+
+Usage: python benchmarks/bench_concurrent_writes.py [processes] [writes_per_process]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from score_store import ScoreStore
+from storage import JSONFileStore
+
+
+def increment(data):
+    data["count"] += 1
+    data["writers"][str(os.getpid())] = data["writers"].get(str(os.getpid()), 0) + 1
+    return data
+
+
+def worker(workdir: str, writes: int, worker_id: int):
+    scores = ScoreStore(log_path=os.path.join(workdir, "high_scores.log"),
+                        index_path=os.path.join(workdir, "high_scores.idx"),
+                        legacy_path=os.path.join(workdir, "missing.json"))
+    counter = JSONFileStore(os.path.join(workdir, "counter.json"))
+    for i in range(writes):
+        scores.add({"name": f"w{worker_id}", "score": (worker_id * 7919 + i) % 100,
+                    "category": "Science", "difficulty": "easy"})
+        counter.update(increment, default={"count": 0, "writers": {}})
+
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 4
+    writes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        jobs = [multiprocessing.Process(target=worker, args=(workdir, writes, i))
+                for i in range(processes)]
+        for job in jobs:
+            job.start()
+        for job in jobs:
+            job.join()
+        elapsed = time.perf_counter() - start
+
+        expected = processes * writes
+        with open(os.path.join(workdir, "high_scores.log")) as f:
+            logged = sum(1 for _ in f)
+        counter, _ = JSONFileStore(os.path.join(workdir, "counter.json")).read()
+
+    total_writes = 2 * expected
+    print(f"Processes:           {processes}")
+    print(f"Writes per process:  {writes} scores + {writes} updates")
+    print(f"Sustained writes/s:  {total_writes / elapsed:10.1f}")
+    print(f"Scores logged:       {logged}/{expected}")
+    print(f"Counter updates:     {counter['count']}/{expected}")
+    lost = (expected - logged) + (expected - counter["count"])
+    print(f"Lost updates:        {lost}")
+    sys.exit(1 if lost else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Compare the old indented export with the streaming export formats.
+
+Reports the bytes written and the time taken. Peak memory is not
+reported: ``json.dump`` already encodes in chunks, so neither side holds
+the serialized bank and the difference is noise.
+
+Usage: python benchmarks/bench_export.py [num_questions]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_export import export_questions
+from synthetic import make_bank
+
+
+def indented_export(questions, path):
+    with open(path, "w") as f:
+        json.dump(questions, f, indent=2)
+    return {path: os.path.getsize(path)}
+
+
+def measure(label, export, questions, path):
+    start = time.perf_counter()
+    written = export(questions, path)
+    elapsed = time.perf_counter() - start
+    size = sum(written.values())
+    print(f"{label:28s} {size:>14,} bytes {elapsed:8.2f} s")
+
+
+def main():
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    questions = make_bank(num_questions)
+    print(f"Exporting {num_questions} questions")
+    with tempfile.TemporaryDirectory() as workdir:
+        measure("json.dump indent=2 (old)", indented_export, questions,
+                os.path.join(workdir, "old.json"))
+        for name in ("backup.json", "backup.jsonl", "backup.json.gz", "backup.jsonl.gz"):
+            measure(name, export_questions, questions, os.path.join(workdir, name))
+        measure("backup.jsonl.gz (sharded)",
+                lambda q, p: export_questions(q, p, shard=True), questions,
+                os.path.join(workdir, "shard.jsonl.gz"))
+
+
+if __name__ == "__main__":
+    main()
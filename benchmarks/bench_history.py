@@ -0,0 +1,69 @@
+"""Player history: unseen-question sampling latency as a player's history grows.
+
+Times a 10-question draw that skips seen questions via the Bloom filter,
+against filtering the same draw through a scan of the player's history.
+
+Usage: python benchmarks/bench_history.py [max_answers] [num_questions]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from player_history import PlayerHistory
+from question_store import QuestionStore, id_value, question_id
+from synthetic import make_bank
+
+DRAWS = 200
+
+
+def main():
+    max_answers = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    num_questions = int(sys.argv[2]) if len(sys.argv) > 2 else 500_000
+    store = QuestionStore(make_bank(num_questions))
+    rng = random.Random(17)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        history = PlayerHistory(os.path.join(workdir, "history.log"))
+        print(f"{num_questions:,} questions")
+        print(f"{'answers':>9}  {'flush':>7}  {'reload':>7}  {'bloom draw':>11}  {'scan draw':>11}")
+        answered = 0
+        size = 1_000
+        while size <= max_answers:
+            for position in rng.sample(range(len(store)), size - answered):
+                history.record("player", store.question_dict(position), rng.random() < 0.7)
+            answered = size
+            start = time.perf_counter()
+            history.flush()
+            flush = time.perf_counter() - start
+
+            start = time.perf_counter()
+            PlayerHistory(history.path)
+            reload = time.perf_counter() - start
+
+            exclude = history.seen_test("player", store)
+            start = time.perf_counter()
+            for _ in range(DRAWS):
+                store.sample(None, None, 10, rng, exclude=exclude)
+            bloom_us = (time.perf_counter() - start) / DRAWS * 1e6
+
+            # What a history without an index would do: scan every answer.
+            keys = history._keys["player"]
+            scans = 5
+            start = time.perf_counter()
+            for _ in range(scans):
+                drawn = store.sample(None, None, 10, rng)
+                wanted = {id_value(question_id(question)) for question in drawn}
+                any(key in wanted for key in keys)
+            scan_us = (time.perf_counter() - start) / scans * 1e6
+
+            print(f"{size:>9,}  {flush:>6.2f}s  {reload:>6.2f}s  "
+                  f"{bloom_us:>8.0f} µs  {scan_us:>8.0f} µs")
+            size *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Single-question edit latency: journal append versus full-bank rewrite.
+
+Usage: python benchmarks/bench_journal_edits.py [max_questions]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_journal import add_op, open_bank
+from synthetic import make_bank, make_question
+
+EDITS = 50
+
+
+def main():
+    max_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    sizes = []
+    size = 1_000
+    while size <= max_questions:
+        sizes.append(size)
+        size *= 10
+
+    rng = random.Random(1)
+    print(f"{'bank size':>10}  {'journal append':>16}  {'full rewrite':>14}")
+    for size in sizes:
+        questions = make_bank(size)
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, "questions.json")
+            with open(path, "w") as f:
+                json.dump(questions, f, indent=2)
+            bank = open_bank(path)
+
+            start = time.perf_counter()
+            for _ in range(EDITS):
+                bank.append(add_op("Science", "easy", make_question(rng)))
+            journal_ms = (time.perf_counter() - start) / EDITS * 1000
+
+            rewrites = 3
+            start = time.perf_counter()
+            for _ in range(rewrites):
+                with open(path, "w") as f:
+                    json.dump(questions, f, indent=2)
+            rewrite_ms = (time.perf_counter() - start) / rewrites * 1000
+
+        print(f"{size:>10,}  {journal_ms:>13.2f} ms  {rewrite_ms:>11.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Leaderboard rank and top-K latency over millions of games.
+
+Builds a ``Leaderboard`` from synthetic games spread over the last 30 days,
+then times adding a game, ranking a score and reading a top 10 on the
+overall board in each window, and expiring an hour's worth of games from
+the daily and weekly boards. For comparison, the same rank query runs on
+a plain sorted list (insort to add, bisect to rank) and as a ``COUNT(*)``
+over SQLite's score index.
+
+Usage: python benchmarks/bench_leaderboard.py [num_games]
+"""
+import os
+import random
+import sqlite3
+import sys
+import time
+from bisect import bisect_left, insort
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leaderboard import TIMESTAMP_FORMAT, Leaderboard, pack
+from synthetic import DEFAULT_CATEGORIES, DEFAULT_DIFFICULTIES
+
+QUERIES = 2_000
+DAYS = 30
+
+
+def per_call_us(function, calls: int = QUERIES) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def board_bytes(board: Leaderboard) -> int:
+    """Memory held by the ranked key blocks and expiry heaps (timestamps are shared)."""
+    total = 0
+    for ranked in board._boards.values():
+        total += sys.getsizeof(ranked._blocks) + sum(sys.getsizeof(block) for block in ranked._blocks)
+    for heap in board._expiry.values():
+        total += sys.getsizeof(heap) + sum(sys.getsizeof(item) for item in heap)
+    return total
+
+
+def make_games(count: int, now: float, rng: random.Random):
+    """Games ordered by time, as the score log holds them."""
+    ages = sorted((rng.random() * DAYS * 86400 for _ in range(count)), reverse=True)
+    return [(seq, rng.randrange(150), rng.choice(DEFAULT_CATEGORIES),
+             rng.choice(DEFAULT_DIFFICULTIES), time.strftime(TIMESTAMP_FORMAT, time.localtime(now - age)))
+            for seq, age in enumerate(ages, 1)]
+
+
+def main():
+    num_games = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(1)
+    now = [time.time()]
+    games = make_games(num_games, now[0], rng)
+
+    start = time.perf_counter()
+    board = Leaderboard(games, clock=lambda: now[0])
+    build_s = time.perf_counter() - start
+    memory = board_bytes(board)
+    sizes = {window: board.size(window=window) for window in ("all", "weekly", "daily")}
+    print(f"{num_games:,} games over {DAYS} days: built in {build_s:.2f} s, {memory / 2 ** 20:.0f} MiB; "
+          + ", ".join(f"{window} {size:,}" for window, size in sizes.items()))
+
+    seq = [num_games]
+    stamp = time.strftime(TIMESTAMP_FORMAT, time.localtime(now[0]))
+
+    def add():
+        seq[0] += 1
+        board.add(seq[0], rng.randrange(150), rng.choice(DEFAULT_CATEGORIES), "easy", stamp)
+
+    print(f"{'add one game':>24}  {per_call_us(add):>8.1f} µs")
+    for window in ("all", "weekly", "daily"):
+        rank = per_call_us(lambda: board.rank(rng.randrange(150), window=window))
+        top = per_call_us(lambda: board.top(10, window=window))
+        print(f"{window:>10} rank  {rank:>8.1f} µs   top 10  {top:>6.1f} µs")
+
+    expired = board.size(window="weekly")
+    now[0] += 3600
+    start = time.perf_counter()
+    board.size(window="weekly")
+    board.size(window="daily")
+    expire_ms = (time.perf_counter() - start) * 1e3
+    expired -= board.size(window="weekly")
+    print(f"{'expire one hour':>24}  {expire_ms:>8.1f} ms ({expired:,} games off the weekly board)")
+
+    print()
+    print("baselines, overall all-time board:")
+    keys = sorted(pack(score, seq) for seq, score, *_ in games)
+    sorted_add = per_call_us(lambda: insort(keys, pack(rng.randrange(150), len(keys) + 1)), 200)
+    sorted_rank = per_call_us(lambda: bisect_left(keys, pack(rng.randrange(150), 0)))
+    print(f"{'sorted list':>24}  add {sorted_add:>8.1f} µs   rank {sorted_rank:>6.1f} µs")
+
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE scores (seq INTEGER PRIMARY KEY, score INTEGER NOT NULL)")
+    db.execute("CREATE INDEX scores_overall ON scores (score DESC, seq)")
+    db.executemany("INSERT INTO scores VALUES (?, ?)", ((seq, score) for seq, score, *_ in games))
+    count = "SELECT COUNT(*) FROM scores WHERE score > ?"
+    sqlite_rank = per_call_us(lambda: db.execute(count, (rng.randrange(150),)).fetchone(), 200)
+    print(f"{'sqlite COUNT(*)':>24}  {'':>16}   rank {sqlite_rank:>6.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Compare retained memory of the plain-dict bank against QuestionStore.
+
+Usage: python benchmarks/bench_memory.py [num_questions]
+"""
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_store import QuestionStore
+from synthetic import make_bank
+
+
+def retained_bytes(build) -> int:
+    """Return the bytes still allocated after ``build()`` returns its result."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main():
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    text = json.dumps(make_bank(num_questions))
+
+    dict_bytes = retained_bytes(lambda: json.loads(text))
+    store_bytes = retained_bytes(lambda: QuestionStore(json.loads(text)))
+
+    print(f"Questions:          {num_questions}")
+    print(f"dict bank:          {dict_bytes / num_questions:8.1f} bytes/question")
+    print(f"QuestionStore:      {store_bytes / num_questions:8.1f} bytes/question")
+    print(f"Reduction:          {100 * (1 - store_bytes / dict_bytes):8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
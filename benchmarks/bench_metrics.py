@@ -0,0 +1,116 @@
+"""Instrumentation overhead on the quiz-drawing hot path.
+
+Times the ``timed`` wrapper alone around an empty function, then
+``get_questions_for_quiz`` undecorated, with metrics disabled and with
+metrics enabled, and prints the Prometheus text for the enabled run.
+
+The three draw modes run interleaved in many short rounds, in a rotating
+order. Each round's overhead is taken against the undecorated run of the
+same round, and the median is reported with the interquartile range.
+
+Usage: python benchmarks/bench_metrics.py [num_questions]
+"""
+import contextlib
+import gc
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import timeit
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+from quiz_game import QuizGame
+from synthetic import make_bank
+
+CALLS = 2_000
+ROUNDS = 51
+
+
+def per_call_us(draw, rng: random.Random) -> float:
+    rng.seed(0)  # the same draws in every mode
+    gc.collect()
+    gc.disable()  # a collection would land on whichever mode triggers it
+    try:
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            draw("Science", "easy", 10, rng=rng)
+        return (time.perf_counter() - start) / CALLS * 1e6
+    finally:
+        gc.enable()
+
+
+def wrapper_ns() -> Dict[str, float]:
+    """Per-call cost of an empty function, bare and wrapped, in nanoseconds."""
+    def empty():
+        pass
+    wrapped = metrics.timed("empty")(empty)
+    timings = {}
+    for name, enabled, function in (("bare", False, empty), ("disabled", False, wrapped),
+                                    ("enabled", True, wrapped)):
+        metrics.REGISTRY.enabled = enabled
+        timings[name] = min(timeit.repeat(function, number=200_000, repeat=5)) / 200_000 * 1e9
+    metrics.REGISTRY.reset()
+    return timings
+
+
+def spread(values: List[float]) -> Tuple[float, float, float]:
+    """Median and interquartile range of ``values``."""
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return ordered[last // 2], ordered[last // 4], ordered[last * 3 // 4]
+
+
+def main():
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as workdir:
+        previous = os.getcwd()
+        os.chdir(workdir)
+        try:
+            with open("questions.json", "w") as f:
+                json.dump(make_bank(num_questions), f)
+            with contextlib.redirect_stdout(io.StringIO()):
+                game = QuizGame()
+        finally:
+            os.chdir(previous)
+
+    overhead = wrapper_ns()
+    undecorated = QuizGame.get_questions_for_quiz.__wrapped__.__get__(game)
+    # Interleave the modes in short rounds and rotate their order, so drift
+    # in machine load and cache warmth does not land on one mode only.
+    rng = random.Random()
+    modes = [("undecorated", False, undecorated),
+             ("disabled", False, game.get_questions_for_quiz),
+             ("enabled", True, game.get_questions_for_quiz)]
+    times: Dict[str, List[float]] = {name: [] for name, _, _ in modes}
+    for round_number in range(ROUNDS):
+        shift = round_number % len(modes)
+        for name, enabled, draw in modes[shift:] + modes[:shift]:
+            metrics.REGISTRY.enabled = enabled
+            times[name].append(per_call_us(draw, rng))
+    metrics.REGISTRY.enabled = True
+
+    print(f"empty function:   {overhead['bare']:7.0f} ns bare, "
+          f"{overhead['disabled']:.0f} ns with metrics disabled, "
+          f"{overhead['enabled']:.0f} ns enabled")
+    print(f"{num_questions:,} questions, 10-question draws, "
+          f"median [IQR] of {ROUNDS} rounds of {CALLS:,} calls")
+    median, low, high = spread(times["undecorated"])
+    print(f"undecorated:      {median:7.2f} µs [{low:.2f}, {high:.2f}]")
+    for name in ("disabled", "enabled"):
+        median, low, high = spread(times[name])
+        diff, diff_low, diff_high = spread([mode - raw for mode, raw in
+                                            zip(times[name], times["undecorated"])])
+        print(f"metrics {name + ':':10s}{median:7.2f} µs [{low:.2f}, {high:.2f}], "
+              f"overhead {diff:+.2f} µs [{diff_low:+.2f}, {diff_high:+.2f}]")
+    print()
+    print(metrics.REGISTRY.prometheus(), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Near-duplicate index: build time, query latency and recall.
+
+Queries are reworded copies of indexed questions (a word changed, options
+shuffled) and fresh questions that should not match.
+
+Usage: python benchmarks/bench_near_duplicates.py [num_questions]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from near_duplicates import NearDuplicateIndex, np
+from synthetic import make_bank, make_question
+
+QUERIES = 2_000
+
+
+def reword(rng: random.Random, question):
+    words = question["question"].split()
+    words[rng.randrange(len(words))] = "famous"
+    options = list(question["options"])
+    rng.shuffle(options)
+    return {**question, "question": " ".join(words), "options": options}
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+def main():
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    questions = make_bank(num_questions)
+    flat = [question for difficulties in questions.values()
+            for items in difficulties.values() for question in items]
+    print(f"{num_questions:,} questions (NumPy {'on' if np is not None else 'off'})")
+
+    start = time.perf_counter()
+    index = NearDuplicateIndex.from_bank(questions)
+    build = time.perf_counter() - start
+    print(f"build: {build:.1f}s ({num_questions / build:,.0f} questions/s)")
+
+    rng = random.Random(7)
+    for name, queries, expect_match in (
+        ("reworded", [reword(rng, rng.choice(flat)) for _ in range(QUERIES)], True),
+        ("fresh", [make_question(rng) for _ in range(QUERIES)], False),
+    ):
+        latencies = []
+        hits = 0
+        for query in queries:
+            start = time.perf_counter()
+            hits += bool(index.query(query, limit=1))
+            latencies.append((time.perf_counter() - start) * 1000)
+        rate = hits / len(queries) * 100
+        print(f"{name:>9} queries: p50 {percentile(latencies, 50):.2f} ms, "
+              f"p99 {percentile(latencies, 99):.2f} ms, "
+              f"{'recall' if expect_match else 'false positives'} {rate:.1f}%")
+
+    start = time.perf_counter()
+    for _ in range(QUERIES):
+        index.add(make_question(rng))
+    print(f"incremental add: {(time.perf_counter() - start) / QUERIES * 1000:.2f} ms/question")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Question ids: id -> question lookups versus scanning the bank.
+
+Half the synthetic questions carry a stored ``id`` and half fall back to
+their content key, as in a bank saved before ids existed.
+
+Usage: python benchmarks/bench_question_ids.py [num_questions]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_store import QuestionStore, assign_id, question_id
+from synthetic import make_bank
+
+LOOKUPS = 10_000
+
+
+def main():
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    bank = make_bank(num_questions)
+    questions = [question for difficulties in bank.values()
+                 for items in difficulties.values() for question in items]
+    for question in questions[::2]:
+        assign_id(question)
+    store = QuestionStore(bank)
+    print(f"{num_questions:,} questions")
+
+    start = time.perf_counter()
+    store.find("")
+    print(f"id index build: {time.perf_counter() - start:.2f}s")
+
+    rng = random.Random(18)
+    wanted = [question_id(questions[rng.randrange(len(questions))]) for _ in range(LOOKUPS)]
+    start = time.perf_counter()
+    for key in wanted:
+        store.find(key)
+    indexed_us = (time.perf_counter() - start) / LOOKUPS * 1e6
+
+    scans = 3
+    start = time.perf_counter()
+    for key in wanted[:scans]:
+        next(i for i, question in enumerate(questions) if question_id(question) == key)
+    scan_ms = (time.perf_counter() - start) / scans * 1000
+    print(f"lookup: {indexed_us:.2f} µs by id, {scan_ms:.0f} ms by scanning the bank")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Seeded quiz generation: throughput across threads and reproducibility.
+
+Each session draws its quizzes from its own ``random.Random(seed)``; the run
+is repeated with more threads and must produce identical quizzes.
+
+Usage: python benchmarks/bench_quiz_generation.py [num_questions] [sessions]
+"""
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_store import QuestionStore, question_id
+from synthetic import make_bank
+
+QUIZZES_PER_SESSION = 20
+
+
+def session_quizzes(store: QuestionStore, seed: int):
+    rng = random.Random(seed)
+    categories = store.categories()
+    return [tuple(question_id(question) for question in
+                  store.sample(rng.choice(categories), None, 10, rng))
+            for _ in range(QUIZZES_PER_SESSION)]
+
+
+def main():
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    store = QuestionStore(make_bank(num_questions))
+    store.find("")  # build the id index before timing
+
+    baseline = None
+    print(f"{'threads':>7}  {'quizzes/s':>10}  {'identical':>9}")
+    for threads in (1, 4, 16):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            quizzes = list(executor.map(lambda seed: session_quizzes(store, seed), range(sessions)))
+        rate = sessions * QUIZZES_PER_SESSION / (time.perf_counter() - start)
+        baseline = baseline or quizzes
+        print(f"{threads:>7}  {rate:>10,.0f}  {str(quizzes == baseline):>9}")
+
+
+if __name__ == "__main__":
+    main()
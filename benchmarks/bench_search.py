@@ -0,0 +1,63 @@
+"""Question search: inverted index versus a linear scan of the bank.
+
+Usage: python benchmarks/bench_search.py [num_questions]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import SearchIndex, build_data, open_search, tokenize
+from synthetic import make_bank
+
+QUERIES = ["anc riv", "planet", "galaxy orbit", "qu", "treaty dynasty king"]
+
+
+def linear_search(questions, query):
+    terms = tokenize(query)
+    found = 0
+    for difficulties in questions.values():
+        for items in difficulties.values():
+            for question in items:
+                words = tokenize(" ".join([question["question"], *question["options"],
+                                           question.get("explanation") or ""]))
+                if all(any(word.startswith(term) for word in words) for term in terms):
+                    found += 1
+    return found
+
+
+def main():
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    questions = make_bank(num_questions)
+    print(f"{num_questions:,} questions")
+
+    start = time.perf_counter()
+    data = build_data(questions, [0, 0, 0])
+    print(f"build: {time.perf_counter() - start:.2f}s")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        store = open_search(os.path.join(workdir, "questions.json"))
+        start = time.perf_counter()
+        store.update(lambda _: data)
+        print(f"save:  {time.perf_counter() - start:.2f}s "
+              f"({os.path.getsize(store.path) / 1e6:.0f} MB)")
+        start = time.perf_counter()
+        index = SearchIndex(store.read()[0])
+        print(f"load:  {time.perf_counter() - start:.2f}s")
+
+    print(f"{'query':>22}  {'matches':>8}  {'index':>9}  {'scan':>9}")
+    for query in QUERIES:
+        start = time.perf_counter()
+        total, _ = index.search(query)
+        indexed = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        scanned = linear_search(questions, query)
+        scan = (time.perf_counter() - start) * 1000
+        assert scanned == total, (query, scanned, total)
+        print(f"{query:>22}  {total:>8,}  {indexed:>6.1f} ms  {scan:>6.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
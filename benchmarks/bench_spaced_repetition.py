@@ -0,0 +1,85 @@
+"""Spaced repetition: memory per review item and the cost of scheduling.
+
+Fills review decks with random SM-2 state, then times ``next_due`` plus a
+review (the work done per quiz question) over the whole deck and over a
+tenth of the bank, as a category quiz draws, against a linear scan for the
+most overdue item, and the review of a question new to the deck.
+
+Usage: python benchmarks/bench_spaced_repetition.py [max_items]
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spaced_repetition import INITIAL_EASINESS, MINUTES_PER_DAY, QUALITY_CORRECT, ReviewDeck
+
+NOW = 29_000_000
+REVIEWS = 5_000
+
+
+def random_items(rng, count, bank_size):
+    for position in rng.sample(range(bank_size), count):
+        interval = rng.choice((1, 6, 15, 40, 100))
+        due = NOW + rng.randrange(-30, interval) * MINUTES_PER_DAY
+        yield position, INITIAL_EASINESS, interval, rng.randrange(5), due
+
+
+def main():
+    max_items = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sizes = []
+    size = 10_000
+    while size <= max_items:
+        sizes.append(size)
+        size *= 10
+
+    print(f"{'items':>10}  {'load':>7}  {'bytes/item':>10}  {'next+review':>12}  "
+          f"{'category':>12}  {'new item':>12}  {'linear next':>12}")
+    for size in sizes:
+        rng = random.Random(16)
+        items = list(random_items(rng, size, size * 2))
+        tracemalloc.start()
+        start = time.perf_counter()
+        deck = ReviewDeck()
+        deck.load(items)
+        load = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del items
+
+        start = time.perf_counter()
+        for _ in range(REVIEWS):
+            position = deck.next_due(NOW)
+            deck.review(position, QUALITY_CORRECT, NOW)
+        scheduled_us = (time.perf_counter() - start) / REVIEWS * 1e6
+
+        category = (0, size * 2 // 10)
+        start = time.perf_counter()
+        for _ in range(REVIEWS):
+            position = deck.next_due(NOW, *category)
+            if position is None:
+                break
+            deck.review(position, QUALITY_CORRECT, NOW)
+        category_us = (time.perf_counter() - start) / REVIEWS * 1e6
+
+        start = time.perf_counter()
+        for position in range(size * 2, size * 2 + REVIEWS):
+            deck.review(position, QUALITY_CORRECT, NOW)
+        new_us = (time.perf_counter() - start) / REVIEWS * 1e6
+
+        scans = 10
+        start = time.perf_counter()
+        for _ in range(scans):
+            min(range(len(deck)), key=deck.due.__getitem__)
+        linear_us = (time.perf_counter() - start) / scans * 1e6
+
+        print(f"{size:>10,}  {load:>6.2f}s  {memory / size:>10.1f}  "
+              f"{scheduled_us:>9.1f} µs  {category_us:>9.1f} µs  {new_us:>9.1f} µs  "
+              f"{linear_us:>9.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
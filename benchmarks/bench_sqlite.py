@@ -0,0 +1,136 @@
+"""JSON files versus SQLite: opening the bank, edits, draws and leaderboards.
+
+For each bank size the same questions are stored as questions.json (with
+its compiled cache) and in a SQLite database, and the benchmark times
+opening a store to draw from, journaling one edit and drawing a
+10-question quiz. It then records many finished games in the high-score
+log and in the database and times one more game and a top-10 query.
+
+Usage: python benchmarks/bench_sqlite.py [max_questions] [num_scores]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compiled_bank import CompiledBank, compile_bank
+from question_journal import add_op, open_bank
+from question_store import QuestionStore, assign_id
+from score_store import ScoreStore
+from sqlite_store import SQLiteBank, SQLiteQuestionStore, SQLiteScores
+from synthetic import DEFAULT_CATEGORIES, DEFAULT_DIFFICULTIES, make_bank, make_question
+
+EDITS = 50
+DRAWS = 2_000
+
+
+def best_ms(function, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1e3
+
+
+def per_call_us(function, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def bench_bank(size: int, workdir: str, rng: random.Random):
+    questions = make_bank(size)
+    for buckets in questions.values():
+        for items in buckets.values():
+            for question in items:
+                assign_id(question)
+    source = os.path.join(workdir, "questions.json")
+    compiled = os.path.join(workdir, "questions.qbank")
+    database = os.path.join(workdir, "quiz.db")
+    with open(source, "w") as f:
+        json.dump(questions, f)
+    compile_bank(source, compiled)
+    sqlite_bank = SQLiteBank(database)
+    sqlite_bank.write(questions, None)
+
+    def parse():
+        with open(source) as f:
+            QuestionStore(json.load(f))
+
+    open_json = best_ms(parse)
+    open_compiled = best_ms(lambda: CompiledBank(compiled))
+    open_sqlite = best_ms(lambda: SQLiteQuestionStore(database))
+
+    json_bank = open_bank(source)
+    edits = [add_op("Science", "easy", make_question(rng)) for _ in range(EDITS)]
+    edit_json = per_call_us(lambda: json_bank.append(edits.pop()), EDITS) / 1e3
+    edits = [add_op("Science", "easy", make_question(rng)) for _ in range(EDITS)]
+    edit_sqlite = per_call_us(lambda: sqlite_bank.append(edits.pop()), EDITS) / 1e3
+
+    compiled_store = CompiledBank(compiled)
+    sqlite_store = SQLiteQuestionStore(database)
+    draw_compiled = per_call_us(lambda: compiled_store.sample("Science", "easy", 10, rng), DRAWS)
+    draw_sqlite = per_call_us(lambda: sqlite_store.sample("Science", "easy", 10, rng), DRAWS)
+
+    print(f"{size:>10,}  {open_json:>7.1f}  {open_compiled:>7.1f}  {open_sqlite:>7.1f}  "
+          f"{edit_json:>7.2f}  {edit_sqlite:>7.2f}  {draw_compiled:>7.0f}  {draw_sqlite:>7.0f}")
+
+
+def bench_scores(num_scores: int, workdir: str, rng: random.Random):
+    records = [{"name": f"player{index}", "score": rng.randrange(100),
+                "category": rng.choice(DEFAULT_CATEGORIES),
+                "difficulty": rng.choice(DEFAULT_DIFFICULTIES)}
+               for index in range(num_scores)]
+    log = os.path.join(workdir, "high_scores.log")
+    with open(log, "w") as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+    database = os.path.join(workdir, "quiz.db")
+    SQLiteScores(database).add_many(records)
+
+    index = os.path.join(workdir, "high_scores.idx")
+    open_log = best_ms(lambda: ScoreStore(log, index, checkpoint_every=num_scores + 1), repeat=1)
+    open_db = best_ms(lambda: SQLiteScores(database))
+    log_scores = ScoreStore(log, index)
+    db_scores = SQLiteScores(database)
+    game = {"name": "bench", "score": 50, "category": "Science", "difficulty": "easy"}
+    add_log = per_call_us(lambda: log_scores.add(dict(game)), EDITS)
+    add_db = per_call_us(lambda: db_scores.add(dict(game)), EDITS)
+    top_log = per_call_us(lambda: log_scores.top("Science", "easy"), DRAWS)
+    top_db = per_call_us(lambda: db_scores.top("Science", "easy"), DRAWS)
+
+    print(f"{num_scores:,} scores{'':>6}{'log':>10}  {'sqlite':>10}")
+    print(f"{'open':>20}  {open_log:>7.1f} ms  {open_db:>7.1f} ms")
+    print(f"{'add one game':>20}  {add_log:>7.0f} µs  {add_db:>7.0f} µs")
+    print(f"{'top 10 of a board':>20}  {top_log:>7.1f} µs  {top_db:>7.1f} µs")
+
+
+def main():
+    max_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    num_scores = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    sizes = []
+    size = 1_000
+    while size <= max_questions:
+        sizes.append(size)
+        size *= 10
+
+    rng = random.Random(1)
+    print(f"{'':>10}  {'open store (ms)':^25}  {'one edit (ms)':^16}  {'draw 10 (µs)':^16}")
+    print(f"{'questions':>10}  {'json':>7}  {'qbank':>7}  {'sqlite':>7}  {'journal':>7}  "
+          f"{'sqlite':>7}  {'qbank':>7}  {'sqlite':>7}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            bench_bank(size, workdir, rng)
+    print()
+    with tempfile.TemporaryDirectory() as workdir:
+        bench_scores(num_scores, workdir, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Time from launching quiz_game.py to its main menu, with and without the bank cache.
+
+For each bank size the game is started as a real process three times: cold
+(no questions.qbank yet, so the JSON is parsed and the cache written), warm
+(the cache is mapped) and after a ``touch`` of questions.json (the mtime no
+longer matches, so the content hash is checked). Module import time comes
+from ``python -X importtime``.
+
+Usage: python benchmarks/bench_startup.py [max_questions]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import make_bank
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GAME = os.path.join(ROOT, "quiz_game.py")
+
+
+def time_to_menu(workdir: str) -> float:
+    """Seconds from spawning the game until it prints the main menu."""
+    env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+    start = time.perf_counter()
+    game = subprocess.Popen([sys.executable, GAME], cwd=workdir, env=env, text=True,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    game.stdin.write("bench\n")
+    game.stdin.flush()
+    try:
+        for line in game.stdout:
+            if "MAIN MENU" in line:
+                return time.perf_counter() - start
+        raise RuntimeError("the game exited before showing its menu")
+    finally:
+        game.kill()
+        game.wait()
+
+
+def import_times(top: int = 6):
+    """Total and slowest cumulative import times of quiz_game, in ms."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import quiz_game"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1000, name.strip()))
+    total = next(ms for ms, name in rows if name == "quiz_game")
+    return total, sorted(rows, reverse=True)[1:top + 1]
+
+
+def main():
+    max_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    sizes = []
+    size = 1_000
+    while size <= max_questions:
+        sizes.append(size)
+        size *= 10
+
+    import_times()  # warm the bytecode caches
+    total, slowest = import_times()
+    print(f"import quiz_game: {total:.1f} ms; slowest: "
+          + ", ".join(f"{name} {ms:.1f}" for ms, name in slowest))
+    print()
+    print(f"{'questions':>10}  {'cold':>9}  {'warm':>9}  {'touched':>9}  {'speedup':>7}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            source = os.path.join(workdir, "questions.json")
+            with open(source, "w") as f:
+                json.dump(make_bank(size), f)
+            cold = time_to_menu(workdir)
+            warm = min(time_to_menu(workdir) for _ in range(3))
+            os.utime(source)
+            touched = time_to_menu(workdir)
+        print(f"{size:>10,}  {cold * 1e3:>6.0f} ms  {warm * 1e3:>6.0f} ms  "
+              f"{touched * 1e3:>6.0f} ms  {cold / warm:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Benchmark suite for the game's and the question manager's hot paths.
+
+For every bank size a synthetic ``questions.json`` is written to a temporary
+directory and the same entry points the menus use are timed there:
+
+* ``load_questions`` and ``QuizGame()`` start-up
+* ``get_questions_for_quiz`` for every category (and Random Mix) with every
+  difficulty (and mixed)
+* ``save_score``
+* ``save_questions``, ``import_questions`` and ``view_statistics``
+
+Menu output is discarded and prompts are answered automatically. Results are
+written as JSON; pass a previous run as ``--baseline`` to add each timing's
+ratio to it, so regressions between releases stand out.
+
+Usage: python benchmarks/bench_suite.py [--sizes 1000,100000] [--categories 5]
+           [--difficulties easy,medium,hard] [--repeat 5] [--output results.json]
+           [--baseline previous.json]
+"""
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_export import export_questions
+from question_manager import QuestionManager
+from quiz_game import QuizGame
+from synthetic import DEFAULT_DIFFICULTIES, category_names, make_bank
+
+QUIZ_LENGTH = 10
+
+
+@contextlib.contextmanager
+def quiet(answers: Optional[List[str]] = None):
+    """Discard printed output and answer ``input`` prompts from ``answers``."""
+    replies = iter(answers or [])
+    original = builtins.input
+    builtins.input = lambda prompt="": next(replies, "")
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        builtins.input = original
+
+
+def timed(run: Callable[[], None], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict:
+    """Time ``run`` ``repeat`` times, calling ``setup`` untimed before each run."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"runs": repeat, "min_ms": min(samples), "median_ms": statistics.median(samples),
+            "mean_ms": statistics.fmean(samples)}
+
+
+def bench_size(size: int, categories: List[str], difficulties: List[str], repeat: int) -> Dict:
+    bank = make_bank(size, categories, difficulties)
+    import_bank = make_bank(max(1, size // 10), categories, difficulties, seed=1)
+    timings: Dict[str, Dict] = {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        previous = os.getcwd()
+        os.chdir(workdir)
+        try:
+            with open("questions.json", "w") as f:
+                json.dump(bank, f, indent=2)
+            shutil.copy("questions.json", "pristine.json")
+            export_questions(import_bank, "import.jsonl")
+            del bank, import_bank
+
+            with quiet():
+                timings["game_start"] = timed(QuizGame, repeat)
+                game = QuizGame()
+                timings["load_questions"] = timed(game.load_questions, repeat)
+                for category in [*categories, "Random Mix"]:
+                    for difficulty in [*difficulties, "mixed"]:
+                        timings[f"get_questions_for_quiz[{category}/{difficulty}]"] = timed(
+                            lambda: game.get_questions_for_quiz(category, difficulty, QUIZ_LENGTH),
+                            repeat)
+
+                game.session.user_name = "bench"
+                game.session.current_category = categories[0]
+                game.session.current_difficulty = difficulties[0]
+                game.session.score = 10
+                timings["save_score"] = timed(game.save_score, repeat * 20)
+
+                manager = QuestionManager()
+                timings["save_questions"] = timed(manager.save_questions, repeat)
+                timings["view_statistics"] = timed(manager.view_statistics, repeat)
+
+            holder = {}
+
+            def fresh_manager():
+                shutil.copy("pristine.json", "questions.json")
+                for leftover in ("questions.json.journal", "questions.json.search"):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+                with quiet():
+                    holder["manager"] = QuestionManager()
+
+            def run_import():
+                with quiet(["import.jsonl", "y"]):
+                    holder["manager"].import_questions()
+
+            timings["import_questions"] = timed(run_import, repeat, setup=fresh_manager)
+        finally:
+            os.chdir(previous)
+
+    return {"size": size, "categories": len(categories), "difficulties": difficulties,
+            "import_size": max(1, size // 10), "timings": timings}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict, baseline: Dict):
+    """Add ``baseline_ms`` and ``ratio`` (now / then, by median) to matching timings."""
+    previous = {run["size"]: run["timings"] for run in baseline.get("runs", [])}
+    for run in results["runs"]:
+        for name, timing in run["timings"].items():
+            old = previous.get(run["size"], {}).get(name)
+            if old and old["median_ms"] > 0:
+                timing["baseline_ms"] = old["median_ms"]
+                timing["ratio"] = timing["median_ms"] / old["median_ms"]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Time the quiz's hot paths on synthetic banks.")
+    parser.add_argument("--sizes", default="1000,100000",
+                        help="comma-separated bank sizes (default: 1000,100000)")
+    parser.add_argument("--categories", type=int, default=5, help="number of categories")
+    parser.add_argument("--difficulties", default=",".join(DEFAULT_DIFFICULTIES),
+                        help="comma-separated difficulty names")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per timing")
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    args = parser.parse_args(argv)
+
+    categories = category_names(args.categories)
+    difficulties = [name.strip() for name in args.difficulties.split(",") if name.strip()]
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "runs": [],
+    }
+    for size in (int(size) for size in args.sizes.split(",")):
+        print(f"Benchmarking {size:,} questions...", file=sys.stderr)
+        results["runs"].append(bench_size(size, categories, difficulties, args.repeat))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
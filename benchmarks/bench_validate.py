@@ -0,0 +1,51 @@
+"""Bank validation throughput by number of worker processes.
+
+The last row adds the opt-in near-duplicate pass, with every worker.
+
+Usage: python benchmarks/bench_validate.py [num_questions]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bank_validator import validate
+from synthetic import make_bank
+
+
+def main():
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    questions = make_bank(num_questions)
+    # Plant a few problems so every check has something to report.
+    questions["Science"]["easy"][0]["correct"] = 7
+    questions["History"]["hard"].append(dict(questions["Sports"]["easy"][0]))
+    reworded = dict(questions["Sports"]["easy"][1])
+    reworded["question"] = reworded["question"].rstrip("?") + " exactly?"
+    questions["Sports"]["medium"].append(reworded)
+
+    workers = [1]
+    while workers[-1] * 2 <= (os.cpu_count() or 1):
+        workers.append(workers[-1] * 2)
+
+    print(f"{num_questions:,} questions")
+    print(f"{'workers':>8}  {'seconds':>8}  {'questions/s':>12}  {'speedup':>8}")
+    baseline = None
+    for count in workers:
+        start = time.perf_counter()
+        report = validate(questions, workers=count)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{count:>8}  {elapsed:>8.2f}  {num_questions / elapsed:>12,.0f}  "
+              f"{baseline / elapsed:>7.2f}x")
+    start = time.perf_counter()
+    report = validate(questions, workers=workers[-1], fuzzy=True)
+    elapsed = time.perf_counter() - start
+    print(f"{'fuzzy':>8}  {elapsed:>8.2f}  {num_questions / elapsed:>12,.0f}  "
+          f"{baseline / elapsed:>7.2f}x")
+    print(f"errors={report['errors']} warnings={report['warnings']} "
+          f"duplicates={len(report['duplicates'])} near_duplicates={len(report['near_duplicates'])}")
+
+
+if __name__ == "__main__":
+    main()
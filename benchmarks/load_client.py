@@ -0,0 +1,110 @@
+"""Load generator for quiz_server.py.
+
+Opens many concurrent client sessions, plays each quiz to the end with random
+answers and reports completed sessions per second and answer latency, i.e.
+the time from sending an answer to receiving its result.
+
+With ``--seed`` session ``i`` starts its quiz with seed ``seed + i`` and picks
+its answers from the same seed, so a run can be replayed exactly; the digest
+of every session's question ids is printed to compare runs.
+
+Usage:
+    python quiz_server.py --pause 0 &
+    python benchmarks/load_client.py --sessions 5000 --concurrency 1000 [--seed 1]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from typing import List, Optional
+
+
+async def play(host: str, port: int, questions: int, latencies: List[float],
+               seed: Optional[int] = None) -> List[str]:
+    """Play one quiz to the end; return the ids of the questions asked."""
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def request(message):
+        writer.write(json.dumps(message).encode("utf-8") + b"\n")
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    rng = random.Random(seed)
+    asked = []
+    start = {"op": "start", "name": "load", "category": "Random Mix",
+             "difficulty": "mixed", "count": questions}
+    if seed is not None:
+        start["seed"] = seed
+    try:
+        reply = await request(start)
+        while reply["type"] == "question":
+            asked.append(reply["id"])
+            sent = time.perf_counter()
+            result = await request({"op": "answer",
+                                    "choice": rng.randrange(len(reply["options"]))})
+            latencies.append(time.perf_counter() - sent)
+            if result["type"] != "result":
+                raise RuntimeError(result)
+            reply = json.loads(await reader.readline())
+        if reply["type"] != "final":
+            raise RuntimeError(reply)
+    finally:
+        writer.close()
+    return asked
+
+
+async def run(args) -> int:
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+    failures = 0
+
+    async def bounded(i: int) -> List[str]:
+        nonlocal failures
+        async with semaphore:
+            try:
+                seed = None if args.seed is None else args.seed + i
+                return await play(args.host, args.port, args.questions, latencies, seed)
+            except (OSError, RuntimeError, ValueError):
+                failures += 1
+                return []
+
+    start = time.perf_counter()
+    streams = await asyncio.gather(*(bounded(i) for i in range(args.sessions)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    completed = args.sessions - failures
+
+    def percentile(p: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+
+    print(f"Sessions completed:  {completed}/{args.sessions} ({failures} failed)")
+    print(f"Sessions per second: {completed / elapsed:10.1f}")
+    print(f"Answers:             {len(latencies)}")
+    print(f"Answer latency p50:  {percentile(50):10.2f} ms")
+    print(f"Answer latency p99:  {percentile(99):10.2f} ms")
+    if args.seed is not None:
+        digest = hashlib.sha256(json.dumps(streams).encode("utf-8")).hexdigest()[:16]
+        print(f"Question stream digest: {digest}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate load against quiz_server.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed session i with seed + i to make the run reproducible")
+    args = parser.parse_args()
+    raise SystemExit(1 if asyncio.run(run(args)) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Synthetic question banks for the benchmarks."""
+import random
+from typing import Dict, List, Optional
+
+DEFAULT_CATEGORIES = ["General Knowledge", "Science", "History", "Mathematics", "Sports"]
+DEFAULT_DIFFICULTIES = ["easy", "medium", "hard"]
+
+_WORDS = (
+    "ancient river planet element theory battle empire number angle league "
+    "capital ocean mountain formula energy molecule treaty dynasty season record "
+    "continent island desert volcano orbit galaxy protein enzyme revolution king "
+    "queen champion goal medal prime square triangle equation fraction vector"
+).split()
+
+
+def category_names(count: int) -> List[str]:
+    """The default categories, extended with numbered ones beyond five."""
+    names = DEFAULT_CATEGORIES[:count]
+    names += [f"Category {i}" for i in range(len(names) + 1, count + 1)]
+    return names
+
+
+def make_question(rng: random.Random, num_options: int = 4) -> Dict:
+    """Build one random question in the ``questions.json`` schema."""
+    words = rng.choices(_WORDS, k=rng.randint(6, 12))
+    options = [" ".join(rng.choices(_WORDS, k=rng.randint(1, 3))).title()
+               for _ in range(num_options)]
+    correct = rng.randrange(num_options)
+    return {
+        "question": "Which " + " ".join(words) + "?",
+        "options": options,
+        "correct": correct,
+        "explanation": f"The correct answer is {options[correct]} because of the "
+                       + " ".join(rng.choices(_WORDS, k=rng.randint(5, 10))) + ".",
+    }
+
+
+def make_bank(num_questions: int, categories: Optional[List[str]] = None,
+              difficulties: Optional[List[str]] = None, seed: int = 0) -> Dict:
+    """Build a nested bank of ``num_questions`` spread evenly over every bucket."""
+    categories = categories or DEFAULT_CATEGORIES
+    difficulties = difficulties or DEFAULT_DIFFICULTIES
+    rng = random.Random(seed)
+    bank = {category: {difficulty: [] for difficulty in difficulties} for category in categories}
+    buckets = [(category, difficulty) for category in categories for difficulty in difficulties]
+    for i in range(num_questions):
+        category, difficulty = buckets[i % len(buckets)]
+        bank[category][difficulty].append(make_question(rng))
+    return bank
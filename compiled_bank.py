@@ -0,0 +1,295 @@
+"""Compiled, memory-mappable question bank.
+
+``questions.json`` is compiled once into a binary file that can be mapped
+straight into memory. Only the small header is parsed on open; question text
+stays in the mapped string heap until a question is actually drawn, and the
+mapping is shared through the page cache by every process that opens it.
+
+File layout (little-endian)::
+
+    magic       4s    b"QBNK"
+    version     H
+    reserved    H
+    header_len  I     length of the JSON header that follows
+    header      JSON  source signature, categories, bucket sizes, sparse extras
+    padding           to an 8-byte boundary
+    offsets     Q * (n + 1)  heap offset of every record, plus the heap end
+    ids         Q * n        stable id of every record, 0 if it has none
+    correct     b * n        correct option index of every record
+    heap        per record: H field count, then I length + UTF-8 bytes per
+                field, fields being question, options..., explanation
+
+Records are stored grouped by category and then difficulty, so each
+``(category, difficulty)`` bucket is a contiguous run of the offset table.
+
+Usage: python compiled_bank.py [questions.json] [questions.qbank]
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Sequence, Tuple
+
+import metrics
+from question_journal import open_bank
+from question_store import QuestionStore, _MISSING
+
+MAGIC = b"QBNK"
+VERSION = 2
+DEFAULT_BANK_FILE = "questions.qbank"
+
+_PREFIX = struct.Struct("<4sHHI")
+_OFFSET = struct.Struct("<Q")
+_FIELD_COUNT = struct.Struct("<H")
+_FIELD_LEN = struct.Struct("<I")
+
+
+def source_signature(path: str) -> Dict:
+    """Return the sizes/mtimes used to detect a stale compiled bank.
+
+    Both ``questions.json`` and its edit journal count, since the bank is the
+    one replayed on top of the other.
+    """
+    signature = {}
+    for prefix, part in (("", path), ("journal_", f"{path}.journal")):
+        try:
+            stat = os.stat(part)
+            signature[f"{prefix}size"] = stat.st_size
+            signature[f"{prefix}mtime_ns"] = stat.st_mtime_ns
+        except FileNotFoundError:
+            signature[f"{prefix}size"] = signature[f"{prefix}mtime_ns"] = 0
+    return signature
+
+
+def source_hash(path: str) -> str:
+    """Content hash of ``path`` and its journal.
+
+    Used only when the sizes or mtimes differ, so a bank survives a
+    ``touch``, a copy or a checkout that left the questions as they were.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (path, f"{path}.journal"):
+        try:
+            with open(part, "rb") as f:
+                while True:
+                    chunk = f.read(1 << 20)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+        except FileNotFoundError:
+            pass
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def read_source(source_path: str = "questions.json") -> Tuple[Dict, Dict]:
+    """Return the replayed bank and the signature it was read at, read under one lock."""
+    def probe() -> Dict:
+        signature = source_signature(source_path)
+        signature["hash"] = source_hash(source_path)
+        return signature
+
+    questions, _, signature = open_bank(source_path).read_with(probe, {})
+    return questions, signature
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def compile_bank(source_path: str = "questions.json", bank_path: str = DEFAULT_BANK_FILE) -> int:
+    """Compile a ``questions.json`` bank into the binary format.
+
+    Returns the number of questions written.
+    """
+    questions, signature = read_source(source_path)
+    return write_bank(QuestionStore(questions), signature, bank_path)
+
+
+def write_bank(store: QuestionStore, signature: Dict, bank_path: str = DEFAULT_BANK_FILE) -> int:
+    """Write an already built store, read from a source with ``signature``.
+
+    The output is written to a temporary file and moved into place, so
+    processes that already have the old bank mapped keep reading a
+    consistent file. Raises ``ValueError`` for a store with non-text fields.
+    """
+    count = len(store)
+    extras = {}
+    missing = {}
+    for index, present, absent in store.overrides():
+        if present:
+            extras[str(index)] = present
+        if absent:
+            missing[str(index)] = absent
+
+    header = json.dumps({
+        "source": signature,
+        "categories": store.categories(),
+        "buckets": [[category, difficulty, end - start]
+                    for category, difficulty, start, end in store.buckets()],
+        "extras": extras,
+        "missing": missing,
+    }, separators=(",", ":")).encode("utf-8")
+
+    offsets_at = _align(_PREFIX.size + len(header))
+    tmp_path = f"{bank_path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, "wb") as out:
+            out.write(_PREFIX.pack(MAGIC, VERSION, 0, len(header)))
+            out.write(header)
+            out.write(b"\x00" * (offsets_at - _PREFIX.size - len(header)))
+
+            # Stream the heap into place first, then go back and fill in the
+            # offset table, so only the offsets are held in memory.
+            ids_at = offsets_at + _OFFSET.size * (count + 1)
+            correct_at = ids_at + _OFFSET.size * count
+            heap_at = correct_at + count
+            offsets = array("Q")
+            out.seek(heap_at)
+            position = 0
+            for index in range(count):
+                offsets.append(position)
+                encoded = store.encoded_fields(index)
+                record = bytearray(_FIELD_COUNT.pack(len(encoded)))
+                for data in encoded:
+                    record += _FIELD_LEN.pack(len(data))
+                    record += data
+                out.write(record)
+                position += len(record)
+            offsets.append(position)
+
+            correct, ids = store.columns()
+            ids = array("Q", ids)
+            if sys.byteorder != "little":
+                offsets.byteswap()
+                ids.byteswap()
+            out.seek(offsets_at)
+            out.write(offsets.tobytes())
+            out.write(ids.tobytes())
+            out.write(correct.tobytes())
+        os.replace(tmp_path, bank_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+class CompiledBank(QuestionStore):
+    """A ``QuestionStore`` backed by a memory-mapped compiled bank file."""
+
+    def __init__(self, path: str = DEFAULT_BANK_FILE):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, header_len = _PREFIX.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} compiled question bank")
+        header = json.loads(self._mmap[_PREFIX.size:_PREFIX.size + header_len])
+        self.source = header["source"]
+
+        buckets = []
+        start = 0
+        for category, difficulty, size in header["buckets"]:
+            buckets.append((category, difficulty, start, start + size))
+            start += size
+        self._count = start
+
+        self._offsets_at = _align(_PREFIX.size + header_len)
+        ids_at = self._offsets_at + _OFFSET.size * (self._count + 1)
+        correct_at = ids_at + _OFFSET.size * self._count
+        self._heap_at = correct_at + self._count
+        self._correct = memoryview(self._mmap)[correct_at:self._heap_at].cast("b")
+        if sys.byteorder == "little":
+            self._ids = memoryview(self._mmap)[ids_at:correct_at].cast("Q")
+        else:
+            self._ids = array("Q", self._mmap[ids_at:correct_at])
+            self._ids.byteswap()
+        self._blobs = ()
+
+        self._extras = {int(index): dict(values) for index, values in header["extras"].items()}
+        for index, keys in header["missing"].items():
+            overrides = self._extras.setdefault(int(index), {})
+            for key in keys:
+                overrides[key] = _MISSING
+
+        self._build_index(header["categories"], buckets)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def matches_source(self, source_path: str = "questions.json") -> bool:
+        """Return whether the bank was compiled from the current source file.
+
+        Without a source file or journal the default bank is served, so no
+        compiled bank matches. A bank whose sizes or mtimes are stale but
+        whose content hash matches is restamped with the current ones, so
+        only the first start after a ``touch`` pays for the hash.
+        """
+        if not os.path.exists(source_path) and not os.path.exists(f"{source_path}.journal"):
+            return False
+        # Stat before hashing: an edit made meanwhile leaves a stamp that
+        # no longer matches, never one that hides the edit.
+        signature = source_signature(source_path)
+        if all(self.source.get(key) == value for key, value in signature.items()):
+            return True
+        if "hash" not in self.source or source_hash(source_path) != self.source["hash"]:
+            return False
+        signature["hash"] = self.source["hash"]
+        try:
+            self.restamp(signature)
+        except OSError as e:
+            metrics.count_error("restamp_bank", e)
+        return True
+
+    def restamp(self, signature: Dict):
+        """Rewrite the bank file with a new source signature.
+
+        Only the header changes; the tables and heap are copied from the
+        mapping, and the file is replaced atomically as in ``write_bank``.
+        """
+        _, _, _, header_len = _PREFIX.unpack_from(self._mmap, 0)
+        header = json.loads(self._mmap[_PREFIX.size:_PREFIX.size + header_len])
+        header["source"] = signature
+        encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        offsets_at = _align(_PREFIX.size + len(encoded))
+        tmp_path = f"{self.path}.tmp{os.getpid()}"
+        try:
+            with open(tmp_path, "wb") as out:
+                out.write(_PREFIX.pack(MAGIC, VERSION, 0, len(encoded)))
+                out.write(encoded)
+                out.write(b"\x00" * (offsets_at - _PREFIX.size - len(encoded)))
+                out.write(memoryview(self._mmap)[self._offsets_at:])
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.source = signature
+
+    def _fields(self, index: int) -> Sequence[str]:
+        """Decode one record straight out of the mapped heap."""
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        (start,) = _OFFSET.unpack_from(self._mmap, self._offsets_at + _OFFSET.size * index)
+        position = self._heap_at + start
+        (field_count,) = _FIELD_COUNT.unpack_from(self._mmap, position)
+        position += _FIELD_COUNT.size
+        fields = []
+        for _ in range(field_count):
+            (length,) = _FIELD_LEN.unpack_from(self._mmap, position)
+            position += _FIELD_LEN.size
+            fields.append(self._mmap[position:position + length].decode("utf-8"))
+            position += length
+        return fields
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "questions.json"
+    target = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_BANK_FILE
+    written = compile_bank(source, target)
+    print(f"✅ Compiled {written} questions from {source} into {target}")
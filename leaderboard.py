@@ -0,0 +1,273 @@
+"""Order-statistic leaderboards: ranks, percentiles and top-K by time window.
+
+Every finished game is one entry on the overall board and on its
+``(category, difficulty)`` board, for each window: all time, the last 7
+days (``weekly``) and the last 24 hours (``daily``). A board is a
+``RankedScores``: games packed into ``(points desc, seq asc) -> int`` keys,
+so older games win ties as in the top-10 boards, held in sorted ``array``
+blocks under a Fenwick tree of block sizes. That is a two-level B-tree with
+a positional index: insert, rank of a score and the start of a top-K scan
+cost O(log n) plus a memmove within one block, at about 8 bytes per game
+and board instead of the hundreds a skip-list node costs in Python.
+
+Windowed boards expire incrementally. Each window keeps a heap of
+``(timestamp, key, category, difficulty)`` entries, and every query first
+pops and removes whatever has fallen out of the window, so each game is
+expired exactly once. Timestamps are the score records' local-time
+``"%Y-%m-%d %H:%M:%S"`` strings, which sort in time order and are compared
+without parsing.
+
+Boards hold keys only; the score stores map the sequence numbers in a
+top-K result back to records.
+"""
+import heapq
+import time
+from array import array
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Window name -> length in seconds; None never expires.
+WINDOWS: Dict[str, Optional[int]] = {"all": None, "weekly": 7 * 24 * 3600, "daily": 24 * 3600}
+
+_SEQ_BITS = 40
+_SEQ_MASK = (1 << _SEQ_BITS) - 1
+_SCORE_LIMIT = 1 << 22
+
+# (seq, score, category, difficulty, timestamp)
+Entry = Tuple[int, int, Optional[str], Optional[str], Optional[str]]
+
+
+def pack(score: int, seq: int) -> int:
+    """Key ordering higher scores first and, among equal scores, earlier games."""
+    score = max(-_SCORE_LIMIT + 1, min(_SCORE_LIMIT - 1, int(score)))
+    return (_SCORE_LIMIT - score) << _SEQ_BITS | seq
+
+
+def unpack(key: int) -> Tuple[int, int]:
+    """Return the ``(score, seq)`` packed into ``key``."""
+    return _SCORE_LIMIT - (key >> _SEQ_BITS), key & _SEQ_MASK
+
+
+def entry(seq: int, record: Dict) -> Entry:
+    """The fields of a score record that a leaderboard keeps."""
+    return (seq, record.get('score', 0), record.get('category'), record.get('difficulty'),
+            record.get('timestamp'))
+
+
+class RankedScores:
+    """Sorted multiset of packed keys with O(log n) rank and positional access."""
+
+    LOAD = 1024  # blocks split at twice this size
+
+    def __init__(self, keys: Iterable[int] = ()):
+        keys = sorted(keys)
+        self._blocks = [array("q", keys[start:start + self.LOAD])
+                        for start in range(0, len(keys), self.LOAD)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._size = len(keys)
+        self._rebuild()
+
+    def _rebuild(self):
+        """Rebuild the Fenwick tree over block sizes in O(blocks)."""
+        tree = [len(block) for block in self._blocks]
+        for index in range(len(tree)):
+            parent = index | (index + 1)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+        self._tree = tree
+
+    def _grow(self, block: int, delta: int):
+        tree = self._tree
+        while block < len(tree):
+            tree[block] += delta
+            block |= block + 1
+
+    def _before(self, block: int) -> int:
+        """Number of keys in the blocks before ``block``."""
+        tree = self._tree
+        total = 0
+        while block > 0:
+            total += tree[block - 1]
+            block &= block - 1
+        return total
+
+    def _locate(self, position: int) -> Tuple[int, int]:
+        """Return ``(block, offset)`` of the key at ``position``."""
+        tree = self._tree
+        block = 0
+        step = 1 << (len(tree).bit_length() - 1) if tree else 0
+        while step:
+            following = block + step
+            if following <= len(tree) and tree[following - 1] <= position:
+                position -= tree[following - 1]
+                block = following
+            step >>= 1
+        return block, position
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: int):
+        blocks, maxes = self._blocks, self._maxes
+        self._size += 1
+        if not blocks:
+            blocks.append(array("q", [key]))
+            maxes.append(key)
+            self._tree = [1]
+            return
+        index = bisect_left(maxes, key)
+        if index == len(blocks):
+            index -= 1
+            blocks[index].append(key)
+            maxes[index] = key
+        else:
+            insort(blocks[index], key)
+        block = blocks[index]
+        if len(block) > 2 * self.LOAD:
+            blocks.insert(index + 1, block[self.LOAD:])
+            del block[self.LOAD:]
+            maxes.insert(index, block[-1])
+            self._rebuild()
+        else:
+            self._grow(index, 1)
+
+    def remove(self, key: int) -> bool:
+        """Remove one occurrence of ``key``; return whether it was present."""
+        blocks, maxes = self._blocks, self._maxes
+        index = bisect_left(maxes, key)
+        if index == len(blocks):
+            return False
+        block = blocks[index]
+        position = bisect_left(block, key)
+        if block[position] != key:
+            return False
+        del block[position]
+        self._size -= 1
+        if not block:
+            del blocks[index], maxes[index]
+            self._rebuild()
+        elif len(block) < self.LOAD // 4 and index + 1 < len(blocks) \
+                and len(block) + len(blocks[index + 1]) <= 2 * self.LOAD:
+            # Merge small blocks so expiry cannot leave thousands of tiny ones.
+            block.extend(blocks[index + 1])
+            del blocks[index + 1], maxes[index + 1]
+            maxes[index] = block[-1]
+            self._rebuild()
+        else:
+            maxes[index] = block[-1]
+            self._grow(index, -1)
+        return True
+
+    def rank(self, key: int) -> int:
+        """Number of keys smaller than ``key``."""
+        index = bisect_left(self._maxes, key)
+        if index == len(self._blocks):
+            return self._size
+        return self._before(index) + bisect_left(self._blocks[index], key)
+
+    def keys(self, start: int, stop: int) -> List[int]:
+        """Keys at positions ``start`` to ``stop`` in order."""
+        stop = min(stop, self._size)
+        if start >= stop:
+            return []
+        index, offset = self._locate(start)
+        result: List[int] = []
+        while len(result) < stop - start:
+            block = self._blocks[index]
+            result.extend(block[offset:offset + stop - start - len(result)])
+            index += 1
+            offset = 0
+        return result
+
+
+class Leaderboard:
+    """Ranked boards per ``(category, difficulty)`` and overall, for every window."""
+
+    def __init__(self, entries: Iterable[Entry] = (), clock: Callable[[], float] = time.time):
+        """Bulk-load ``entries`` (see ``entry``) with one sort per board."""
+        self.clock = clock
+        self._boards: Dict[Tuple[Optional[str], Optional[str], str], RankedScores] = {}
+        self._expiry: Dict[str, List] = {window: [] for window, seconds in WINDOWS.items() if seconds}
+        self._cutoffs: Dict[str, Tuple[int, str]] = {}
+
+        cutoffs = {window: self._cutoff(window) for window in self._expiry}
+        keys: Dict[Tuple[Optional[str], Optional[str], str], List[int]] = {}
+        for seq, score, category, difficulty, timestamp in entries:
+            key = pack(score, seq)
+            for window, cutoff in (("all", None), *cutoffs.items()):
+                if cutoff is not None:
+                    if timestamp is None or timestamp < cutoff:
+                        continue
+                    self._expiry[window].append((timestamp, key, category, difficulty))
+                for board in dict.fromkeys(((None, None, window), (category, difficulty, window))):
+                    keys.setdefault(board, []).append(key)
+        for board, board_keys in keys.items():
+            self._boards[board] = RankedScores(board_keys)
+        for heap in self._expiry.values():
+            heapq.heapify(heap)
+
+    def _cutoff(self, window: str) -> str:
+        """Oldest timestamp still in ``window``; formatted at most once a second."""
+        now = int(self.clock())
+        second, cutoff = self._cutoffs.get(window, (None, ""))
+        if second != now:
+            cutoff = time.strftime(TIMESTAMP_FORMAT, time.localtime(now - WINDOWS[window]))
+            self._cutoffs[window] = (now, cutoff)
+        return cutoff
+
+    def _expire(self, window: str):
+        heap = self._expiry.get(window)
+        if not heap:
+            return
+        cutoff = self._cutoff(window)
+        while heap and heap[0][0] < cutoff:
+            _, key, category, difficulty = heapq.heappop(heap)
+            for board in dict.fromkeys(((None, None, window), (category, difficulty, window))):
+                self._boards[board].remove(key)
+
+    def add(self, seq: int, score: int, category: Optional[str] = None,
+            difficulty: Optional[str] = None, timestamp: Optional[str] = None):
+        """Record one game on its boards in every window it falls in."""
+        key = pack(score, seq)
+        for window in WINDOWS:
+            if window in self._expiry:
+                if timestamp is None or timestamp < self._cutoff(window):
+                    continue
+                heapq.heappush(self._expiry[window], (timestamp, key, category, difficulty))
+            for board in dict.fromkeys(((None, None, window), (category, difficulty, window))):
+                ranked = self._boards.get(board)
+                if ranked is None:
+                    ranked = self._boards[board] = RankedScores()
+                ranked.add(key)
+
+    def board(self, category: Optional[str] = None, difficulty: Optional[str] = None,
+              window: str = "all") -> RankedScores:
+        """The current board; no category and difficulty is the overall board."""
+        if window not in WINDOWS:
+            raise ValueError(f"Unknown leaderboard window: {window}")
+        self._expire(window)
+        return self._boards.get((category, difficulty, window)) or RankedScores()
+
+    def size(self, category: Optional[str] = None, difficulty: Optional[str] = None,
+             window: str = "all") -> int:
+        return len(self.board(category, difficulty, window))
+
+    def rank(self, score: int, category: Optional[str] = None, difficulty: Optional[str] = None,
+             window: str = "all") -> int:
+        """1-based rank of ``score``: one more than the number of strictly better games."""
+        return self.board(category, difficulty, window).rank(pack(score, 0)) + 1
+
+    def percentile(self, score: int, category: Optional[str] = None,
+                   difficulty: Optional[str] = None, window: str = "all") -> float:
+        """Percentage of the board's games that scored lower than ``score``."""
+        ranked = self.board(category, difficulty, window)
+        if not ranked:
+            return 100.0
+        at_least = ranked.rank(pack(score - 1, 0))
+        return 100.0 * (len(ranked) - at_least) / len(ranked)
+
+    def top(self, k: int = 10, category: Optional[str] = None, difficulty: Optional[str] = None,
+            window: str = "all", start: int = 0) -> List[Tuple[int, int]]:
+        """``(score, seq)`` of the games ranked ``start`` to ``start + k``, best first."""
+        return [unpack(key) for key in self.board(category, difficulty, window).keys(start, start + k)]
@@ -0,0 +1,227 @@
+"""Opt-in instrumentation for the game's and the question manager's hot paths.
+
+Collection is off unless one of these environment variables is set:
+
+* ``QUIZ_METRICS=1``               - collect in memory (see ``snapshot``)
+* ``QUIZ_METRICS_FILE=<path>``     - collect, and write everything at exit:
+  JSON for a ``.json`` path, Prometheus text exposition format otherwise
+* ``QUIZ_PROFILE=<path>``          - run the whole game or manager session
+  under cProfile and dump the stats to ``path`` (``python -m pstats path``)
+
+Instrumented calls go into latency histograms (``quiz_call_seconds``) timed
+with ``time.perf_counter``; errors that are handled and otherwise swallowed
+are counted in ``quiz_swallowed_errors_total``; ``ask_question`` records how
+long each answer took in ``quiz_answer_seconds``. While collection is off a
+``timed`` function costs one extra call and a flag check.
+"""
+import atexit
+import cProfile
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Upper bounds in seconds; one more bucket (+Inf) catches the rest.
+CALL_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ANSWER_BUCKETS = (1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0, 60.0, 120.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, as Prometheus expects."""
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket (+Inf last), sum]
+        self.series: Dict[Labels, List] = {}
+
+    def labelled(self, labels: Labels = ()) -> List:
+        """The ``[counts, sum]`` series for ``labels``, created on first use."""
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        return series
+
+    def observe(self, value: float, labels: Labels = ()):
+        series = self.labelled(labels)
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def prometheus(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.series.items()):
+            running = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                running += count
+                lines.append(f"{self.name}_bucket{_format_labels(labels, ('le', str(bound)))} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {running}")
+        return lines
+
+    def snapshot(self) -> List[Dict]:
+        return [{"labels": dict(labels), "count": sum(counts), "sum": total,
+                 "buckets": dict(zip(map(str, (*self.buckets, "+Inf")), counts))}
+                for labels, (counts, total) in sorted(self.series.items())]
+
+
+class Counter:
+    """Monotonic counter per label set."""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.series: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def prometheus(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.series.items()):
+            lines.append(f"{self.name}{_format_labels(labels)} {value:g}")
+        return lines
+
+    def snapshot(self) -> List[Dict]:
+        return [{"labels": dict(labels), "value": value}
+                for labels, value in sorted(self.series.items())]
+
+
+class Registry:
+    """All metrics of the process; updates are serialized by one lock."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.calls = Histogram("quiz_call_seconds", "Latency of instrumented calls.", CALL_BUCKETS)
+        self.answers = Histogram("quiz_answer_seconds", "Time players took to answer a question.",
+                                 ANSWER_BUCKETS)
+        self.errors = Counter("quiz_swallowed_errors_total",
+                              "Errors that were handled without stopping the program.")
+
+    def observe_call(self, function: str, seconds: float):
+        with self._lock:
+            self.calls.observe(seconds, (("function", function),))
+
+    def call_recorder(self, function: str) -> Callable[[float], None]:
+        """A fast ``observe_call`` for one function, for decorators.
+
+        The label tuple, bucket bounds and lock are bound once, so each call
+        only looks up its series, bisects and adds.
+        """
+        histogram = self.calls
+        labels = (("function", function),)
+        buckets = histogram.buckets
+        lock = self._lock
+
+        def record(seconds: float):
+            with lock:
+                series = histogram.series.get(labels) or histogram.labelled(labels)
+                series[0][bisect_left(buckets, seconds)] += 1
+                series[1] += seconds
+        return record
+
+    def observe_answer(self, seconds: float, **labels: str):
+        if self.enabled:
+            with self._lock:
+                self.answers.observe(seconds, _labels(labels))
+
+    def count_error(self, where: str, error: BaseException):
+        if self.enabled:
+            with self._lock:
+                self.errors.inc((("type", type(error).__name__), ("where", where)))
+
+    def reset(self):
+        with self._lock:
+            for metric in (self.calls, self.answers, self.errors):
+                metric.series.clear()
+
+    def prometheus(self) -> str:
+        with self._lock:
+            lines = []
+            for metric in (self.calls, self.answers, self.errors):
+                lines.extend(metric.prometheus())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {"timestamp": time.time(),
+                    **{metric.name: metric.snapshot()
+                       for metric in (self.calls, self.answers, self.errors)}}
+
+    def write(self, path: str):
+        """Write a JSON snapshot (``.json``) or the Prometheus text format."""
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith(".json"):
+                json.dump(self.snapshot(), f, indent=2)
+            else:
+                f.write(self.prometheus())
+
+
+METRICS_FILE = os.environ.get("QUIZ_METRICS_FILE")
+PROFILE_FILE = os.environ.get("QUIZ_PROFILE")
+REGISTRY = Registry(enabled=bool(METRICS_FILE) or os.environ.get("QUIZ_METRICS", "") not in ("", "0"))
+
+if METRICS_FILE:
+    atexit.register(lambda: REGISTRY.write(METRICS_FILE))
+
+
+def timed(function: str) -> Callable:
+    """Decorator recording each call's latency under ``function``."""
+    def decorate(fn: Callable) -> Callable:
+        record = REGISTRY.call_recorder(function)
+        clock = time.perf_counter
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not REGISTRY.enabled:
+                return fn(*args, **kwargs)
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(clock() - start)
+        return wrapper
+    return decorate
+
+
+def count_error(where: str, error: BaseException):
+    """Count an error that was handled (and possibly hidden from the user)."""
+    REGISTRY.count_error(where, error)
+
+
+def observe_answer(seconds: float, **labels: str):
+    REGISTRY.observe_answer(seconds, **labels)
+
+
+def run_profiled(run: Callable[[], None], path: Optional[str] = PROFILE_FILE):
+    """Call ``run``, under cProfile with the stats dumped to ``path`` if one is set."""
+    if not path:
+        run()
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(run)
+    finally:
+        profiler.dump_stats(path)
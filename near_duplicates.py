@@ -0,0 +1,311 @@
+"""MinHash/LSH index for spotting reworded copies of existing questions.
+
+Each question is reduced to a set of word shingles (single words and word
+pairs of the question text and of every option, with the options in sorted
+order so that shuffling them changes nothing). A MinHash signature of
+``num_perm`` values estimates the Jaccard similarity of two such sets, and
+the signature is cut into ``bands`` bands: two questions become candidates
+only if some band matches exactly. A query therefore looks up ``bands``
+keys instead of comparing against every question, and only the candidates
+are scored.
+
+Band keys live in sorted arrays searched with ``bisect``; questions added
+since the last rebuild sit in a small per-band dict that is folded into the
+arrays once it grows past a fraction of them. Removed questions are only
+tombstoned: they stay in the arrays and are dropped from candidate sets.
+
+NumPy, when installed, computes signatures and band keys in bulk; the pure
+Python fallback produces identical values, only more slowly.
+"""
+import math
+import random
+import re
+import zlib
+from array import array
+from bisect import bisect_left
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_WORD = re.compile(r"\w+")
+_MASK64 = (1 << 64) - 1
+_SIGN = 1 << 63
+_SEED = 0x5EED
+_BATCH = 8192
+
+
+def shingles(question: Dict) -> List[int]:
+    """Return the 32-bit shingle hashes of a question's text and options."""
+    texts = [str(question.get("question", ""))]
+    texts.extend(sorted(str(option).lower() for option in question.get("options", ())))
+    found = set()
+    for text in texts:
+        words = _WORD.findall(text.lower())
+        found.update(words)
+        found.update(map(" ".join, zip(words, words[1:])))
+    return list(map(zlib.crc32, map(str.encode, found)))
+
+
+class NearDuplicateIndex:
+    """Incrementally built LSH index over question MinHash signatures.
+
+    With the defaults (32 hashes in 8 bands of 4) a pair with Jaccard
+    similarity 0.6 becomes a candidate about 75% of the time and a pair at
+    0.8 about 99% of the time, while pairs below 0.3 rarely do.
+    """
+
+    def __init__(self, num_perm: int = 32, bands: int = 8, threshold: float = 0.6):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        rng = random.Random(_SEED)
+        # Multiply-shift hashes: odd 64-bit multipliers, keep the high 32 bits.
+        self._perms = [(rng.getrandbits(64) | 1, rng.getrandbits(64)) for _ in range(num_perm)]
+        # Odd multipliers that fold a band's rows into one 64-bit key.
+        self._fold = [rng.getrandbits(64) | 1 for _ in range(self.rows)]
+        if np is not None:
+            self._np_a = np.array([a for a, _ in self._perms], dtype=np.uint64)
+            self._np_b = np.array([b for _, b in self._perms], dtype=np.uint64)
+            self._np_fold = np.array(self._fold, dtype=np.uint64)
+        self._signatures = array("I")
+        self.labels: List = []
+        self._keys = [array("q") for _ in range(bands)]
+        self._ids = [array("q") for _ in range(bands)]
+        self._pending: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+        self._pending_count = 0
+        self._removed = set()
+
+    def __len__(self) -> int:
+        return len(self.labels) - len(self._removed)
+
+    def signature(self, question: Dict) -> List[int]:
+        """MinHash signature of a question."""
+        values = shingles(question) or [0]
+        if np is not None:
+            return self._signatures_np([values]).tolist()[0]
+        return [min([(a * x + b) & _MASK64 for x in values]) >> 32 for a, b in self._perms]
+
+    def _signatures_np(self, shingle_lists: List[List[int]]):
+        """Signatures of many shingle sets at once, as a ``(n, num_perm)`` array."""
+        lengths = np.fromiter(map(len, shingle_lists), dtype=np.int64, count=len(shingle_lists))
+        flat = np.fromiter((x for values in shingle_lists for x in values), dtype=np.uint64,
+                           count=int(lengths.sum()))
+        # One row per hash function so that reduceat runs along contiguous memory.
+        hashed = (self._np_a[:, None] * flat + self._np_b[:, None]) >> np.uint64(32)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        return np.minimum.reduceat(hashed, starts, axis=1).T.astype(np.uint32)
+
+    def _band_keys(self, signature) -> List[int]:
+        rows = self.rows
+        keys = []
+        for band in range(self.bands):
+            key = 0
+            for value, multiplier in zip(signature[band * rows:(band + 1) * rows], self._fold):
+                key += value * multiplier
+            key &= _MASK64
+            keys.append(key - (1 << 64) if key & _SIGN else key)
+        return keys
+
+    def add(self, question: Dict, label=None) -> int:
+        """Index one question; return its position."""
+        position = len(self.labels)
+        signature = self.signature(question)
+        self._signatures.extend(signature)
+        self.labels.append(label)
+        for band, key in enumerate(self._band_keys(signature)):
+            self._pending[band].setdefault(key, []).append(position)
+        self._pending_count += 1
+        if self._pending_count > max(4096, len(self._keys[0]) // 4):
+            self._rebuild()
+        return position
+
+    def signature_bytes(self, questions: List[Dict]) -> bytes:
+        """Signatures of ``questions`` as ``num_perm`` native uint32 values each.
+
+        Picklable and position-independent, so worker processes can compute
+        them for ``add_signatures`` in the parent.
+        """
+        if np is not None and questions:
+            return self._signatures_np([shingles(question) or [0] for question in questions]).tobytes()
+        signatures = array("I")
+        for question in questions:
+            signatures.extend(self.signature(question))
+        return signatures.tobytes()
+
+    def add_signatures(self, signatures: bytes, labels: List):
+        """Index precomputed ``signature_bytes``, one label per signature."""
+        if len(signatures) != len(labels) * self.num_perm * array("I").itemsize:
+            raise ValueError("one signature is needed per label")
+        self._signatures.frombytes(signatures)
+        self.labels.extend(labels)
+        if labels:
+            self._rebuild()
+
+    def add_many(self, items: Iterable[Tuple[Dict, object]]):
+        """Index ``(question, label)`` pairs, sorting the bands once at the end."""
+        start = len(self.labels)
+        items = iter(items)
+        while True:
+            batch = list(islice(items, _BATCH))
+            if not batch:
+                break
+            self._signatures.frombytes(self.signature_bytes([question for question, _ in batch]))
+            self.labels.extend(label for _, label in batch)
+        if len(self.labels) > start:
+            self._rebuild()
+
+    def remove(self, position: int):
+        """Stop matching the question at ``position``; positions are never reused."""
+        if 0 <= position < len(self.labels):
+            self._removed.add(position)
+
+    def _rebuild(self):
+        """Recompute every band's sorted key array from the stored signatures."""
+        rows = self.rows
+        if np is not None:
+            signatures = np.frombuffer(self._signatures, dtype=np.uint32).reshape(-1, self.num_perm)
+            for band in range(self.bands):
+                block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+                keys = (block * self._np_fold).sum(axis=1, dtype=np.uint64).view(np.int64)
+                order = np.argsort(keys, kind="stable")
+                self._keys[band] = array("q", keys[order].tobytes())
+                self._ids[band] = array("q", order.astype(np.int64).tobytes())
+        else:
+            num_perm = self.num_perm
+            signatures = self._signatures
+            band_keys = [self._band_keys(signatures[base:base + num_perm])
+                         for base in range(0, len(signatures), num_perm)]
+            for band in range(self.bands):
+                keys = [row[band] for row in band_keys]
+                order = sorted(range(len(keys)), key=keys.__getitem__)
+                self._keys[band] = array("q", [keys[i] for i in order])
+                self._ids[band] = array("q", order)
+        for pending in self._pending:
+            pending.clear()
+        self._pending_count = 0
+
+    def candidates(self, signature: List[int]) -> set:
+        """Positions sharing at least one band with ``signature``."""
+        found = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            keys = self._keys[band]
+            i = bisect_left(keys, key)
+            while i < len(keys) and keys[i] == key:
+                found.add(self._ids[band][i])
+                i += 1
+            found.update(self._pending[band].get(key, ()))
+        return found - self._removed if self._removed else found
+
+    def _runs(self, band: int) -> Iterator[Tuple[int, int]]:
+        """``(start, end)`` of every run of two or more equal keys in a band."""
+        keys = self._keys[band]
+        start = 0
+        for end in range(1, len(keys) + 1):
+            if end == len(keys) or keys[end] != keys[start]:
+                if end - start > 1:
+                    yield start, end
+                start = end
+
+    def _band_pairs_np(self, band: int, threshold: float) -> Iterator[Tuple[float, int, int]]:
+        """``pairs`` for one band, scoring its candidate pairs in array batches."""
+        rows, num_perm = self.rows, self.num_perm
+        stored = np.frombuffer(self._signatures, dtype=np.uint32).reshape(-1, num_perm)
+        removed = np.zeros(len(self.labels), dtype=bool)
+        removed[list(self._removed)] = True
+        needed = math.ceil(threshold * num_perm - 1e-9)
+        keys = np.frombuffer(self._keys[band], dtype=np.int64)
+        ids = np.frombuffer(self._ids[band], dtype=np.int64)
+        # Slots whose key equals the one ``distance`` slots on: pairing each
+        # with that slot, for every distance, yields every pair in every run
+        # once, with work proportional to the number of pairs.
+        slots = np.flatnonzero(keys[1:] == keys[:-1])
+        distance = 1
+        while len(slots):
+            for low in range(0, len(slots), _BATCH * 16):
+                batch = slots[low:low + _BATCH * 16]
+                first, second = ids[batch], ids[batch + distance]
+                first, second = np.minimum(first, second), np.maximum(first, second)
+                equal = stored[first] == stored[second]
+                keep = np.flatnonzero(np.count_nonzero(equal, axis=1) >= needed)
+                first, second, equal = first[keep], second[keep], equal[keep]
+                # Pairs that share an earlier band were scored there.
+                earlier = equal[:, :band * rows].reshape(len(keep), band, rows).all(axis=2).any(axis=1)
+                keep = ~earlier & ~removed[first] & ~removed[second]
+                similarity = equal[keep].mean(axis=1)
+                yield from zip(similarity.tolist(), first[keep].tolist(), second[keep].tolist())
+            distance += 1
+            slots = slots[slots + distance < len(keys)]
+            slots = slots[keys[slots + distance] == keys[slots]]
+
+    def pairs(self, threshold: Optional[float] = None) -> Iterator[Tuple[float, int, int]]:
+        """Yield ``(similarity, i, j)``, ``i < j``, for indexed pairs at or above ``threshold``.
+
+        Candidates are the positions sharing a band key, read off each
+        band's sorted keys, so the whole index is checked without a query
+        per question. A pair is scored only in the first band the two
+        signatures agree on, so no set of seen pairs is kept.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        if self._pending_count:
+            self._rebuild()
+        rows, num_perm = self.rows, self.num_perm
+        for band in range(self.bands):
+            if np is not None:
+                yield from self._band_pairs_np(band, threshold)
+                continue
+            ids = self._ids[band]
+            for start, end in self._runs(band):
+                run = sorted(position for position in ids[start:end] if position not in self._removed)
+                for i, first in enumerate(run):
+                    signature = self._signatures[first * num_perm:(first + 1) * num_perm]
+                    for second in run[i + 1:]:
+                        other = self._signatures[second * num_perm:(second + 1) * num_perm]
+                        if any(signature[b * rows:(b + 1) * rows] == other[b * rows:(b + 1) * rows]
+                               for b in range(band)):
+                            continue
+                        similarity = self.similarity(signature, second)
+                        if similarity >= threshold:
+                            yield similarity, first, second
+
+    def similarity(self, signature: List[int], position: int) -> float:
+        """Estimated Jaccard similarity between ``signature`` and an indexed question."""
+        base = position * self.num_perm
+        stored = self._signatures[base:base + self.num_perm]
+        return sum(1 for x, y in zip(signature, stored) if x == y) / self.num_perm
+
+    def query(self, question: Dict, threshold: Optional[float] = None,
+              limit: int = 5) -> List[Tuple[float, object]]:
+        """Return up to ``limit`` ``(similarity, label)`` pairs, most similar first."""
+        threshold = self.threshold if threshold is None else threshold
+        signature = self.signature(question)
+        candidates = self.candidates(signature)
+        if np is not None and len(candidates) > 64:
+            # Crowded buckets (common words) can yield thousands of candidates;
+            # score them with one array comparison.
+            positions = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            stored = np.frombuffer(self._signatures, dtype=np.uint32).reshape(-1, self.num_perm)
+            matches = (stored[positions] == np.array(signature, dtype=np.uint32)).mean(axis=1)
+            keep = matches >= threshold
+            scored = list(zip(matches[keep].tolist(), positions[keep].tolist()))
+        else:
+            scored = [(self.similarity(signature, position), position) for position in candidates]
+            scored = [item for item in scored if item[0] >= threshold]
+        scored = sorted(scored, reverse=True)[:limit]
+        return [(similarity, self.labels[position]) for similarity, position in scored]
+
+    @classmethod
+    def from_bank(cls, questions: Dict, **kwargs) -> "NearDuplicateIndex":
+        """Index a nested bank; labels are ``(category, difficulty, question)``."""
+        index = cls(**kwargs)
+        index.add_many((question, (category, difficulty, question))
+                       for category, difficulties in questions.items()
+                       for difficulty, items in difficulties.items()
+                       for question in items)
+        return index
@@ -0,0 +1,147 @@
+"""Per-player answer history with a Bloom filter of seen questions.
+
+Every answered question is appended to ``history.log`` as one JSON line
+(player, question id, whether it was right, when), so the full
+history is never rewritten. In memory each player keeps the keys answered
+so far in an ``array`` (8 bytes per answer) and a Bloom filter over them,
+which answers "has this player seen this question?" in O(1) however long
+the history grows. A false positive only means an unseen question is
+occasionally skipped as if seen.
+"""
+import json
+import math
+import threading
+import time
+from array import array
+from typing import Callable, Dict, List, Optional
+
+from question_store import QuestionStore, id_value, question_id
+from storage import file_lock, read_json_lines
+
+DEFAULT_HISTORY_FILE = 'history.log'
+
+
+def key_value(question: Dict) -> int:
+    """The question's id as a 64-bit integer."""
+    return id_value(question_id(question))
+
+
+class BloomFilter:
+    """Bloom filter over 64-bit keys, sized for ``capacity`` keys."""
+
+    def __init__(self, capacity: int = 1024, error_rate: float = 0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: int):
+        # Content keys are already uniform hashes; split one into two halves
+        # and combine them (Kirsch-Mitzenmacher) instead of hashing again.
+        first = key & 0xFFFFFFFF
+        step = (key >> 32) | 1
+        for i in range(self.num_hashes):
+            yield (first + i * step) % self.num_bits
+
+    def add(self, key: int):
+        for bit in self._positions(key):
+            self.bits[bit >> 3] |= 1 << (bit & 7)
+        self.count += 1
+
+    def __contains__(self, key: int) -> bool:
+        bits = self.bits
+        return all(bits[bit >> 3] & (1 << (bit & 7)) for bit in self._positions(key))
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+
+class PlayerHistory:
+    """Append-only answer log with per-player seen filters."""
+
+    def __init__(self, path: str = DEFAULT_HISTORY_FILE, error_rate: float = 0.01):
+        self.path = path
+        self.error_rate = error_rate
+        self._keys: Dict[str, array] = {}
+        self._correct: Dict[str, int] = {}
+        self._filters: Dict[str, BloomFilter] = {}
+        self._offset = 0
+        # Answers not yet logged; the server flushes from a worker thread.
+        self._pending: List[Dict] = []
+        self._pending_lock = threading.Lock()
+        self._replay()
+
+    def _replay(self):
+        """Fold log lines written since the last read into memory."""
+        for _, end, entry in read_json_lines(self.path, self._offset):
+            self._offset = end
+            try:
+                self._add(entry['player'], id_value(entry['question']), entry.get('correct', False))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                continue
+
+    def _add(self, player: str, key: int, correct: bool):
+        keys = self._keys.get(player)
+        if keys is None:
+            keys = self._keys[player] = array('Q')
+            self._correct[player] = 0
+        keys.append(key)
+        self._correct[player] += bool(correct)
+        seen = self._filters.get(player)
+        if seen is None or seen.full:
+            # Doubling the capacity and re-adding every key keeps inserts
+            # amortized O(1) and the error rate at its target.
+            seen = BloomFilter(max(1024, 2 * len(keys)), self.error_rate)
+            for old in keys:
+                seen.add(old)
+            self._filters[player] = seen
+        else:
+            seen.add(key)
+
+    def players(self) -> List[str]:
+        return list(self._keys)
+
+    def answered(self, player: str) -> int:
+        return len(self._keys.get(player, ()))
+
+    def correct(self, player: str) -> int:
+        return self._correct.get(player, 0)
+
+    def has_seen(self, player: str, question: Dict) -> bool:
+        seen = self._filters.get(player)
+        return seen is not None and key_value(question) in seen
+
+    def seen_test(self, player: str, store: QuestionStore) -> Optional[Callable[[int], bool]]:
+        """Return a test for whether ``player`` has seen the question at a bank position.
+
+        ``None`` for a player with no history, so sampling skips the check.
+        """
+        seen = self._filters.get(player)
+        if seen is None:
+            return None
+        return lambda position: id_value(store.question_id(position)) in seen
+
+    def record(self, player: str, question: Dict, correct: bool, timestamp: Optional[float] = None):
+        """Queue one answer; ``flush`` writes it to the log."""
+        entry = {
+            'player': player,
+            'question': question_id(question),
+            'correct': bool(correct),
+            'time': int(time.time() if timestamp is None else timestamp),
+        }
+        with self._pending_lock:
+            self._pending.append(entry)
+
+    def flush(self):
+        """Append queued answers to the log and fold in other processes' answers."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        with file_lock(self.path):
+            if pending:
+                with open(self.path, 'a', encoding='utf-8') as log:
+                    log.write(''.join(json.dumps(entry, separators=(',', ':')) + '\n'
+                                      for entry in pending))
+            self._replay()
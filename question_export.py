@@ -0,0 +1,103 @@
+"""Streaming question export.
+
+Exports are produced by generators and written a batch of lines at a time,
+so the serialized bank is never held in memory in one piece. Supported
+outputs:
+
+* ``.json``  - the nested ``questions.json`` layout with compact separators
+* ``.jsonl`` - one question per line with ``category`` and ``difficulty`` keys
+* either of the above with a ``.gz`` suffix for gzip compression
+* optionally one shard file per category
+
+Both layouts can be read back by ``question_import``.
+"""
+import gzip
+import json
+import os
+import re
+from typing import Dict, Iterator, List, Tuple
+
+_SEPARATORS = (",", ":")
+_BATCH_LINES = 1024
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, separators=_SEPARATORS, ensure_ascii=False)
+
+
+def iter_jsonl(questions: Dict) -> Iterator[str]:
+    """Yield one JSON line per question."""
+    for category, difficulties in questions.items():
+        for difficulty, items in difficulties.items():
+            for question in items:
+                yield _dumps({"category": category, "difficulty": difficulty, **question}) + "\n"
+
+
+def iter_json(questions: Dict) -> Iterator[str]:
+    """Yield the nested bank layout piece by piece, one question per piece."""
+    yield "{"
+    for c, (category, difficulties) in enumerate(questions.items()):
+        yield ("," if c else "") + _dumps(category) + ":{"
+        for d, (difficulty, items) in enumerate(difficulties.items()):
+            yield ("," if d else "") + _dumps(difficulty) + ":["
+            for q, question in enumerate(items):
+                yield ("," if q else "") + _dumps(question)
+            yield "]"
+        yield "}"
+    yield "}\n"
+
+
+def split_format(path: str) -> Tuple[str, bool]:
+    """Return ``(layout, compressed)`` for an export path."""
+    compressed = path.endswith(".gz")
+    base = path[:-3] if compressed else path
+    return ("jsonl" if base.endswith(".jsonl") else "json"), compressed
+
+
+def shard_path(path: str, category: str) -> str:
+    """Insert a file-name-safe form of ``category`` before the extensions."""
+    directory, name = os.path.split(path)
+    stem, dot, extensions = name.partition(".")
+    slug = re.sub(r"[^a-z0-9]+", "_", category.lower()).strip("_") or "category"
+    return os.path.join(directory, f"{stem}.{slug}{dot}{extensions}")
+
+
+def write_stream(path: str, pieces: Iterator[str], compressed: bool) -> int:
+    """Write ``pieces`` to ``path`` in batches; return the bytes on disk."""
+    if compressed:
+        # Level 6 keeps nearly all of level 9's savings at a fraction of the time.
+        f = gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+    else:
+        f = open(path, "w", encoding="utf-8")
+    with f:
+        batch: List[str] = []
+        for piece in pieces:
+            batch.append(piece)
+            if len(batch) >= _BATCH_LINES:
+                f.write("".join(batch))
+                batch.clear()
+        f.write("".join(batch))
+    return os.path.getsize(path)
+
+
+def export_questions(questions: Dict, path: str, shard: bool = False) -> Dict[str, int]:
+    """Export ``questions`` to ``path`` in the layout implied by its suffix.
+
+    With ``shard`` every category goes to its own file next to ``path``.
+    Returns a map of written file name to bytes on disk.
+    """
+    layout, compressed = split_format(path)
+    serialize = iter_jsonl if layout == "jsonl" else iter_json
+    if not shard:
+        return {path: write_stream(path, serialize(questions), compressed)}
+
+    written = {}
+    for category, difficulties in questions.items():
+        target = shard_path(path, category)
+        # Distinct categories can share a slug; keep their shards apart.
+        suffix = 2
+        while target in written:
+            target = shard_path(path, f"{category}_{suffix}")
+            suffix += 1
+        written[target] = write_stream(target, serialize({category: difficulties}), compressed)
+    return written
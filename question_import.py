@@ -0,0 +1,255 @@
+"""Streaming, de-duplicating question import.
+
+Import files are parsed incrementally, so memory is bounded by the questions
+actually being added rather than by the size of the file. Two layouts are
+accepted:
+
+* the nested ``questions.json`` layout, ``{category: {difficulty: [question]}}``
+* JSON lines, one question per line with ``category`` and ``difficulty`` keys
+
+either optionally gzip-compressed.
+
+Every question is checked against a content-hash index (normalized question
+text plus options, see ``question_store.question_hash``) of the existing bank
+and of everything imported so far, and the new questions are applied to the
+bank in one batched write. Imported questions keep their ``id``; questions
+without one are given one, and a question whose id is already taken is
+skipped as a duplicate, so re-importing an export never forks a question.
+Given a ``near_duplicates.NearDuplicateIndex``, questions that look like
+rewordings of ones already seen are held back in ``flagged`` instead of
+being staged.
+"""
+import gzip
+import json
+import re
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from near_duplicates import NearDuplicateIndex
+from question_store import assign_id, question_hash, question_id
+
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+_CHUNK_SIZE = 1 << 16
+_NON_WHITESPACE = re.compile(r"[^ \t\r\n]")
+
+
+class _Scanner:
+    """Pulls JSON tokens and values out of a file a chunk at a time."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """Read another chunk; return False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.f.read(_CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop what has been consumed so the buffer stays chunk-sized.
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            match = _NON_WHITESPACE.search(self.buffer, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buffer[self.pos]
+            self.pos = len(self.buffer)
+            if not self._fill():
+                return ""
+
+    def expect(self, token: str):
+        found = self.peek()
+        if found != token:
+            raise ValueError(f"Expected {token!r} but found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value, reading more input as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # Keys and questions end in a closing quote or brace, so a value
+            # decoded right up to the buffer end is already complete.
+            self.pos = end
+            return value
+
+
+def _iter_nested(f) -> Iterator[Tuple[str, str, Dict]]:
+    """Stream ``(category, difficulty, question)`` from the nested layout."""
+    scanner = _Scanner(f)
+    scanner.expect("{")
+    while scanner.peek() != "}":
+        category = scanner.value()
+        scanner.expect(":")
+        scanner.expect("{")
+        while scanner.peek() != "}":
+            difficulty = scanner.value()
+            scanner.expect(":")
+            scanner.expect("[")
+            while scanner.peek() != "]":
+                yield category, difficulty, scanner.value()
+                if scanner.peek() == ",":
+                    scanner.expect(",")
+            scanner.expect("]")
+            if scanner.peek() == ",":
+                scanner.expect(",")
+        scanner.expect("}")
+        if scanner.peek() == ",":
+            scanner.expect(",")
+    scanner.expect("}")
+
+
+def _iter_lines(f) -> Iterator[Tuple[str, str, Dict]]:
+    """Stream ``(category, difficulty, question)`` from JSON lines.
+
+    A line that is not a JSON object with a category and a difficulty is
+    yielded as ``(None, None, None)``, for the importer to count as skipped.
+    """
+    for line in f:
+        if not line.strip():
+            continue
+        try:
+            question = json.loads(line)
+            category = question.pop("category")
+            difficulty = question.pop("difficulty")
+        except (ValueError, KeyError, TypeError, AttributeError):
+            yield None, None, None
+            continue
+        yield category, difficulty, question
+
+
+def _is_nested(f) -> bool:
+    """Tell the bank layout from JSON lines by the shape of the first value.
+
+    A bank maps its first key to an object of difficulties, whereas the
+    first key of a JSON-lines question maps to a plain value.
+    """
+    scanner = _Scanner(f)
+    try:
+        scanner.expect("{")
+        if scanner.peek() == "}":
+            return True
+        scanner.value()
+        scanner.expect(":")
+        return scanner.peek() == "{"
+    except ValueError:
+        return False
+    finally:
+        f.seek(0)
+
+
+def iter_questions(path: str) -> Iterator[Tuple[str, str, Dict]]:
+    """Stream ``(category, difficulty, question)`` from an import file.
+
+    Files ending in ``.gz`` are decompressed on the fly.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        yield from (_iter_nested(f) if _is_nested(f) else _iter_lines(f))
+
+
+class QuestionImporter:
+    """Stages an import against a content-hash index of the existing bank."""
+
+    def __init__(self, existing: Dict, near_duplicates: Optional[NearDuplicateIndex] = None):
+        self.seen = set()
+        self.ids = set()
+        for difficulties in existing.values():
+            for questions in difficulties.values():
+                for question in questions:
+                    self.seen.add(question_hash(question))
+                    self.ids.add(question_id(question))
+        self.staged: Dict[str, Dict[str, list]] = {}
+        self.near_duplicates = near_duplicates
+        # (category, difficulty, question, (category, difficulty, similar question))
+        self.flagged: List[Tuple[str, str, Dict, Tuple]] = []
+        self.parsed = 0
+        self.added = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self.elapsed = 0.0
+
+    def stage(self, path: str):
+        """Parse ``path`` and keep only questions not already in the bank."""
+        start = time.perf_counter()
+        for category, difficulty, question in iter_questions(path):
+            self.parsed += 1
+            if difficulty not in DIFFICULTIES or not isinstance(question, dict):
+                self.skipped += 1
+                continue
+            key = question_hash(question)
+            if key in self.seen or question_id(question) in self.ids:
+                self.duplicates += 1
+                continue
+            self.seen.add(key)
+            self.ids.add(assign_id(question))
+            if self.near_duplicates is not None:
+                matches = self.near_duplicates.query(question, limit=1)
+                if matches:
+                    self.flagged.append((category, difficulty, question, matches[0][1]))
+                    continue
+                self.near_duplicates.add(question, (category, difficulty, question))
+            self.staged.setdefault(category, {}).setdefault(difficulty, []).append(question)
+        self.elapsed += time.perf_counter() - start
+
+    def stage_flagged(self):
+        """Stage the questions held back as likely near-duplicates after all.
+
+        They join the near-duplicate index like any staged question, so
+        later imports are checked against them too.
+        """
+        for category, difficulty, question, _ in self.flagged:
+            if self.near_duplicates is not None:
+                self.near_duplicates.add(question, (category, difficulty, question))
+            self.staged.setdefault(category, {}).setdefault(difficulty, []).append(question)
+        self.flagged = []
+
+    def merge_into(self, bank: Dict):
+        """Add the staged questions to ``bank``.
+
+        ``bank`` may be newer than the bank the importer was built from, so
+        the staged questions are checked against it once more.
+        """
+        present = set()
+        ids = set()
+        for difficulties in bank.values():
+            for questions in difficulties.values():
+                for question in questions:
+                    present.add(question_hash(question))
+                    ids.add(question_id(question))
+        self.added = 0
+        for category, difficulties in self.staged.items():
+            if category not in bank:
+                bank[category] = {"easy": [], "medium": [], "hard": []}
+            for difficulty, questions in difficulties.items():
+                target = bank[category].setdefault(difficulty, [])
+                for question in questions:
+                    key = question_hash(question)
+                    if key in present or question["id"] in ids:
+                        self.duplicates += 1
+                        continue
+                    present.add(key)
+                    ids.add(question["id"])
+                    target.append(question)
+                    self.added += 1
+
+    @property
+    def throughput(self) -> float:
+        """Questions parsed per second."""
+        return self.parsed / self.elapsed if self.elapsed > 0 else 0.0
@@ -0,0 +1,92 @@
+"""Edit journal for the question bank.
+
+Single-question edits are appended to ``questions.json.journal`` instead of
+rewriting the whole bank, and are replayed on top of ``questions.json``
+whenever the bank is read. Questions are addressed by stable id
+(``question_store.question_id``) rather than list position, and every
+operation is idempotent, so replaying the journal a second time (e.g. after a
+crash midway through compaction) leaves the bank unchanged.
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from question_store import question_id
+from storage import JSONFileStore
+
+DEFAULT_DIFFICULTIES = ["easy", "medium", "hard"]
+# Placeholder for a deleted question until its bucket is swept.
+_DELETED = object()
+
+
+def add_op(category: str, difficulty: str, question: Dict) -> Dict:
+    return {"op": "add", "category": category, "difficulty": difficulty, "question": question}
+
+
+def delete_op(category: str, difficulty: str, question: Dict) -> Dict:
+    return {"op": "delete", "category": category, "difficulty": difficulty,
+            "key": question_id(question)}
+
+
+def update_op(category: str, difficulty: str, old: Dict, new: Dict) -> Dict:
+    """Replace ``old`` with ``new``; the edited question keeps ``old``'s id."""
+    key = question_id(old)
+    return {"op": "update", "category": category, "difficulty": difficulty,
+            "key": key, "question": {**new, "id": key}}
+
+
+def replay_journal(bank: Dict, entries: Iterable[Dict]):
+    """Apply journal entries to a nested bank in place, in order.
+
+    Each touched bucket is indexed once into an id -> position map, and
+    deleted questions are left as placeholders that are swept out in one
+    pass at the end, so a journal of ``m`` edits costs O(bucket + m) rather
+    than a scan per edit.
+    """
+    indexes: Dict[Tuple[str, str], Dict[str, int]] = {}
+    swept: Dict[Tuple[str, str], List] = {}
+
+    def positions_for(category: str, difficulty: str, bucket: List[Dict]) -> Dict[str, int]:
+        index = indexes.get((category, difficulty))
+        if index is None:
+            index = indexes[(category, difficulty)] = {
+                question_id(question): position for position, question in enumerate(bucket)
+            }
+        return index
+
+    try:
+        for entry in entries:
+            op = entry["op"]
+            category, difficulty = entry["category"], entry["difficulty"]
+            if op == "add":
+                if category not in bank:
+                    bank[category] = {level: [] for level in DEFAULT_DIFFICULTIES}
+                bucket = bank[category].setdefault(difficulty, [])
+                index = positions_for(category, difficulty, bucket)
+                question = entry["question"]
+                key = question_id(question)
+                if key not in index:
+                    index[key] = len(bucket)
+                    bucket.append(question)
+            elif op in ("delete", "update"):
+                bucket = bank.get(category, {}).get(difficulty)
+                if bucket is None:
+                    continue
+                index = positions_for(category, difficulty, bucket)
+                position = index.pop(entry["key"], None)
+                if position is None:
+                    continue
+                if op == "delete":
+                    bucket[position] = _DELETED
+                    swept[(category, difficulty)] = bucket
+                else:
+                    bucket[position] = entry["question"]
+                    index[question_id(entry["question"])] = position
+            else:
+                raise ValueError(f"Unknown journal operation: {op}")
+    finally:
+        for bucket in swept.values():
+            bucket[:] = [question for question in bucket if question is not _DELETED]
+
+
+def open_bank(path: str = "questions.json") -> JSONFileStore:
+    """Return the question bank file with its edit journal enabled."""
+    return JSONFileStore(path, replay=replay_journal)
@@ -1,32 +1,222 @@
 import json
 import os
-from typing import Dict, List
+import sys
+import time
+from typing import Callable, Dict
+
+import bank_validator
+import metrics
+import search_index
+from backends import open_backend
+from near_duplicates import NearDuplicateIndex
+from question_export import export_questions
+from question_import import QuestionImporter
+from question_journal import add_op, delete_op
+from question_store import assign_id, question_id
+from search_index import SearchIndex, open_search
+from storage import VersionConflict
 
 class QuestionManager:
     def __init__(self):
-        self.questions_file = 'questions.json'
+        self.backend = open_backend()
+        self.questions_file = self.backend.path
+        self.bank = self.backend.bank
+        # Fold the edit journal into questions.json once it grows past this.
+        self.compact_threshold = 1 << 20
+        self.questions_version = None
         self.questions = self.load_questions()
+        # (bank it was built from, index, {id: position}); rebuilt when
+        # self.questions is replaced, updated in place by edits and imports.
+        self._near_duplicates = None
+        # (bank it was built from, {id: (category, difficulty, question)}).
+        self._ids = None
+        self.search_store = open_search(self.questions_file)
+        self._search = None
     
+    @metrics.timed("manager_load_questions")
     def load_questions(self) -> Dict:
         """Load questions from the JSON file."""
-        if os.path.exists(self.questions_file):
-            try:
-                with open(self.questions_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading questions: {e}")
-                return {}
-        return {}
+        try:
+            questions, self.questions_version = self.bank.read(default={})
+            return questions
+        except Exception as e:
+            metrics.count_error("manager_load_questions", e)
+            print(f"Error loading questions: {e}")
+            return {}
     
+    @metrics.timed("save_questions")
     def save_questions(self):
-        """Save questions to the JSON file."""
+        """Save questions to the JSON file if nobody else changed it meanwhile."""
         try:
-            with open(self.questions_file, 'w') as f:
-                json.dump(self.questions, f, indent=2)
+            self.questions_version = self.bank.write(self.questions, self.questions_version)
             print("✅ Questions saved successfully!")
+        except VersionConflict as e:
+            metrics.count_error("save_questions", e)
+            print("❌ Questions were changed by another process. Reloading; please retry.")
+            self.questions = self.load_questions()
         except Exception as e:
+            metrics.count_error("save_questions", e)
             print(f"❌ Error saving questions: {e}")
     
+    @metrics.timed("apply_change")
+    def apply_change(self, change: Callable[[Dict], None]) -> bool:
+        """Apply ``change`` to the latest bank on disk and save it atomically.
+
+        The change is replayed on freshly read data under the file lock, so
+        edits made concurrently by other processes are never overwritten.
+        """
+        def mutate(questions: Dict) -> Dict:
+            change(questions)
+            return questions
+        
+        try:
+            self.questions, self.questions_version = self.bank.update(mutate, default={})
+            print("✅ Questions saved successfully!")
+            return True
+        except Exception as e:
+            metrics.count_error("apply_change", e)
+            print(f"❌ Error saving questions: {e}")
+            return False
+    
+    @metrics.timed("record_edit")
+    def record_edit(self, entry: Dict, apply_locally: Callable[[Dict], None]) -> bool:
+        """Journal one edit instead of rewriting the bank.
+
+        Appending to the journal costs O(1) I/O however large the bank is;
+        ``apply_locally`` mirrors the edit in ``self.questions``. The journal
+        is compacted into questions.json once it passes
+        ``compact_threshold`` bytes.
+        """
+        base = self.bank_source()
+        try:
+            self.questions_version, journal_size = self.bank.append(entry)
+        except Exception as e:
+            metrics.count_error("record_edit", e)
+            print(f"❌ Error saving questions: {e}")
+            return False
+        apply_locally(self.questions)
+        if self._ids is not None and self._ids[0] is self.questions:
+            if entry["op"] == "add":
+                self._ids[1][question_id(entry["question"])] = (entry["category"], entry["difficulty"],
+                                                                entry["question"])
+            elif entry["op"] == "delete":
+                self._ids[1].pop(entry["key"], None)
+        if self._near_duplicates is not None and self._near_duplicates[0] is self.questions:
+            _, index, positions = self._near_duplicates
+            if entry["op"] in ("delete", "update") and entry["key"] in positions:
+                index.remove(positions.pop(entry["key"]))
+            if entry["op"] in ("add", "update"):
+                question = entry["question"]
+                positions[question_id(question)] = index.add(
+                    question, (entry["category"], entry["difficulty"], question))
+        if entry["op"] == "add":
+            self.record_search(search_index.add_op(entry["category"], entry["difficulty"],
+                                                   entry["question"], base, self.bank_source()))
+        elif entry["op"] == "delete":
+            self.record_search(search_index.delete_op(entry["key"], base, self.bank_source()))
+        print("✅ Questions saved successfully!")
+        if journal_size >= self.compact_threshold:
+            self.compact()
+        return True
+    
+    def near_duplicate_index(self) -> NearDuplicateIndex:
+        """Return the near-duplicate index of the current bank, building it if needed."""
+        if self._near_duplicates is None or self._near_duplicates[0] is not self.questions:
+            index = NearDuplicateIndex.from_bank(self.questions)
+            positions = {question_id(question): position
+                         for position, (_, _, question) in enumerate(index.labels)}
+            self._near_duplicates = (self.questions, index, positions)
+        return self._near_duplicates[1]
+    
+    def sync_near_duplicates(self, since: int):
+        """Bring the near-duplicate index in line with ``self.questions`` after an import.
+
+        The importer indexes the questions it stages from position ``since``
+        on; the bank it merged them into was re-read from disk, so questions
+        missing from it are tombstoned and ones new to the index are added,
+        without recomputing the signatures of everything else.
+        """
+        if self._near_duplicates is None:
+            return
+        _, index, positions = self._near_duplicates
+        for position in range(since, len(index.labels)):
+            positions[question_id(index.labels[position][2])] = position
+        current = set()
+        for category, difficulties in self.questions.items():
+            for difficulty, questions in difficulties.items():
+                for question in questions:
+                    key = question_id(question)
+                    current.add(key)
+                    if key not in positions:
+                        positions[key] = index.add(question, (category, difficulty, question))
+        for key in [key for key in positions if key not in current]:
+            index.remove(positions.pop(key))
+        self._near_duplicates = (self.questions, index, positions)
+    
+    def id_index(self) -> Dict[str, tuple]:
+        """Map every question id to ``(category, difficulty, question)``, building it if needed."""
+        if self._ids is None or self._ids[0] is not self.questions:
+            self._ids = (self.questions, {
+                question_id(question): (category, difficulty, question)
+                for category, difficulties in self.questions.items()
+                for difficulty, questions in difficulties.items()
+                for question in questions
+            })
+        return self._ids[1]
+    
+    def bank_source(self):
+        """The bank version in the form stored by the search index."""
+        return list(self.questions_version) if self.questions_version else None
+    
+    def load_search_index(self) -> SearchIndex:
+        """Return the search index of the current bank, rebuilding it if stale."""
+        source = self.bank_source()
+        if self._search is not None and self._search.source == source:
+            return self._search
+        try:
+            data, _ = self.search_store.read(default=None)
+        except (OSError, ValueError) as e:
+            metrics.count_error("load_search_index", e)
+            data = None
+        if source is None or data is None or data["source"] != source:
+            print("🔄 Building search index...")
+            data = search_index.build_data(self.questions, source)
+            try:
+                self.search_store.update(lambda _: data, default=None)
+            except OSError as e:
+                metrics.count_error("load_search_index", e)
+                print(f"❌ Error saving search index: {e}")
+        self._search = SearchIndex(data)
+        return self._search
+    
+    def record_search(self, entry: Dict):
+        """Journal a search-index edit made alongside a bank edit.
+
+        The index is only a cache: if it was never built, or this fails, the
+        broken ``base``/``source`` chain makes the next search rebuild it.
+        """
+        if not os.path.exists(self.search_store.path):
+            return
+        try:
+            _, journal_size = self.search_store.append(entry)
+            if self._search is not None and self._search.source == entry["base"]:
+                self._search.apply(entry)
+            if journal_size >= self.compact_threshold:
+                self.search_store.compact(default=None)
+        except (OSError, ValueError) as e:
+            metrics.count_error("record_search", e)
+    
+    def compact(self):
+        """Fold the edit journal into questions.json."""
+        base = self.bank_source()
+        try:
+            self.questions, self.questions_version = self.bank.compact(default={})
+        except Exception as e:
+            metrics.count_error("compact", e)
+            print(f"❌ Error compacting questions: {e}")
+            return
+        self.record_search(search_index.source_op(base, self.bank_source()))
+    
     def add_question(self):
         """Interactive function to add a new question."""
         print("\n" + "=" * 50)
@@ -111,17 +301,48 @@ class QuestionManager:
             "correct": correct_index,
             "explanation": explanation if explanation else f"The correct answer is {options[correct_index]}."
         }
+        assign_id(new_question)
+        
+        # Flag reworded copies of questions already in the bank
+        index = self.near_duplicate_index()
+        matches = index.query(new_question, limit=3)
+        if matches:
+            print("\n⚠️  This looks similar to existing questions:")
+            for similarity, (cat, diff, question) in matches:
+                print(f"  {similarity:.0%} - {cat}/{diff}: {question.get('question', '')}")
+            if input("Add it anyway? (y/n): ").strip().lower() not in ['y', 'yes']:
+                print("❌ Question not added.")
+                return
         
         # Add to questions
-        if category not in self.questions:
-            self.questions[category] = {"easy": [], "medium": [], "hard": []}
-        
-        self.questions[category][difficulty].append(new_question)
+        def add(questions: Dict):
+            if category not in questions:
+                questions[category] = {"easy": [], "medium": [], "hard": []}
+            questions[category].setdefault(difficulty, []).append(new_question)
         
-        print(f"\n✅ Question added to {category} - {difficulty.title()}!")
-        self.save_questions()
+        if self.record_edit(add_op(category, difficulty, new_question), add):
+            print(f"\n✅ Question added to {category} - {difficulty.title()}! (id {new_question['id']})")
+    
+    def print_question(self, number: int, q: Dict):
+        """Print one question with its options, answer and explanation."""
+        print(f"  {number}. {q['question']}")
+        for j, option in enumerate(q['options']):
+            marker = "✓" if j == q['correct'] else " "
+            print(f"     {chr(65 + j)}. {option} {marker}")
+        if q.get('explanation'):
+            print(f"     💡 {q['explanation']}")
+        print(f"     🆔 {question_id(q)}")
+        print()
     
     def view_questions(self):
+        """Search the questions, or display them all by category and difficulty."""
+        mode = input("\nSearch questions or show all? (s/a, default s): ").strip().lower()
+        if mode in ['a', 'all']:
+            self.view_all_questions()
+        else:
+            self.search_questions()
+    
+    def view_all_questions(self):
         """Display all questions organized by category and difficulty."""
         print("\n" + "=" * 60)
         print("📚 ALL QUESTIONS")
@@ -135,14 +356,42 @@ class QuestionManager:
                 if questions:
                     print(f"\n{difficulty.title()} ({len(questions)} questions):")
                     for i, q in enumerate(questions, 1):
-                        print(f"  {i}. {q['question']}")
-                        for j, option in enumerate(q['options']):
-                            marker = "✓" if j == q['correct'] else " "
-                            print(f"     {chr(65 + j)}. {option} {marker}")
-                        if q.get('explanation'):
-                            print(f"     💡 {q['explanation']}")
-                        print()
+                        self.print_question(i, q)
+    
+    def search_questions(self):
+        """Find questions by words in their text, options or explanation."""
+        print("\n" + "=" * 60)
+        print("🔎 SEARCH QUESTIONS")
+        print("=" * 60)
+        
+        query = input("\nSearch for (words or word prefixes): ").strip()
+        if not query:
+            print("❌ Search cannot be empty.")
+            return
+        
+        categories = list(self.questions.keys())
+        for i, cat in enumerate(categories, 1):
+            print(f"{i}. {cat}")
+        choice = input(f"Category (1-{len(categories)}, Enter for all): ").strip()
+        category = categories[int(choice) - 1] if choice.isdigit() and 1 <= int(choice) <= len(categories) else None
+        
+        difficulties = ["easy", "medium", "hard"]
+        choice = input("Difficulty (1. Easy, 2. Medium, 3. Hard, Enter for all): ").strip()
+        difficulty = difficulties[int(choice) - 1] if choice in ['1', '2', '3'] else None
+        
+        index = self.load_search_index()
+        start = time.perf_counter()
+        total, results = index.search(query, category, difficulty)
+        elapsed = (time.perf_counter() - start) * 1000
+        
+        print(f"\n{total} matching questions ({elapsed:.1f} ms)")
+        for i, (cat, diff, q) in enumerate(results, 1):
+            print(f"\n🏷️  {cat} - {diff.title()}")
+            self.print_question(i, q)
+        if total > len(results):
+            print(f"... and {total - len(results)} more; refine the search to narrow them down.")
     
+    @metrics.timed("view_statistics")
     def view_statistics(self):
         """Display statistics about the question database."""
         print("\n" + "=" * 50)
@@ -189,13 +438,66 @@ class QuestionManager:
         max_diff = max(difficulty_stats.values())
         if max_diff > min_diff * 2:
             print("  • Consider balancing difficulty levels")
-    
+
+    def validate_questions(self):
+        """Check every question and show a summary of the problems found."""
+        print("\n" + "=" * 50)
+        print("🔍 VALIDATE QUESTIONS")
+        print("=" * 50)
+
+        fuzzy = input("Also look for reworded questions? This takes longer (y/n): ").strip().lower() in ['y', 'yes']
+        report = bank_validator.validate(self.questions, fuzzy=fuzzy)
+        print(f"Checked {report['questions']} questions in {report['elapsed']:.2f}s "
+              f"({report['workers']} workers)")
+        print(f"Errors: {report['errors']}  Warnings: {report['warnings']}")
+
+        for issue in report['issues'][:20]:
+            icon = "❌" if issue['severity'] == bank_validator.ERROR else "⚠️ "
+            where = f"{issue['category']}/{issue['difficulty']}"
+            if issue['index'] is not None:
+                where += f" #{issue['index'] + 1}"
+            print(f"  {icon} {where}: {issue['message']}")
+        if len(report['issues']) > 20:
+            print(f"  ... and {len(report['issues']) - 20} more")
+
+        for group in report['duplicates'][:10]:
+            places = ", ".join(f"{loc['category']}/{loc['difficulty']} #{loc['index'] + 1}"
+                               for loc in group['locations'])
+            print(f"  🔁 Same question in: {places}")
+
+        for pair in report['near_duplicates'][:10]:
+            places = " ~ ".join(f"{loc['category']}/{loc['difficulty']} #{loc['index'] + 1}"
+                                for loc in pair['locations'])
+            print(f"  🔀 {pair['similarity']:.0%} similar: {places}")
+
+        for hint in report['balance']['hints']:
+            print(f"  • {hint}")
+
+        filename = input("\nSave the full report as JSON? Enter a filename or press Enter to skip: ").strip()
+        if filename:
+            try:
+                with open(filename, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, indent=2, ensure_ascii=False)
+                print(f"✅ Report saved to {filename}")
+            except OSError as e:
+                print(f"❌ Error saving report: {e}")
+
     def delete_question(self):
         """Interactive function to delete a question."""
         print("\n" + "=" * 50)
         print("🗑️  DELETE QUESTION")
         print("=" * 50)
         
+        # A known id goes straight to the question
+        wanted = input("\nEnter the question id, or press Enter to browse: ").strip().lower()
+        if wanted:
+            found = self.id_index().get(wanted)
+            if found is None:
+                print("❌ No question has that id.")
+                return
+            self.confirm_delete(*found)
+            return
+        
         # Select category
         categories = list(self.questions.keys())
         if not categories:
@@ -258,16 +560,23 @@ class QuestionManager:
             except ValueError:
                 print("❌ Please enter a valid number.")
         
-        # Confirm deletion
-        question_to_delete = questions[question_index]
+        self.confirm_delete(category, difficulty, questions[question_index])
+    
+    def confirm_delete(self, category: str, difficulty: str, question_to_delete: Dict):
+        """Ask for confirmation, then journal the deletion of one question."""
         print(f"\n⚠️  Are you sure you want to delete this question?")
         print(f"Question: {question_to_delete['question']}")
+        print(f"Id: {question_id(question_to_delete)}")
         
         confirm = input("\nType 'yes' to confirm deletion: ").strip().lower()
         if confirm == 'yes':
-            del self.questions[category][difficulty][question_index]
-            print("✅ Question deleted successfully!")
-            self.save_questions()
+            def delete(questions: Dict):
+                bucket = questions[category][difficulty]
+                position = next(i for i, item in enumerate(bucket) if item is question_to_delete)
+                del bucket[position]
+            
+            if self.record_edit(delete_op(category, difficulty, question_to_delete), delete):
+                print("✅ Question deleted successfully!")
         else:
             print("❌ Deletion cancelled.")
     
@@ -283,9 +592,10 @@ class QuestionManager:
             print("4. 🗑️  Delete Question")
             print("5. 💾 Export Questions")
             print("6. 📁 Import Questions")
-            print("7. 🚪 Exit")
+            print("7. 🔍 Validate Questions")
+            print("8. 🚪 Exit")
             
-            choice = input("\nSelect an option (1-7): ").strip()
+            choice = input("\nSelect an option (1-8): ").strip()
             
             if choice == "1":
                 self.add_question()
@@ -300,50 +610,70 @@ class QuestionManager:
             elif choice == "6":
                 self.import_questions()
             elif choice == "7":
+                self.validate_questions()
+            elif choice == "8":
                 print("👋 Goodbye!")
                 break
             else:
-                print("❌ Invalid choice. Please select 1-7.")
+                print("❌ Invalid choice. Please select 1-8.")
     
+    @metrics.timed("export_questions")
     def export_questions(self):
-        """Export questions to a backup file."""
-        filename = input("\nEnter filename for export (e.g., backup.json): ").strip()
+        """Export questions to a backup file (.json, .jsonl, optionally .gz)."""
+        filename = input("\nEnter filename for export (e.g., backup.json, backup.jsonl.gz): ").strip()
         if not filename:
             filename = f"questions_backup_{int(time.time())}.json"
+        shard = input("Write one file per category? (y/n, default n): ").strip().lower() in ['y', 'yes']
         
         try:
-            with open(filename, 'w') as f:
-                json.dump(self.questions, f, indent=2)
-            print(f"✅ Questions exported to {filename}")
+            written = export_questions(self.questions, filename, shard=shard)
+            for path, size in written.items():
+                print(f"✅ Questions exported to {path} ({size:,} bytes)")
         except Exception as e:
+            metrics.count_error("export_questions", e)
             print(f"❌ Error exporting questions: {e}")
     
+    @metrics.timed("import_questions")
     def import_questions(self):
-        """Import questions from a file."""
+        """Import questions from a bank-layout JSON or JSON-lines file."""
         filename = input("\nEnter filename to import from: ").strip()
         if not os.path.exists(filename):
             print("❌ File not found.")
             return
         
+        index = self.near_duplicate_index()
+        indexed = len(index.labels)
         try:
-            with open(filename, 'r') as f:
-                imported_questions = json.load(f)
+            # Stream the file, skipping questions already in the bank, then
+            # merge everything new in a single write.
+            importer = QuestionImporter(self.questions, index)
+            importer.stage(filename)
             
-            # Merge with existing questions
-            for category, difficulties in imported_questions.items():
-                if category not in self.questions:
-                    self.questions[category] = {"easy": [], "medium": [], "hard": []}
-                
-                for difficulty, questions in difficulties.items():
-                    if difficulty in ["easy", "medium", "hard"]:
-                        self.questions[category][difficulty].extend(questions)
+            if importer.flagged:
+                print(f"\n⚠️  {len(importer.flagged)} questions look like rewordings of existing ones, e.g.:")
+                for _, _, question, (cat, diff, similar) in importer.flagged[:5]:
+                    print(f"  {question.get('question', '')}")
+                    print(f"    ~ {cat}/{diff}: {similar.get('question', '')}")
+                if input("Import them anyway? (y/n): ").strip().lower() in ['y', 'yes']:
+                    importer.stage_flagged()
             
-            self.save_questions()
-            print("✅ Questions imported successfully!")
+            if self.apply_change(importer.merge_into):
+                print("✅ Questions imported successfully!")
+                print(f"   Parsed: {importer.parsed} ({importer.throughput:,.0f} questions/s)")
+                print(f"   Added: {importer.added}")
+                print(f"   Duplicates skipped: {importer.duplicates}")
+                if importer.flagged:
+                    print(f"   Near-duplicates skipped: {len(importer.flagged)}")
+                if importer.skipped:
+                    print(f"   Invalid entries skipped: {importer.skipped}")
         except Exception as e:
+            metrics.count_error("import_questions", e)
             print(f"❌ Error importing questions: {e}")
+        finally:
+            # The index now holds the staged questions, merged or not.
+            self.sync_near_duplicates(indexed)
 
 if __name__ == "__main__":
-    import time
-    manager = QuestionManager()
-    manager.main_menu()
\ No newline at end of file
+    if sys.argv[1:2] == ["validate"]:
+        sys.exit(bank_validator.main(sys.argv[2:]))
+    metrics.run_profiled(lambda: QuestionManager().main_menu())
\ No newline at end of file
@@ -0,0 +1,407 @@
+import hashlib
+import random
+import sys
+from array import array
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+# Separates the UTF-8 encoded fields packed into one question blob.
+_FIELD_SEP = "\x00"
+_FIELD_SEP_BYTES = _FIELD_SEP.encode("utf-8")
+# Marks a schema key that was absent from the source question.
+_MISSING = object()
+_CORE_KEYS = ("id", "question", "options", "correct", "explanation")
+_HEX_DIGITS = frozenset("0123456789abcdef")
+ID_LENGTH = 16
+
+
+def normalize_text(text: str) -> str:
+    """Lower-case ``text`` and collapse runs of whitespace."""
+    return " ".join(str(text).split()).lower()
+
+
+def question_hash(question: Dict) -> str:
+    """Return a content key for a question: its normalized text and options.
+
+    Rewording the explanation or moving the question to another category
+    keeps the key; changing the question or any option changes it.
+    """
+    return content_key(normalize_text(question.get("question", "")),
+                       [normalize_text(option) for option in question.get("options", ())])
+
+
+def content_key(text: str, options: Sequence[str]) -> str:
+    """Return the key of ``question_hash`` from already normalized fields."""
+    parts = [text]
+    parts.extend(options)
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def is_question_id(value) -> bool:
+    """Whether ``value`` is a well-formed id: 16 lower-case hex digits."""
+    return isinstance(value, str) and len(value) == ID_LENGTH and _HEX_DIGITS.issuperset(value)
+
+
+def question_id(question: Dict) -> str:
+    """Return a question's stable id.
+
+    Questions get their content key as an ``id`` field when they are added
+    and keep it through edits, exports and imports. Questions saved before
+    ids existed fall back to their current content key.
+    """
+    value = question.get("id")
+    return value if isinstance(value, str) and value else question_hash(question)
+
+
+def assign_id(question: Dict) -> str:
+    """Give ``question`` an ``id`` field if it has none; return its id."""
+    value = question_id(question)
+    question["id"] = value
+    return value
+
+
+def id_value(value: str) -> int:
+    """A question id as a 64-bit integer, hashing ids not in the standard form."""
+    if is_question_id(value):
+        return int(value, 16)
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class QuestionRecord:
+    """Decoded view of a single stored question."""
+
+    __slots__ = ("question", "options", "correct", "explanation", "category", "difficulty")
+
+    def __init__(self, question: str, options: Tuple[str, ...], correct: int,
+                 explanation: Optional[str], category: str, difficulty: str):
+        self.question = question
+        self.options = options
+        self.correct = correct
+        self.explanation = explanation
+        self.category = category
+        self.difficulty = difficulty
+
+    def to_dict(self) -> Dict:
+        """Return the question in the ``questions.json`` schema."""
+        question = {
+            "question": self.question,
+            "options": list(self.options),
+            "correct": self.correct,
+        }
+        if self.explanation is not None:
+            question["explanation"] = self.explanation
+        return question
+
+
+class QuestionStore:
+    """Compact, read-only question pool indexed by category and difficulty.
+
+    Questions are laid out in one flat sequence, grouped by category and then
+    by difficulty, so every index entry is just a ``(start, end)`` range.
+    Each question's text, options and explanation are packed into a single
+    UTF-8 ``bytes`` blob and its ``correct`` index lives in an ``array``;
+    category and difficulty are implied by the range a question falls in.
+    Drawing a quiz samples positions from those ranges instead of copying
+    and shuffling the whole pool, and only the drawn questions are decoded.
+    Stable ids are kept as 64-bit integers in another ``array``, 0 standing
+    for a question without an ``id`` field.
+    """
+
+    def __init__(self, questions: Dict):
+        self._blobs: Sequence = []
+        self._correct: Sequence[int] = array("b")
+        self._ids: Sequence[int] = array("Q")
+        # Sparse per-question overrides for anything the packed form cannot
+        # hold: extra keys, a missing explanation or an unusual ``correct``.
+        self._extras: Dict[int, Dict] = {}
+
+        buckets = []
+        for category, difficulties in questions.items():
+            for difficulty, items in difficulties.items():
+                start = len(self._blobs)
+                for question in items:
+                    self._append(question)
+                buckets.append((category, difficulty, start, len(self._blobs)))
+        self._build_index(list(questions), buckets)
+
+    def _build_index(self, categories: List[str], buckets: List[Tuple[str, str, int, int]]):
+        """Index ``(category, difficulty, start, end)`` buckets laid out in order."""
+        self._key_index: Optional[Dict[str, int]] = None
+        self._buckets: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._categories: Dict[str, Tuple[int, int]] = {}
+        self._difficulties: Dict[str, List[Tuple[int, int]]] = {}
+        # Start offsets of non-empty buckets, for mapping an index back to
+        # its category and difficulty.
+        self._bucket_starts: List[int] = []
+        self._bucket_keys: List[Tuple[str, str]] = []
+
+        for category in categories:
+            self._categories[sys.intern(category)] = (0, 0)
+        for category, difficulty, start, end in buckets:
+            category = sys.intern(category)
+            difficulty = sys.intern(difficulty)
+            self._buckets[(category, difficulty)] = (start, end)
+            first, last = self._categories[category]
+            self._categories[category] = (first if last > first else start, end)
+            if end > start:
+                self._difficulties.setdefault(difficulty, []).append((start, end))
+                self._bucket_starts.append(start)
+                self._bucket_keys.append((category, difficulty))
+
+    def _append(self, question: Dict):
+        """Pack one question dict onto the end of the store."""
+        index = len(self._blobs)
+        extras = {key: value for key, value in question.items() if key not in _CORE_KEYS}
+
+        explanation = question.get("explanation", _MISSING)
+        if explanation is _MISSING:
+            extras["explanation"] = _MISSING
+            explanation = ""
+        fields = [question.get("question", ""), *question.get("options", ()), explanation]
+        if all(isinstance(field, str) and _FIELD_SEP not in field for field in fields):
+            self._blobs.append(_FIELD_SEP.join(fields).encode("utf-8"))
+        else:
+            self._blobs.append(tuple(fields))
+
+        correct = question.get("correct", _MISSING)
+        if isinstance(correct, int) and not isinstance(correct, bool) and -128 <= correct <= 127:
+            self._correct.append(correct)
+        else:
+            self._correct.append(-1)
+            extras["correct"] = correct
+
+        qid = question.get("id", _MISSING)
+        if is_question_id(qid) and int(qid, 16):
+            self._ids.append(int(qid, 16))
+        else:
+            self._ids.append(0)
+            if qid is not _MISSING:
+                extras["id"] = qid
+
+        if extras:
+            self._extras[index] = extras
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    def categories(self) -> List[str]:
+        """Return category names in bank order."""
+        return list(self._categories)
+
+    def _bucket_at(self, index: int) -> Tuple[str, str]:
+        """Return the ``(category, difficulty)`` that ``index`` falls in."""
+        return self._bucket_keys[bisect_right(self._bucket_starts, index) - 1]
+
+    def location(self, index: int) -> Tuple[str, str]:
+        """Return the ``(category, difficulty)`` of the question at ``index``."""
+        return self._bucket_at(index)
+
+    def category_range(self, category: str) -> Tuple[int, int]:
+        """Return the ``(start, end)`` positions of a category's questions."""
+        return self._categories.get(category, (0, 0))
+
+    def _fields(self, index: int) -> Sequence[str]:
+        """Return ``[question, *options, explanation]`` for ``index``."""
+        blob = self._blobs[index]
+        return blob.decode("utf-8").split(_FIELD_SEP) if isinstance(blob, bytes) else blob
+
+    def encoded_fields(self, index: int) -> List[bytes]:
+        """Return ``[question, *options, explanation]`` for ``index`` as UTF-8.
+
+        Packed fields are split without decoding them. Raises ``ValueError``
+        if a field is not text.
+        """
+        blob = self._blobs[index] if self._blobs else None
+        if isinstance(blob, bytes):
+            return blob.split(_FIELD_SEP_BYTES)
+        fields = self._fields(index)
+        if not all(isinstance(field, str) for field in fields):
+            raise ValueError(f"Question {index} has non-text fields")
+        return [field.encode("utf-8") for field in fields]
+
+    def buckets(self) -> List[Tuple[str, str, int, int]]:
+        """Return ``(category, difficulty, start, end)`` for every bucket, in order."""
+        return [(category, difficulty, start, end)
+                for (category, difficulty), (start, end) in self._buckets.items()]
+
+    def columns(self) -> Tuple[Sequence[int], Sequence[int]]:
+        """Return the packed ``correct`` and integer id columns.
+
+        -1 and 0 mark values that are kept in the overrides instead.
+        """
+        return self._correct, self._ids
+
+    def overrides(self) -> Iterator[Tuple[int, Dict, List[str]]]:
+        """Yield ``(index, present, absent)`` for every question with overrides.
+
+        ``present`` maps the keys the packed form cannot hold to their
+        values; ``absent`` lists schema keys the source question lacked.
+        """
+        for index, extras in self._extras.items():
+            yield (index, {key: value for key, value in extras.items() if value is not _MISSING},
+                   [key for key, value in extras.items() if value is _MISSING])
+
+    def record(self, index: int) -> QuestionRecord:
+        """Decode the question stored at ``index``."""
+        fields = self._fields(index)
+        category, difficulty = self._bucket_at(index)
+        explanation = fields[-1]
+        correct = self._correct[index]
+
+        extras = self._extras.get(index)
+        if extras:
+            if extras.get("explanation") is _MISSING:
+                explanation = None
+            correct = extras.get("correct", correct)
+        return QuestionRecord(fields[0], tuple(fields[1:-1]), correct, explanation,
+                              category, difficulty)
+
+    def answer_key(self, index: int) -> Tuple[int, str]:
+        """Return ``(correct, difficulty)`` for ``index`` without decoding text."""
+        extras = self._extras.get(index)
+        correct = extras.get("correct", self._correct[index]) if extras else self._correct[index]
+        return correct, self._bucket_at(index)[1]
+
+    def question_id(self, index: int) -> str:
+        """Return the stable id of the question at ``index``."""
+        value = self._ids[index]
+        if value:
+            return f"{value:016x}"
+        extras = self._extras.get(index)
+        if extras and isinstance(extras.get("id"), str) and extras["id"]:
+            return extras["id"]
+        return question_hash(self.record(index).to_dict())
+
+    def find(self, key: str) -> Optional[int]:
+        """Return the index of the question with id ``key`` (see ``question_id``).
+
+        The id index is built on first use; only questions without a stored
+        id need hashing.
+        """
+        if self._key_index is None:
+            self._key_index = {}
+            for index in range(len(self)):
+                self._key_index.setdefault(self.question_id(index), index)
+        return self._key_index.get(key)
+
+    def question_dict(self, index: int) -> Dict:
+        """Return the question at ``index`` in the ``questions.json`` schema."""
+        question = self.record(index).to_dict()
+        if self._ids[index]:
+            question = {"id": f"{self._ids[index]:016x}", **question}
+        extras = self._extras.get(index)
+        if extras:
+            for key, value in extras.items():
+                if value is _MISSING:
+                    question.pop(key, None)
+                else:
+                    question[key] = value
+        return question
+
+    def quiz_question(self, index: int) -> Mapping:
+        """Return a read-only view of the question at ``index`` tagged with its ``difficulty``.
+
+        Options come as a tuple, so nothing handed to a quiz can be mutated
+        and sessions on different threads never share writable state.
+        """
+        question = self.question_dict(index)
+        question["options"] = tuple(question.get("options", ()))
+        question["difficulty"] = self._bucket_at(index)[1]
+        return MappingProxyType(question)
+
+    def to_dict(self) -> Dict:
+        """Rebuild the nested ``{category: {difficulty: [question]}}`` bank."""
+        bank: Dict = {category: {} for category in self._categories}
+        for (category, difficulty), (start, end) in self._buckets.items():
+            bank[category][difficulty] = [
+                self.question_dict(index) for index in range(start, end)
+            ]
+        return bank
+
+    def _ranges(self, category: Optional[str], difficulty: Optional[str]) -> List[Tuple[int, int]]:
+        """Return the index ranges covering a category/difficulty selection.
+
+        ``None`` means "any" for either argument.
+        """
+        if category is None and difficulty is None:
+            return [(0, len(self))]
+        if category is None:
+            return self._difficulties.get(difficulty, [])
+        if difficulty is None:
+            return [self._categories[category]] if category in self._categories else []
+        bucket = self._buckets.get((category, difficulty))
+        return [bucket] if bucket else []
+
+    def count(self, category: Optional[str] = None, difficulty: Optional[str] = None) -> int:
+        """Return the number of questions matching the selection."""
+        return sum(end - start for start, end in self._ranges(category, difficulty))
+
+    def sample(self, category: Optional[str], difficulty: Optional[str], num_questions: int,
+               rng: random.Random = random,
+               exclude: Optional[Callable[[int], bool]] = None) -> List[Mapping]:
+        """Draw up to ``num_questions`` distinct questions in random order.
+
+        Runs in O(num_questions) for a single range; selections spanning
+        several ranges add a binary search per drawn question. Each returned
+        question is a read-only view (see ``quiz_question``). The draw
+        depends only on the bank and ``rng``: pass a seeded
+        ``random.Random`` to get the same quiz again, and one per thread to
+        draw concurrently.
+
+        Positions for which ``exclude`` returns true (e.g. questions the
+        player has already seen) are only drawn once nothing else is left.
+        """
+        ranges = self._ranges(category, difficulty)
+        sizes = [end - start for start, end in ranges]
+        total = sum(sizes)
+        if total == 0 or num_questions <= 0:
+            return []
+
+        # Prefix sums let us map a position in the concatenated ranges back
+        # to an index in the flat question list.
+        bounds = []
+        running = 0
+        for size in sizes:
+            running += size
+            bounds.append(running)
+
+        def position(offset: int) -> int:
+            slot = bisect_right(bounds, offset)
+            base = bounds[slot - 1] if slot else 0
+            return ranges[slot][0] + offset - base
+
+        count = min(num_questions, total)
+        if exclude is None:
+            positions = [position(offset) for offset in rng.sample(range(total), count)]
+        else:
+            positions = self._sample_excluding(ranges, total, count, position, exclude, rng)
+        return [self.quiz_question(index) for index in positions]
+
+    def _sample_excluding(self, ranges: List[Tuple[int, int]], total: int, count: int,
+                          position: Callable[[int], int], exclude: Callable[[int], bool],
+                          rng: random.Random) -> List[int]:
+        """Draw ``count`` positions, preferring ones ``exclude`` rejects.
+
+        Rejection sampling costs O(count / unexcluded fraction) tests; once
+        most of the selection is excluded, one sweep over its ranges finds
+        what is left.
+        """
+        picked: Dict[int, None] = {}
+        attempts = 8 * count + 32
+        while len(picked) < count and attempts:
+            attempts -= 1
+            index = position(rng.randrange(total))
+            if index not in picked and not exclude(index):
+                picked[index] = None
+        if len(picked) < count:
+            rest = [index for start, end in ranges for index in range(start, end)
+                    if index not in picked and not exclude(index)]
+            picked.update(dict.fromkeys(rng.sample(rest, min(count - len(picked), len(rest)))))
+        if len(picked) < count:
+            rest = [index for start, end in ranges for index in range(start, end)
+                    if index not in picked]
+            picked.update(dict.fromkeys(rng.sample(rest, count - len(picked))))
+        positions = list(picked)
+        rng.shuffle(positions)
+        return positions
@@ -1,133 +1,118 @@
-import json
 import random
 import time
-from typing import List, Dict, Tuple
-import os
+from typing import List, Dict, Mapping, Optional, Tuple
+import weakref
+
+import metrics
+from adaptive import AdaptiveEngine
+from backends import open_backend
+from bank_provider import BankProvider
+from leaderboard import TIMESTAMP_FORMAT
+from player_history import PlayerHistory
+from question_store import QuestionStore
+from spaced_repetition import SpacedRepetition
+from quiz_session import QuizSession, get_points, grade_for
+
+# Menu choice -> (leaderboard window, title)
+HIGH_SCORE_WINDOWS = {"1": ("all", "ALL TIME"), "2": ("weekly", "THIS WEEK"), "3": ("daily", "TODAY")}
 
 class QuizGame:
-    def __init__(self):
-        self.questions = self.load_questions()
-        self.score = 0
-        self.total_questions = 0
-        self.correct_answers = 0
-        self.user_name = ""
-        self.current_category = ""
-        self.current_difficulty = ""
-        
-    def load_questions(self) -> Dict:
-        """Load questions from the questions file or create default questions."""
-        if os.path.exists('questions.json'):
+    def __init__(self, seed: Optional[int] = None):
+        self.backend = open_backend()
+        self.bank = BankProvider(self.load_store, self.backend.path, self.backend.compiled_path,
+                                 signature=self.backend.signature, prepare=self.prepare_engines)
+        self.scores = self.backend.open_scores()
+        self.session = QuizSession(user_name="", seed=seed)
+        # Seeded games replay the same quizzes, so they ignore answer history.
+        self.seed = seed
+        # Built on first use: rating every question costs a pass over the bank.
+        self.adaptive = None
+        self.reviews = None
+        self.history = None
+        # Engines built over a bank that has since been reloaded; quizzes
+        # still running on them keep them alive until their last flush.
+        self._retired = weakref.WeakSet()
+        # Engines built by the reload thread for the store it is about to publish.
+        self._prepared: Dict[str, object] = {}
+
+    @property
+    def store(self) -> QuestionStore:
+        """The current question bank; read it once per operation for a consistent view."""
+        return self.bank.store
+        
+    @metrics.timed("load_store")
+    def load_store(self) -> QuestionStore:
+        """Open the question store to draw quizzes from, through the storage backend."""
+        return self.backend.load_store()
+
+    def prepare_engines(self, store: QuestionStore):
+        """Build the engines in use over a reloaded store, off the thread serving players.
+
+        Called by the bank provider's reload thread before it publishes
+        ``store``. The current engines are flushed first so the new ones
+        load their latest ratings and reviews.
+        """
+        prepared = {}
+        for name, engine, build in (("adaptive", self.adaptive, AdaptiveEngine),
+                                    ("reviews", self.reviews, SpacedRepetition)):
+            if engine is None:
+                continue
             try:
-                with open('questions.json', 'r') as f:
-                    return json.load(f)
-            except:
-                pass
-        
-        # Default questions if file doesn't exist
-        return {
-            "General Knowledge": {
-                "easy": [
-                    {
-                        "question": "What is the capital of France?",
-                        "options": ["London", "Berlin", "Paris", "Madrid"],
-                        "correct": 2,
-                        "explanation": "Paris is the capital and most populous city of France."
-                    },
-                    {
-                        "question": "Which planet is known as the Red Planet?",
-                        "options": ["Venus", "Mars", "Jupiter", "Saturn"],
-                        "correct": 1,
-                        "explanation": "Mars is called the Red Planet due to iron oxide on its surface."
-                    },
-                    {
-                        "question": "How many continents are there?",
-                        "options": ["5", "6", "7", "8"],
-                        "correct": 2,
-                        "explanation": "There are 7 continents: Asia, Africa, North America, South America, Antarctica, Europe, and Australia."
-                    }
-                ],
-                "medium": [
-                    {
-                        "question": "What is the largest ocean on Earth?",
-                        "options": ["Atlantic", "Indian", "Arctic", "Pacific"],
-                        "correct": 3,
-                        "explanation": "The Pacific Ocean is the largest ocean, covering about 46% of Earth's water surface."
-                    },
-                    {
-                        "question": "In which year did World War II end?",
-                        "options": ["1944", "1945", "1946", "1947"],
-                        "correct": 1,
-                        "explanation": "World War II ended in 1945 with the surrender of Japan in September."
-                    }
-                ],
-                "hard": [
-                    {
-                        "question": "What is the smallest country in the world?",
-                        "options": ["Monaco", "Vatican City", "San Marino", "Liechtenstein"],
-                        "correct": 1,
-                        "explanation": "Vatican City is the smallest sovereign state in the world by area and population."
-                    }
-                ]
-            },
-            "Science": {
-                "easy": [
-                    {
-                        "question": "What gas do plants absorb from the atmosphere?",
-                        "options": ["Oxygen", "Nitrogen", "Carbon Dioxide", "Hydrogen"],
-                        "correct": 2,
-                        "explanation": "Plants absorb carbon dioxide during photosynthesis to create glucose and oxygen."
-                    },
-                    {
-                        "question": "How many bones are in the adult human body?",
-                        "options": ["206", "208", "210", "212"],
-                        "correct": 0,
-                        "explanation": "An adult human body has 206 bones."
-                    }
-                ],
-                "medium": [
-                    {
-                        "question": "What is the chemical symbol for gold?",
-                        "options": ["Go", "Gd", "Au", "Ag"],
-                        "correct": 2,
-                        "explanation": "Au is the chemical symbol for gold, derived from the Latin word 'aurum'."
-                    }
-                ],
-                "hard": [
-                    {
-                        "question": "What is the speed of light in vacuum?",
-                        "options": ["299,792,458 m/s", "300,000,000 m/s", "299,800,000 m/s", "298,000,000 m/s"],
-                        "correct": 0,
-                        "explanation": "The speed of light in vacuum is exactly 299,792,458 meters per second."
-                    }
-                ]
-            },
-            "History": {
-                "easy": [
-                    {
-                        "question": "Who was the first President of the United States?",
-                        "options": ["Thomas Jefferson", "George Washington", "John Adams", "Benjamin Franklin"],
-                        "correct": 1,
-                        "explanation": "George Washington was the first President of the United States, serving from 1789 to 1797."
-                    }
-                ],
-                "medium": [
-                    {
-                        "question": "In which year did the Berlin Wall fall?",
-                        "options": ["1987", "1988", "1989", "1990"],
-                        "correct": 2,
-                        "explanation": "The Berlin Wall fell on November 9, 1989, marking the beginning of German reunification."
-                    }
-                ],
-                "hard": [
-                    {
-                        "question": "Which empire was ruled by Julius Caesar?",
-                        "options": ["Greek Empire", "Roman Empire", "Byzantine Empire", "Ottoman Empire"],
-                        "correct": 1,
-                        "explanation": "Julius Caesar was a Roman general and statesman who played a critical role in the Roman Republic."
-                    }
-                ]
-            }
-        }
+                engine.flush()
+                prepared[name] = build(store)
+            except (OSError, ValueError) as e:
+                # The engine is then built on first use, as without a reload thread.
+                metrics.count_error("prepare_engines", e)
+        self._prepared = prepared
+
+    def _current_engine(self, name: str, engine, build):
+        """``engine`` if it is over the current store, else a prepared or new one."""
+        store = self.store
+        if engine is not None and engine.store is store:
+            return engine
+        if engine is not None:
+            self._retired.add(engine)
+        prepared = self._prepared.get(name)
+        return prepared if prepared is not None and prepared.store is store else build(store)
+
+    def get_adaptive_engine(self) -> AdaptiveEngine:
+        """Return the adaptive engine, loading saved ratings on first use."""
+        self.adaptive = self._current_engine("adaptive", self.adaptive, AdaptiveEngine)
+        return self.adaptive
+
+    def get_review_scheduler(self) -> SpacedRepetition:
+        """Return the spaced-repetition scheduler, loading saved reviews on first use."""
+        self.reviews = self._current_engine("reviews", self.reviews, SpacedRepetition)
+        return self.reviews
+
+    def get_player_history(self) -> PlayerHistory:
+        """Return the players' answer history, reading the log on first use."""
+        if self.history is None:
+            self.history = PlayerHistory()
+        return self.history
+
+    def get_picker(self, player: str, category: str, difficulty: str,
+                   rng: Optional[random.Random] = None):
+        """Return the one-question-at-a-time picker for adaptive and review quizzes."""
+        category = None if category == "Random Mix" else category
+        rng = rng or self.session.rng
+        if difficulty == "adaptive":
+            return self.get_adaptive_engine().quiz(player, category, rng)
+        if difficulty == "review":
+            return self.get_review_scheduler().quiz(player, category, rng)
+        return None
+
+    @metrics.timed("flush_progress")
+    def flush_progress(self):
+        """Log answers and journal rating and review changes from the last quiz."""
+        for engine in (self.history, self.adaptive, self.reviews, *list(self._retired)):
+            if engine is not None:
+                engine.flush()
+
+    @metrics.timed("load_questions")
+    def load_questions(self) -> Dict:
+        """Load questions from the storage backend or create default questions."""
+        return self.backend.load_questions()
     
     def display_welcome(self):
         """Display welcome message and get user name."""
@@ -138,11 +123,11 @@ class QuizGame:
         print("Score points for correct answers and see how you rank!")
         print("-" * 60)
         
-        self.user_name = input("Please enter your name: ").strip()
-        if not self.user_name:
-            self.user_name = "Player"
+        self.session.user_name = input("Please enter your name: ").strip()
+        if not self.session.user_name:
+            self.session.user_name = "Player"
         
-        print(f"\nHello {self.user_name}! Let's start your quiz adventure! 🚀")
+        print(f"\nHello {self.session.user_name}! Let's start your quiz adventure! 🚀")
         
     def display_categories(self):
         """Display available categories and let user choose."""
@@ -150,9 +135,10 @@ class QuizGame:
         print("📚 AVAILABLE CATEGORIES")
         print("=" * 40)
         
-        categories = list(self.questions.keys())
+        store = self.store
+        categories = store.categories()
         for i, category in enumerate(categories, 1):
-            question_count = sum(len(self.questions[category][diff]) for diff in self.questions[category])
+            question_count = store.count(category)
             print(f"{i}. {category} ({question_count} questions)")
         
         print(f"{len(categories) + 1}. Random Mix (All categories)")
@@ -161,10 +147,10 @@ class QuizGame:
             try:
                 choice = int(input(f"\nSelect a category (1-{len(categories) + 1}): "))
                 if 1 <= choice <= len(categories):
-                    self.current_category = categories[choice - 1]
-                    return self.current_category
+                    self.session.current_category = categories[choice - 1]
+                    return self.session.current_category
                 elif choice == len(categories) + 1:
-                    self.current_category = "Random Mix"
+                    self.session.current_category = "Random Mix"
                     return "Random Mix"
                 else:
                     print("❌ Invalid choice. Please try again.")
@@ -177,12 +163,14 @@ class QuizGame:
         print("⚡ DIFFICULTY LEVELS")
         print("=" * 40)
         
-        difficulties = ["easy", "medium", "hard", "mixed"]
+        difficulties = ["easy", "medium", "hard", "mixed", "adaptive", "review"]
         difficulty_info = {
             "easy": "Easy (1 point per question) 🟢",
             "medium": "Medium (2 points per question) 🟡", 
             "hard": "Hard (3 points per question) 🔴",
-            "mixed": "Mixed (All difficulties) 🌈"
+            "mixed": "Mixed (All difficulties) 🌈",
+            "adaptive": "Adaptive (Questions matched to your skill) 🧠",
+            "review": "Review (Spaced repetition of questions due again) 🔁"
         }
         
         for i, diff in enumerate(difficulties, 1):
@@ -192,53 +180,35 @@ class QuizGame:
             try:
                 choice = int(input(f"\nSelect difficulty (1-{len(difficulties)}): "))
                 if 1 <= choice <= len(difficulties):
-                    self.current_difficulty = difficulties[choice - 1]
-                    return self.current_difficulty
+                    self.session.current_difficulty = difficulties[choice - 1]
+                    return self.session.current_difficulty
                 else:
                     print("❌ Invalid choice. Please try again.")
             except ValueError:
                 print("❌ Please enter a valid number.")
     
-    def get_questions_for_quiz(self, category: str, difficulty: str, num_questions: int = 10) -> List[Dict]:
-        """Get questions based on selected category and difficulty."""
-        all_questions = []
-        
-        if category == "Random Mix":
-            # Get questions from all categories
-            for cat in self.questions:
-                if difficulty == "mixed":
-                    for diff in self.questions[cat]:
-                        all_questions.extend(self.questions[cat][diff])
-                else:
-                    if difficulty in self.questions[cat]:
-                        all_questions.extend(self.questions[cat][diff])
-        else:
-            # Get questions from specific category
-            if difficulty == "mixed":
-                for diff in self.questions[category]:
-                    all_questions.extend(self.questions[category][diff])
-            else:
-                if difficulty in self.questions[category]:
-                    all_questions.extend(self.questions[category][diff])
-        
-        # Add difficulty info to questions for scoring
-        for q in all_questions:
-            if 'difficulty' not in q:
-                # Determine difficulty based on the difficulty level or infer from point structure
-                if difficulty != "mixed":
-                    q['difficulty'] = difficulty
-                else:
-                    # For mixed, we'll assign based on question complexity (this is a simplified approach)
-                    q['difficulty'] = 'medium'  # Default for mixed
-        
-        # Shuffle and return requested number of questions
-        random.shuffle(all_questions)
-        return all_questions[:min(num_questions, len(all_questions))]
+    @metrics.timed("get_questions_for_quiz")
+    def get_questions_for_quiz(self, category: str, difficulty: str, num_questions: int = 10,
+                               player: Optional[str] = None,
+                               rng: Optional[random.Random] = None) -> List[Mapping]:
+        """Get read-only questions based on selected category and difficulty.
+
+        With a ``player``, questions they have not answered before come first.
+        Questions are drawn with ``rng``, by default the session's.
+        """
+        store = self.store
+        exclude = self.get_player_history().seen_test(player, store) if player else None
+        return store.sample(
+            None if category == "Random Mix" else category,
+            None if difficulty == "mixed" else difficulty,
+            num_questions,
+            rng or self.session.rng,
+            exclude=exclude,
+        )
     
     def get_points(self, difficulty: str) -> int:
         """Get points based on difficulty level."""
-        points_map = {"easy": 1, "medium": 2, "hard": 3}
-        return points_map.get(difficulty, 2)
+        return get_points(difficulty)
     
     def ask_question(self, question: Dict, question_num: int, total: int) -> bool:
         """Ask a single question and return whether it was answered correctly."""
@@ -254,6 +224,7 @@ class QuizGame:
             print(f"  {chr(65 + i)}. {option}")
         
         # Get user answer
+        shown = time.perf_counter()
         while True:
             answer = input("\nYour answer (A/B/C/D): ").strip().upper()
             if answer in ['A', 'B', 'C', 'D']:
@@ -261,15 +232,15 @@ class QuizGame:
                 break
             else:
                 print("❌ Please enter A, B, C, or D.")
+        metrics.observe_answer(time.perf_counter() - shown,
+                               difficulty=question.get('difficulty', 'medium'))
         
         # Check if correct
-        is_correct = user_choice == question['correct']
+        is_correct, points = self.session.record_answer(question, user_choice)
+        self.get_player_history().record(self.session.user_name, question, is_correct)
         correct_answer = question['options'][question['correct']]
         
         if is_correct:
-            points = self.get_points(question.get('difficulty', 'medium'))
-            self.score += points
-            self.correct_answers += 1
             print(f"\n✅ Correct! +{points} points")
         else:
             print(f"\n❌ Incorrect. The correct answer was: {chr(65 + question['correct'])}. {correct_answer}")
@@ -278,7 +249,7 @@ class QuizGame:
         if 'explanation' in question:
             print(f"💡 {question['explanation']}")
         
-        print(f"\nCurrent Score: {self.score}")
+        print(f"\nCurrent Score: {self.session.score}")
         
         # Small pause for better user experience
         time.sleep(2)
@@ -291,97 +262,72 @@ class QuizGame:
         print("🏆 QUIZ COMPLETED! 🏆")
         print("=" * 60)
         
-        accuracy = (self.correct_answers / self.total_questions) * 100 if self.total_questions > 0 else 0
+        accuracy = self.session.accuracy
         
-        print(f"Player: {self.user_name}")
-        print(f"Category: {self.current_category}")
-        print(f"Difficulty: {self.current_difficulty.title()}")
-        print(f"Questions Answered: {self.total_questions}")
-        print(f"Correct Answers: {self.correct_answers}")
+        print(f"Player: {self.session.user_name}")
+        print(f"Category: {self.session.current_category}")
+        print(f"Difficulty: {self.session.current_difficulty.title()}")
+        print(f"Questions Answered: {self.session.total_questions}")
+        print(f"Correct Answers: {self.session.correct_answers}")
         print(f"Accuracy: {accuracy:.1f}%")
-        print(f"Final Score: {self.score} points")
+        print(f"Final Score: {self.session.score} points")
+        if self.session.picker is not None:
+            print(self.session.picker.summary())
         
         # Performance evaluation
         print("\n" + "🎯 PERFORMANCE EVALUATION")
         print("-" * 40)
         
-        if accuracy >= 90:
-            grade = "A+ 🌟"
-            message = "Outstanding! You're a quiz master!"
-        elif accuracy >= 80:
-            grade = "A 🎉"
-            message = "Excellent work! You really know your stuff!"
-        elif accuracy >= 70:
-            grade = "B+ 👍"
-            message = "Great job! You're doing well!"
-        elif accuracy >= 60:
-            grade = "B 👌"
-            message = "Good effort! Keep practicing!"
-        elif accuracy >= 50:
-            grade = "C+ 💪"
-            message = "Not bad! There's room for improvement!"
-        else:
-            grade = "C 📚"
-            message = "Keep studying and try again!"
+        grade, message = grade_for(accuracy)
         
         print(f"Grade: {grade}")
         print(f"Message: {message}")
         
         # Save high score
-        self.save_score()
+        if self.save_score():
+            self.show_rank()
     
-    def save_score(self):
+    @metrics.timed("save_score")
+    def save_score(self) -> bool:
         """Save the score to a high scores file."""
-        score_data = {
-            "name": self.user_name,
-            "score": self.score,
-            "accuracy": (self.correct_answers / self.total_questions) * 100,
-            "category": self.current_category,
-            "difficulty": self.current_difficulty,
-            "questions": self.total_questions,
-            "correct": self.correct_answers,
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        scores = []
-        if os.path.exists('high_scores.json'):
-            try:
-                with open('high_scores.json', 'r') as f:
-                    scores = json.load(f)
-            except:
-                scores = []
-        
-        scores.append(score_data)
-        # Keep only top 10 scores
-        scores.sort(key=lambda x: x['score'], reverse=True)
-        scores = scores[:10]
+        score_data = self.session.score_record(time.strftime(TIMESTAMP_FORMAT))
         
         try:
-            with open('high_scores.json', 'w') as f:
-                json.dump(scores, f, indent=2)
+            self.scores.add(score_data)
             print("\n💾 Score saved to high scores!")
-        except:
+            return True
+        except OSError as e:
+            metrics.count_error("save_score", e)
             print("\n❌ Could not save score.")
+            return False
     
-    def show_high_scores(self):
-        """Display the high scores."""
-        if not os.path.exists('high_scores.json'):
-            print("\n📈 No high scores yet. Be the first to set a record!")
-            return
-        
+    @metrics.timed("show_rank")
+    def show_rank(self):
+        """Show where the game just saved ranks among every game played."""
         try:
-            with open('high_scores.json', 'r') as f:
-                scores = json.load(f)
-        except:
-            print("\n❌ Could not load high scores.")
+            board = self.scores.leaderboard()
+        except (OSError, ValueError) as e:
+            metrics.count_error("show_rank", e)
             return
-        
+        score = self.session.score
+        print(f"🌍 Global rank: #{board.rank(score):,} of {board.size():,} games "
+              f"(better than {board.percentile(score):.1f}%)")
+        print(f"📅 This week: #{board.rank(score, window='weekly'):,} of "
+              f"{board.size(window='weekly'):,} · Today: #{board.rank(score, window='daily'):,} of "
+              f"{board.size(window='daily'):,}")
+    
+    def show_high_scores(self):
+        """Display the high scores for all time, this week or today."""
+        print("\n1. All Time\n2. This Week\n3. Today")
+        choice = input("Select a leaderboard (1-3, default 1): ").strip() or "1"
+        window, title = HIGH_SCORE_WINDOWS.get(choice, HIGH_SCORE_WINDOWS["1"])
+        scores = self.scores.top(window=window)
         if not scores:
             print("\n📈 No high scores yet. Be the first to set a record!")
             return
         
         print("\n" + "=" * 60)
-        print("🏆 HIGH SCORES LEADERBOARD 🏆")
+        print(f"🏆 HIGH SCORES LEADERBOARD - {title} 🏆")
         print("=" * 60)
         
         for i, score in enumerate(scores, 1):
@@ -404,23 +350,35 @@ class QuizGame:
                 print("❌ Please enter a valid number.")
         
         # Get questions for the quiz
-        questions = self.get_questions_for_quiz(self.current_category, self.current_difficulty, num_questions)
+        picker = self.get_picker(self.session.user_name, self.session.current_category,
+                                 self.session.current_difficulty)
+        if picker is not None:
+            self.session.start([], picker=picker, total=num_questions)
+        else:
+            player = self.session.user_name if self.seed is None else None
+            self.session.start(self.get_questions_for_quiz(self.session.current_category,
+                                                           self.session.current_difficulty, num_questions,
+                                                           player))
         
-        if not questions:
+        if not self.session.questions:
             print("❌ No questions available for this selection. Please try different options.")
             return
         
-        self.total_questions = len(questions)
-        
-        print(f"\n🎮 Starting quiz with {self.total_questions} questions!")
-        print(f"📚 Category: {self.current_category}")
-        print(f"⚡ Difficulty: {self.current_difficulty.title()}")
+        print(f"\n🎮 Starting quiz with {self.session.total_questions} questions!")
+        print(f"📚 Category: {self.session.current_category}")
+        print(f"⚡ Difficulty: {self.session.current_difficulty.title()}")
         
         input("\nPress Enter to start...")
         
-        # Ask all questions
-        for i, question in enumerate(questions, 1):
-            self.ask_question(question, i, self.total_questions)
+        # Ask all questions; adaptive and review quizzes add each next
+        # question as the previous one is answered.
+        for i, question in enumerate(self.session.questions, 1):
+            self.ask_question(question, i, self.session.total_questions)
+        try:
+            self.flush_progress()
+        except OSError as e:
+            metrics.count_error("flush_progress", e)
+            print("\n❌ Could not save your progress.")
         
         # Show final results
         self.display_final_results()
@@ -448,9 +406,7 @@ class QuizGame:
                     play_again = input("\nWould you like to play again? (y/n): ").strip().lower()
                     if play_again in ['y', 'yes']:
                         # Reset scores for new game
-                        self.score = 0
-                        self.correct_answers = 0
-                        self.total_questions = 0
+                        self.session.reset()
                         break
                     elif play_again in ['n', 'no']:
                         return
@@ -464,7 +420,7 @@ class QuizGame:
                 self.show_how_to_play()
                 
             elif choice == "4":
-                print(f"\n👋 Thanks for playing, {self.user_name}! See you next time!")
+                print(f"\n👋 Thanks for playing, {self.session.user_name}! See you next time!")
                 break
                 
             else:
@@ -479,7 +435,11 @@ class QuizGame:
         print()
         print("📝 GAME RULES:")
         print("• Choose a category or select 'Random Mix' for variety")
-        print("• Pick your difficulty level (Easy, Medium, Hard, or Mixed)")
+        print("• Pick your difficulty level (Easy, Medium, Hard, Mixed, Adaptive or Review)")
+        print("• Adaptive mode picks each question to match your skill rating,")
+        print("  which rises and falls with your answers")
+        print("• Review mode brings back questions you missed or are about to")
+        print("  forget, spaced further apart each time you get them right")
         print("• Answer multiple-choice questions by typing A, B, C, or D")
         print("• Earn points based on difficulty:")
         print("  - Easy questions: 1 point each")
@@ -490,6 +450,8 @@ class QuizGame:
         print("• Your final score depends on correct answers and difficulty")
         print("• Accuracy percentage shows your performance")
         print("• High scores are saved automatically")
+        print("• Questions you have already answered are held back until you")
+        print("  have seen the rest of your selection")
         print()
         print("💡 TIPS:")
         print("• Read questions carefully")
@@ -499,15 +461,18 @@ class QuizGame:
     
     def run(self):
         """Main entry point for the quiz game."""
+        # Pick up edits made with question_manager.py between quizzes.
+        self.bank.start()
         try:
             self.display_welcome()
             self.main_menu()
         except KeyboardInterrupt:
-            print(f"\n\n👋 Thanks for playing, {self.user_name}! See you next time!")
+            print(f"\n\n👋 Thanks for playing, {self.session.user_name}! See you next time!")
         except Exception as e:
+            metrics.count_error("run", e)
             print(f"\n❌ An error occurred: {e}")
             print("Please restart the game.")
 
 if __name__ == "__main__":
-    game = QuizGame()
-    game.run()
\ No newline at end of file
+    # Profile startup too: loading the bank is part of what players wait for.
+    metrics.run_profiled(lambda: QuizGame().run())
\ No newline at end of file
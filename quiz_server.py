@@ -0,0 +1,221 @@
+"""Headless quiz server hosting many concurrent sessions on one event loop.
+
+Clients speak a line protocol over TCP: every message is one JSON object per
+line. A client sends::
+
+    {"op": "categories"}
+    {"op": "start", "name": "Ada", "category": "Science", "difficulty": "easy", "count": 10}
+    {"op": "start", ..., "seed": 42}
+    {"op": "answer", "choice": 2}
+
+and receives ``categories``, ``question``, ``result``, ``final`` or ``error``
+messages in return. The pause the terminal game takes after each answer is an
+``asyncio.sleep`` here, so a waiting session never blocks the others.
+The ``final`` message carries ``"saved": false`` if the score could not be
+written to the high scores.
+
+A ``seed`` makes a quiz reproducible, e.g. for replaying load tests: the
+same seed and bank always draw the same questions in the same order, since
+seeded quizzes ignore the player's answer history.
+
+The bank is reloaded in the background when ``questions.json`` or its
+journal changes; quizzes already running keep the questions they started
+with.
+
+Usage: python quiz_server.py [--host 127.0.0.1] [--port 8765] [--pause 2] [--reload-interval 2]
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, Optional
+
+import metrics
+from leaderboard import TIMESTAMP_FORMAT
+from question_store import question_id
+from quiz_game import QuizGame
+from quiz_session import QuizSession, grade_for
+
+DIFFICULTIES = ["easy", "medium", "hard", "mixed", "adaptive", "review"]
+
+
+class QuizServer:
+    """Serves quizzes from one shared question bank to many sessions."""
+
+    def __init__(self, game: Optional[QuizGame] = None, pause: float = 2.0, max_questions: int = 50):
+        # The game object only supplies the shared bank and score store; all
+        # per-player state lives in each connection's QuizSession.
+        self.game = game or QuizGame()
+        self.pause = pause
+        self.max_questions = max_questions
+        self.active_sessions = 0
+        self.completed_sessions = 0
+
+    async def send(self, writer: asyncio.StreamWriter, message: Dict):
+        writer.write(json.dumps(message).encode("utf-8") + b"\n")
+        await writer.drain()
+
+    def question_message(self, session: QuizSession) -> Dict:
+        question = session.current_question
+        return {
+            "type": "question",
+            "id": question_id(question),
+            "number": session.position + 1,
+            "total": session.total_questions,
+            "question": question["question"],
+            "options": question["options"],
+            "difficulty": question.get("difficulty"),
+        }
+
+    def start(self, session: QuizSession, request: Dict) -> Dict:
+        """Set up ``session`` for a new quiz and return the first message."""
+        category = request.get("category", "Random Mix")
+        difficulty = request.get("difficulty", "mixed")
+        if category != "Random Mix" and category not in self.game.store.categories():
+            return {"type": "error", "message": f"Unknown category: {category}"}
+        if difficulty not in DIFFICULTIES:
+            return {"type": "error", "message": f"Unknown difficulty: {difficulty}"}
+        try:
+            count = int(request.get("count", 10))
+        except (TypeError, ValueError):
+            return {"type": "error", "message": "count must be a number"}
+        if not 1 <= count <= self.max_questions:
+            return {"type": "error", "message": f"count must be between 1 and {self.max_questions}"}
+        seed = request.get("seed")
+        if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+            return {"type": "error", "message": "seed must be an integer"}
+
+        session.user_name = str(request.get("name") or "Player")
+        session.current_category = category
+        session.current_difficulty = difficulty
+        if seed is not None:
+            session.rng.seed(seed)
+        picker = self.game.get_picker(session.user_name, category, difficulty, session.rng)
+        if picker is not None:
+            session.start([], picker=picker, total=count)
+        else:
+            player = session.user_name if seed is None else None
+            session.start(self.game.get_questions_for_quiz(category, difficulty, count,
+                                                           player, session.rng))
+        if session.finished:
+            return {"type": "error", "message": "No questions available for this selection."}
+        return self.question_message(session)
+
+    async def finish(self, session: QuizSession) -> Dict:
+        """Record the finished game and return the final results message."""
+        grade, message = grade_for(session.accuracy)
+        record = session.score_record(time.strftime(TIMESTAMP_FORMAT))
+        # Score persistence does file I/O; keep it off the event loop.
+        loop = asyncio.get_running_loop()
+        saved = True
+        try:
+            await loop.run_in_executor(None, self.game.scores.add, record)
+        except OSError as e:
+            metrics.count_error("save_score", e)
+            saved = False
+        # Answers, ratings and reviews were kept in memory as the quiz went.
+        try:
+            await loop.run_in_executor(None, self.game.flush_progress)
+        except OSError as e:
+            metrics.count_error("flush_progress", e)
+        self.completed_sessions += 1
+        return {
+            "type": "final",
+            "score": session.score,
+            "correct": session.correct_answers,
+            "questions": session.total_questions,
+            "accuracy": session.accuracy,
+            "grade": grade,
+            "message": message,
+            "progress": session.picker.summary() if session.picker is not None else None,
+            "saved": saved,
+        }
+
+    async def answer(self, session: QuizSession, request: Dict, writer: asyncio.StreamWriter):
+        """Score an answer, pause without blocking, then send what comes next."""
+        if session.finished:
+            await self.send(writer, {"type": "error", "message": "No quiz in progress."})
+            return
+        choice = request.get("choice")
+        question = session.current_question
+        if not isinstance(choice, int) or not 0 <= choice < len(question["options"]):
+            await self.send(writer, {"type": "error", "message": "choice must be an option index"})
+            return
+
+        is_correct, points = session.answer(choice)
+        self.game.get_player_history().record(session.user_name, question, is_correct)
+        await self.send(writer, {
+            "type": "result",
+            "correct": is_correct,
+            "points": points,
+            "correct_option": question["correct"],
+            "explanation": question.get("explanation"),
+            "score": session.score,
+        })
+        if self.pause:
+            await asyncio.sleep(self.pause)
+        if session.finished:
+            await self.send(writer, await self.finish(session))
+        else:
+            await self.send(writer, self.question_message(session))
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Run one client connection until it disconnects."""
+        session = QuizSession()
+        self.active_sessions += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    op = request["op"]
+                except (ValueError, KeyError, TypeError):
+                    await self.send(writer, {"type": "error", "message": "Malformed request"})
+                    continue
+
+                if op == "categories":
+                    await self.send(writer, {"type": "categories",
+                                             "categories": self.game.store.categories(),
+                                             "difficulties": DIFFICULTIES})
+                elif op == "start":
+                    await self.send(writer, self.start(session, request))
+                elif op == "answer":
+                    await self.answer(session, request, writer)
+                else:
+                    await self.send(writer, {"type": "error", "message": f"Unknown op: {op}"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.active_sessions -= 1
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765):
+        self.game.bank.start()
+        server = await asyncio.start_server(self.handle, host, port, limit=2 ** 16, backlog=4096)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the headless quiz server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pause", type=float, default=2.0,
+                        help="seconds to wait after each answer before the next question")
+    parser.add_argument("--reload-interval", type=float, default=2.0,
+                        help="seconds between checks for bank edits (0 disables reloading)")
+    args = parser.parse_args()
+
+    server = QuizServer(pause=args.pause)
+    server.game.bank.interval = args.reload_interval
+    print(f"🎯 Quiz server listening on {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Quiz server stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import random
+from typing import Dict, List, Mapping, Optional, Tuple
+
+POINTS = {"easy": 1, "medium": 2, "hard": 3}
+
+# (minimum accuracy, grade, message), best first.
+GRADES = [
+    (90, "A+ 🌟", "Outstanding! You're a quiz master!"),
+    (80, "A 🎉", "Excellent work! You really know your stuff!"),
+    (70, "B+ 👍", "Great job! You're doing well!"),
+    (60, "B 👌", "Good effort! Keep practicing!"),
+    (50, "C+ 💪", "Not bad! There's room for improvement!"),
+    (0, "C 📚", "Keep studying and try again!"),
+]
+
+
+def get_points(difficulty: str) -> int:
+    """Get points based on difficulty level."""
+    return POINTS.get(difficulty, 2)
+
+
+def grade_for(accuracy: float) -> Tuple[str, str]:
+    """Return the ``(grade, message)`` pair for an accuracy percentage."""
+    for minimum, grade, message in GRADES:
+        if accuracy >= minimum:
+            return grade, message
+    return GRADES[-1][1], GRADES[-1][2]
+
+
+class QuizSession:
+    """State of one player's quiz, independent of how it is presented."""
+
+    def __init__(self, user_name: str = "Player", category: str = "", difficulty: str = "",
+                 seed: Optional[int] = None):
+        self.user_name = user_name
+        self.current_category = category
+        self.current_difficulty = difficulty
+        # Every random choice made for this session comes from here, so a
+        # seeded session draws the same quizzes every time.
+        self.rng = random.Random(seed)
+        self.questions: List[Mapping] = []
+        self.position = 0
+        # Optional source of questions chosen one at a time as the quiz goes
+        # (e.g. ``adaptive.AdaptiveQuiz``): ``next()`` and ``record()``.
+        self.picker = None
+        self.reset()
+
+    def reset(self):
+        """Clear the score for a new game, keeping the player and selection."""
+        self.score = 0
+        self.correct_answers = 0
+        self.total_questions = 0
+        self.questions = []
+        self.position = 0
+        self.picker = None
+
+    def start(self, questions: List[Mapping], picker=None, total: Optional[int] = None):
+        """Begin a new game over ``questions``.
+
+        With a ``picker``, ``questions`` grows by one question per answer up
+        to ``total`` questions, or until the picker runs out.
+        """
+        self.reset()
+        self.questions = questions
+        self.total_questions = len(questions)
+        if picker is not None:
+            self.picker = picker
+            self.total_questions = total or 0
+            self._pick_next()
+
+    def _pick_next(self):
+        """Append the picker's next question, or end the quiz if it has none."""
+        if len(self.questions) >= self.total_questions:
+            return
+        question = self.picker.next()
+        if question is None:
+            self.total_questions = len(self.questions)
+        else:
+            self.questions.append(question)
+
+    @property
+    def current_question(self) -> Optional[Mapping]:
+        """The next unanswered question, or ``None`` when the quiz is over."""
+        if self.position < len(self.questions):
+            return self.questions[self.position]
+        return None
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= len(self.questions)
+
+    @property
+    def accuracy(self) -> float:
+        """Percentage of questions answered correctly."""
+        if self.total_questions <= 0:
+            return 0
+        return (self.correct_answers / self.total_questions) * 100
+
+    def record_answer(self, question: Mapping, choice: int) -> Tuple[bool, int]:
+        """Score ``choice`` for ``question``; return ``(is_correct, points)``."""
+        is_correct = choice == question['correct']
+        points = 0
+        if is_correct:
+            points = get_points(question.get('difficulty', 'medium'))
+            self.score += points
+            self.correct_answers += 1
+        if self.picker is not None:
+            self.picker.record(question, is_correct)
+            self._pick_next()
+        return is_correct, points
+
+    def answer(self, choice: int) -> Tuple[bool, int]:
+        """Answer the current question and move on to the next one."""
+        question = self.current_question
+        if question is None:
+            raise IndexError("The quiz is already finished")
+        self.position += 1
+        return self.record_answer(question, choice)
+
+    def score_record(self, timestamp: str) -> Dict:
+        """Return the high-score entry for the finished game."""
+        return {
+            "name": self.user_name,
+            "score": self.score,
+            "accuracy": self.accuracy,
+            "category": self.current_category,
+            "difficulty": self.current_difficulty,
+            "questions": self.total_questions,
+            "correct": self.correct_answers,
+            "timestamp": timestamp,
+        }
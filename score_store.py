@@ -0,0 +1,180 @@
+import heapq
+import json
+import os
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from leaderboard import Entry, Leaderboard, entry
+from storage import atomic_write, file_lock, read_json_lines
+
+# Board key for the overall leaderboard across every category and difficulty.
+OVERALL = (None, None)
+
+
+class ScoreStore:
+    """Append-only score log with a persisted top-K index.
+
+    Every finished game is appended to ``log_path`` as one JSON line, so no
+    score is ever dropped. A min-heap of the best ``top_k`` scores is kept per
+    ``(category, difficulty)`` plus one overall board, making each update
+    O(log K). The heaps are checkpointed to ``index_path`` together with the
+    log offset they cover; on startup only the log written after that offset
+    is replayed.
+
+    Ranks and the daily and weekly boards come from a ``Leaderboard`` over
+    every game in the log, built the first time one is asked for.
+    """
+
+    def __init__(self, log_path: str = 'high_scores.log', index_path: str = 'high_scores.idx',
+                 top_k: int = 10, checkpoint_every: int = 50, legacy_path: str = 'high_scores.json'):
+        self.log_path = log_path
+        self.index_path = index_path
+        self.top_k = top_k
+        self.checkpoint_every = checkpoint_every
+        # Heaps of (score, -seq, record); on equal scores the newest entry is
+        # the smallest and is evicted first, matching the old stable sort.
+        self._boards: Dict[Tuple[Optional[str], Optional[str]], List] = {}
+        self._seq = 0
+        self._offset = 0
+        self._pending = 0
+        self._leaderboard: Optional[Leaderboard] = None
+        # Log offset of each game on the leaderboard, by seq - 1.
+        self._game_offsets = array('q')
+        self._board_offset = 0
+
+        if not os.path.exists(self.log_path) and os.path.exists(legacy_path):
+            self._import_legacy(legacy_path)
+        self._load_index()
+        self._replay()
+        if self._pending >= self.checkpoint_every:
+            self.checkpoint()
+
+    def _import_legacy(self, legacy_path: str):
+        """Seed the log from an old ``high_scores.json`` top-10 file."""
+        try:
+            with open(legacy_path, 'r') as f:
+                scores = json.load(f)
+        except (OSError, ValueError):
+            return
+        with file_lock(self.log_path):
+            # Another process may have migrated while we were reading.
+            if os.path.exists(self.log_path):
+                return
+            with open(self.log_path, 'a') as log:
+                for score_data in scores:
+                    log.write(json.dumps(score_data, separators=(',', ':')) + '\n')
+
+    def _load_index(self):
+        """Load the last checkpoint, discarding it if it no longer fits the log."""
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        log_size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        if index.get('top_k') != self.top_k or index.get('offset', 0) > log_size:
+            return
+
+        self._offset = index['offset']
+        self._seq = index['seq']
+        for board in index['boards']:
+            key = (board['category'], board['difficulty'])
+            heap = [(entry['score'], -entry['seq'], entry['record']) for entry in board['entries']]
+            heapq.heapify(heap)
+            self._boards[key] = heap
+
+    def _replay(self):
+        """Fold log lines written after the checkpoint into the boards."""
+        for _, end, record in read_json_lines(self.log_path, self._offset):
+            self._offset = end
+            self._index(record)
+            self._pending += 1
+
+    def _index(self, record: Dict):
+        """Offer one score record to its category board and the overall board."""
+        self._seq += 1
+        entry = (record.get('score', 0), -self._seq, record)
+        for key in dict.fromkeys((OVERALL, (record.get('category'), record.get('difficulty')))):
+            heap = self._boards.setdefault(key, [])
+            if len(heap) < self.top_k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+    def add(self, record: Dict):
+        """Append a finished game to the log and update the top-K boards.
+
+        The new line is indexed by replaying the log tail, which also picks up
+        scores appended by other processes since our last read.
+        """
+        with file_lock(self.log_path):
+            with open(self.log_path, 'a') as log:
+                log.write(json.dumps(record, separators=(',', ':')) + '\n')
+            self._replay()
+        if self._pending >= self.checkpoint_every:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Persist the boards and the log offset they cover."""
+        index = {
+            'top_k': self.top_k,
+            'offset': self._offset,
+            'seq': self._seq,
+            'boards': [
+                {
+                    'category': category,
+                    'difficulty': difficulty,
+                    'entries': [{'score': score, 'seq': -neg_seq, 'record': record}
+                                for score, neg_seq, record in heap],
+                }
+                for (category, difficulty), heap in self._boards.items()
+            ],
+        }
+        atomic_write(self.index_path, lambda f: json.dump(index, f, separators=(',', ':')))
+        self._pending = 0
+
+    def top(self, category: Optional[str] = None, difficulty: Optional[str] = None,
+            window: str = 'all') -> List[Dict]:
+        """Return the best scores for a board, highest first.
+
+        With no arguments this is the overall leaderboard. ``window`` is a
+        ``leaderboard.WINDOWS`` name; the all-time boards come from the
+        top-K heaps without reading the whole log.
+        """
+        if window != 'all':
+            games = self.leaderboard().top(self.top_k, category, difficulty, window)
+            return self.records(seq for _, seq in games)
+        heap = self._boards.get((category, difficulty), [])
+        return [record for _, _, record in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+
+    def _read_games(self) -> List[Entry]:
+        """Parse the games logged since the leaderboard last caught up."""
+        games = []
+        for offset, end, record in read_json_lines(self.log_path, self._board_offset):
+            self._board_offset = end
+            self._game_offsets.append(offset)
+            games.append(entry(len(self._game_offsets), record))
+        return games
+
+    def leaderboard(self) -> Leaderboard:
+        """Every logged game on ranked boards, including games other processes logged.
+
+        The first call reads the whole log; later calls read only what was
+        appended since.
+        """
+        if self._leaderboard is None:
+            self._leaderboard = Leaderboard(self._read_games())
+        else:
+            for game in self._read_games():
+                self._leaderboard.add(*game)
+        return self._leaderboard
+
+    def records(self, seqs: Iterable[int]) -> List[Dict]:
+        """Read back the records of games on the leaderboard."""
+        records = []
+        with open(self.log_path, 'rb') as log:
+            for seq in seqs:
+                log.seek(self._game_offsets[seq - 1])
+                records.append(json.loads(log.readline()))
+        return records
@@ -0,0 +1,167 @@
+"""Inverted-index search over question text, options and explanations.
+
+The index is kept next to the bank as ``questions.json.search`` and maps
+every word to the questions containing it. Query words match as prefixes
+("photo" finds "photosynthesis"), every word must match, and results can be
+limited to one category and/or difficulty.
+
+Single-question edits are appended to the index's own journal, like the
+bank's. Every entry names the bank version it applies to (``base``) and the
+version it produces (``source``); an entry whose base does not match marks
+the index stale, and a stale index is rebuilt from the bank on next use.
+"""
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from question_store import question_id
+from storage import JSONFileStore
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case words of ``text``."""
+    return _WORD.findall(str(text).lower())
+
+
+def question_tokens(question: Dict) -> set:
+    """Distinct words of a question's text, options and explanation."""
+    tokens = set(tokenize(question.get("question", "")))
+    for option in question.get("options", ()):
+        tokens.update(tokenize(option))
+    tokens.update(tokenize(question.get("explanation") or ""))
+    return tokens
+
+
+def add_op(category: str, difficulty: str, question: Dict, base, source) -> Dict:
+    return {"op": "add", "doc": [question_id(question), category, difficulty, question],
+            "base": base, "source": source}
+
+
+def delete_op(key: str, base, source) -> Dict:
+    return {"op": "delete", "key": key, "base": base, "source": source}
+
+
+def source_op(base, source) -> Dict:
+    """Move the index to a new bank version whose questions are unchanged."""
+    return {"op": "source", "base": base, "source": source}
+
+
+def _add_doc(data: Dict, doc: List):
+    position = len(data["docs"])
+    data["docs"].append(doc)
+    postings = data["postings"]
+    for token in question_tokens(doc[3]):
+        postings.setdefault(token, []).append(position)
+
+
+def replay_search(data: Optional[Dict], entries: Iterable[Dict]):
+    """Apply journal entries to the raw index data in place."""
+    if data is None:
+        for _ in entries:
+            pass
+        return
+    positions = None
+    for entry in entries:
+        if data["source"] is None or data["source"] != entry["base"]:
+            # An edit the index never saw; only a rebuild can recover.
+            data["source"] = None
+            continue
+        if entry["op"] == "add":
+            _add_doc(data, entry["doc"])
+            if positions is not None:
+                positions.setdefault(entry["doc"][0], len(data["docs"]) - 1)
+        elif entry["op"] == "delete":
+            if positions is None:
+                positions = {}
+                for position, doc in enumerate(data["docs"]):
+                    if doc is not None:
+                        positions.setdefault(doc[0], position)
+            position = positions.pop(entry["key"], None)
+            if position is not None:
+                data["docs"][position] = None
+        data["source"] = entry["source"]
+
+
+def build_data(questions: Dict, source) -> Dict:
+    """Index every question of a nested bank."""
+    data = {"source": source, "docs": [], "postings": {}}
+    for category, difficulties in questions.items():
+        for difficulty, items in difficulties.items():
+            for question in items:
+                _add_doc(data, [question_id(question), category, difficulty, question])
+    return data
+
+
+def open_search(bank_path: str) -> JSONFileStore:
+    """Return the store holding the search index of the bank at ``bank_path``."""
+    return JSONFileStore(f"{bank_path}.search", indent=None, replay=replay_search)
+
+
+class SearchIndex:
+    """Queryable view of the index data."""
+
+    def __init__(self, data: Dict):
+        self.data = data
+        self.docs: List[Optional[List]] = data["docs"]
+        self.postings: Dict[str, List[int]] = data["postings"]
+        self.tokens = sorted(self.postings)
+        self._positions: Dict[str, int] = {}
+        for position, doc in enumerate(self.docs):
+            if doc is not None:
+                self._positions.setdefault(doc[0], position)
+
+    @property
+    def source(self):
+        return self.data["source"]
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def apply(self, entry: Dict):
+        """Mirror a journal entry already written to disk."""
+        if entry["op"] == "add":
+            for token in question_tokens(entry["doc"][3]):
+                if token not in self.postings:
+                    self.tokens.insert(bisect_left(self.tokens, token), token)
+            _add_doc(self.data, entry["doc"])
+            self._positions.setdefault(entry["doc"][0], len(self.docs) - 1)
+        elif entry["op"] == "delete":
+            position = self._positions.pop(entry["key"], None)
+            if position is not None:
+                self.docs[position] = None
+        self.data["source"] = entry["source"]
+
+    def _matching(self, prefix: str) -> set:
+        """Positions of documents with a word starting with ``prefix``."""
+        found = set()
+        i = bisect_left(self.tokens, prefix)
+        while i < len(self.tokens) and self.tokens[i].startswith(prefix):
+            found.update(self.postings[self.tokens[i]])
+            i += 1
+        return found
+
+    def search(self, query: str, category: Optional[str] = None, difficulty: Optional[str] = None,
+               limit: int = 20) -> Tuple[int, List[Tuple[str, str, Dict]]]:
+        """Return the number of matches and up to ``limit`` ``(category, difficulty, question)``."""
+        terms = sorted(set(tokenize(query)), key=len, reverse=True)
+        if not terms:
+            return 0, []
+        matches = None
+        for term in terms:
+            found = self._matching(term)
+            matches = found if matches is None else matches & found
+            if not matches:
+                return 0, []
+
+        results = []
+        total = 0
+        for position in sorted(matches):
+            doc = self.docs[position]
+            if doc is None or (category and doc[1] != category) or (difficulty and doc[2] != difficulty):
+                continue
+            total += 1
+            if len(results) < limit:
+                results.append((doc[1], doc[2], doc[3]))
+        return total, results
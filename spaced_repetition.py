@@ -0,0 +1,359 @@
+"""Spaced-repetition review scheduling (SM-2).
+
+Every question a player has reviewed carries SM-2 state: an easiness factor,
+the current interval in days, the number of successful repetitions in a row
+and the time it is next due. Answering correctly stretches the interval by
+the easiness factor; a miss starts the item over at one day.
+
+State is kept per player in parallel ``array`` columns sorted by bank
+position (about 20 bytes per reviewed question, no per-item objects), and a
+binary heap of ``due << 32 | position`` integers in another array yields the
+next due question in O(log n); quizzes limited to a category draw from a
+heap over that category's position range. Reviewing an item pushes a fresh
+heap entry; the superseded one no longer matches the item's due time and is
+dropped when it reaches the top.
+
+Reviews are saved in ``reviews.json`` (players by name, questions by id)
+with an append-only journal.
+"""
+import itertools
+import random
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from question_store import QuestionStore
+from storage import JSONFileStore
+
+DEFAULT_REVIEWS_FILE = 'reviews.json'
+MINUTES_PER_DAY = 24 * 60
+INITIAL_EASINESS = 250  # easiness factor x 100
+MIN_EASINESS = 130
+MAX_INTERVAL = 36500  # days; keeps intervals within their 16-bit column
+# SM-2 answer quality (0-5) for a correct and a wrong quiz answer.
+QUALITY_CORRECT = 4
+QUALITY_WRONG = 1
+_POSITION_MASK = (1 << 32) - 1
+
+
+def now_minutes() -> int:
+    return int(time.time() // 60)
+
+
+def sm2(easiness: int, interval: int, repetitions: int, quality: int) -> Tuple[int, int, int]:
+    """Return the next ``(easiness x 100, interval in days, repetitions)``."""
+    if quality >= 3:
+        if repetitions == 0:
+            interval = 1
+        elif repetitions == 1:
+            interval = 6
+        else:
+            interval = min(MAX_INTERVAL, max(1, round(interval * easiness / 100)))
+        repetitions += 1
+    else:
+        repetitions = 0
+        interval = 1
+    miss = 5 - quality
+    easiness = max(MIN_EASINESS, easiness + round(100 * (0.1 - miss * (0.08 + miss * 0.02))))
+    return easiness, interval, repetitions
+
+
+class ArrayHeap:
+    """Min-heap of unsigned 64-bit integers stored in an ``array``."""
+
+    def __init__(self, values: Iterable[int] = ()):
+        self._heap = array("Q", sorted(values))
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def peek(self) -> int:
+        return self._heap[0]
+
+    def push(self, value: int):
+        heap = self._heap
+        heap.append(value)
+        i = len(heap) - 1
+        while i:
+            parent = (i - 1) >> 1
+            if heap[parent] <= value:
+                break
+            heap[i] = heap[parent]
+            i = parent
+        heap[i] = value
+
+    def pop(self) -> int:
+        heap = self._heap
+        last = heap.pop()
+        if not heap:
+            return last
+        top = heap[0]
+        size = len(heap)
+        i = 0
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if heap[child] >= last:
+                break
+            heap[i] = heap[child]
+            i = child
+        heap[i] = last
+        return top
+
+
+class ReviewDeck:
+    """One player's review state, in columns sorted by bank position.
+
+    Items reviewed for the first time are appended to the columns and found
+    through a small position -> slot dict; once that passes a fraction of
+    the deck the columns are re-sorted in one go, so adding an item costs
+    amortized O(log n) instead of a memmove of every column.
+    """
+
+    def __init__(self):
+        self.load(())
+
+    def load(self, items: Iterable[Tuple[int, int, int, int, int]]):
+        """Replace the deck with ``(position, easiness, interval, repetitions, due)`` items.
+
+        Sorting once keeps loading O(n log n), where inserting one item at a
+        time into the sorted columns would be quadratic.
+        """
+        items = sorted(items)
+        self.positions = array("i", [item[0] for item in items])
+        self.easiness = array("H", [item[1] for item in items])
+        self.intervals = array("H", [item[2] for item in items])
+        self.repetitions = array("H", [min(item[3], 0xFFFF) for item in items])
+        self.due = array("I", [item[4] for item in items])  # minutes since the epoch
+        self._sorted = len(items)  # columns before this slot are sorted by position
+        self._appended: Dict[int, int] = {}  # position -> slot of items added since
+        self.heap = ArrayHeap(due << 32 | position for position, _, _, _, due in items)
+        # (start, end) -> heap of the items in that position range, built on
+        # first use; the whole deck is (0, None).
+        self._heaps: Dict[Tuple[int, Optional[int]], ArrayHeap] = {(0, None): self.heap}
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def find(self, position: int) -> Optional[int]:
+        """Return the slot of ``position``, or None if it was never reviewed."""
+        slot = bisect_left(self.positions, position, 0, self._sorted)
+        if slot < self._sorted and self.positions[slot] == position:
+            return slot
+        return self._appended.get(position)
+
+    def _sort(self):
+        """Fold the appended items into the sorted columns."""
+        # The columns are a sorted run plus a short tail, which Timsort merges in O(n).
+        order = sorted(range(len(self.positions)), key=self.positions.__getitem__)
+        for name in ("positions", "easiness", "intervals", "repetitions", "due"):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, [column[slot] for slot in order]))
+        self._sorted = len(self.positions)
+        self._appended.clear()
+
+    def set(self, position: int, easiness: int, interval: int, repetitions: int, due: int):
+        """Store the state of one item and schedule it."""
+        slot = self.find(position)
+        if slot is None:
+            self._appended[position] = len(self.positions)
+            self.positions.append(position)
+            self.easiness.append(easiness)
+            self.intervals.append(interval)
+            self.repetitions.append(min(repetitions, 0xFFFF))
+            self.due.append(due)
+            if len(self._appended) > max(64, self._sorted // 8):
+                self._sort()
+        else:
+            self.easiness[slot] = easiness
+            self.intervals[slot] = interval
+            self.repetitions[slot] = min(repetitions, 0xFFFF)
+            self.due[slot] = due
+        entry = due << 32 | position
+        for (start, end), heap in self._heaps.items():
+            if start <= position and (end is None or position < end):
+                heap.push(entry)
+
+    def review(self, position: int, quality: int, now: int) -> Tuple[int, int, int, int]:
+        """Apply one answer; return the new ``(easiness, interval, repetitions, due)``."""
+        slot = self.find(position)
+        if slot is None:
+            state = (INITIAL_EASINESS, 0, 0)
+        else:
+            state = (self.easiness[slot], self.intervals[slot], self.repetitions[slot])
+        easiness, interval, repetitions = sm2(*state, quality)
+        due = now + interval * MINUTES_PER_DAY
+        self.set(position, easiness, interval, repetitions, due)
+        return easiness, interval, repetitions, due
+
+    def _live(self, entry: int) -> bool:
+        slot = self.find(entry & _POSITION_MASK)
+        return slot is not None and self.due[slot] == entry >> 32
+
+    def _range_heap(self, start: int, end: Optional[int]) -> ArrayHeap:
+        """The heap of items in ``[start, end)``, built from the columns on first use."""
+        heap = self._heaps.get((start, end))
+        if heap is None:
+            low = bisect_left(self.positions, start, 0, self._sorted)
+            high = self._sorted if end is None else bisect_left(self.positions, end, low, self._sorted)
+            slots = list(range(low, high))
+            slots.extend(slot for position, slot in self._appended.items()
+                         if start <= position and (end is None or position < end))
+            heap = self._heaps[(start, end)] = ArrayHeap(
+                self.due[slot] << 32 | self.positions[slot] for slot in slots)
+        return heap
+
+    def next_due(self, now: int, start: int = 0, end: Optional[int] = None,
+                 exclude=()) -> Optional[int]:
+        """Position of the most overdue item in ``[start, end)``, or None.
+
+        The item stays scheduled until it is reviewed. Each range (in
+        practice a category) gets its own heap, so due items elsewhere in
+        the deck are never popped; only items in ``exclude`` are set aside
+        and pushed back afterwards.
+        """
+        heap = self._range_heap(start, end)
+        held = []
+        found = None
+        while len(heap):
+            entry = heap.peek()
+            if entry >> 32 > now:
+                break
+            if not self._live(entry):
+                heap.pop()
+                continue
+            position = entry & _POSITION_MASK
+            if position not in exclude:
+                found = position
+                break
+            held.append(heap.pop())
+        for entry in held:
+            heap.push(entry)
+        return found
+
+    def due_count(self, now: int) -> int:
+        return sum(1 for due in self.due if due <= now)
+
+
+def replay_reviews(data: Dict, entries: Iterable[Dict]):
+    """Apply review entries; each one sets an item's full state."""
+    players = data.setdefault("players", {})
+    for entry in entries:
+        players.setdefault(entry["player"], {})[entry["question"]] = entry["state"]
+
+
+def open_reviews(path: str = DEFAULT_REVIEWS_FILE) -> JSONFileStore:
+    return JSONFileStore(path, indent=None, replay=replay_reviews)
+
+
+class SpacedRepetition:
+    """Review decks for every player over one question bank."""
+
+    def __init__(self, store: QuestionStore, path: Optional[str] = DEFAULT_REVIEWS_FILE):
+        self.store = store
+        self.reviews = open_reviews(path) if path else None
+        self.decks: Dict[str, ReviewDeck] = {}
+        self._pending: List[Dict] = []
+        self._pending_lock = threading.Lock()
+
+        if self.reviews is not None:
+            saved, _ = self.reviews.read(default={"players": {}})
+            for player, items in saved.get("players", {}).items():
+                positions = ((store.find(key), state) for key, state in items.items())
+                self.deck(player).load((position, *state) for position, state in positions
+                                       if position is not None)
+
+    def deck(self, player: str) -> ReviewDeck:
+        deck = self.decks.get(player)
+        if deck is None:
+            deck = self.decks[player] = ReviewDeck()
+        return deck
+
+    def record(self, player: str, position: int, correct: bool, now: Optional[int] = None):
+        """Schedule the next review of a question after an answer."""
+        now = now_minutes() if now is None else now
+        quality = QUALITY_CORRECT if correct else QUALITY_WRONG
+        state = self.deck(player).review(position, quality, now)
+        entry = {"player": player, "question": self.store.question_id(position),
+                 "state": list(state)}
+        with self._pending_lock:
+            self._pending.append(entry)
+
+    def flush(self):
+        """Journal the reviews recorded since the last flush."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if pending and self.reviews is not None:
+            _, journal_size = self.reviews.append_many(pending)
+            if journal_size >= 1 << 20:
+                self.reviews.compact(default={"players": {}})
+
+    def quiz(self, player: str, category: Optional[str] = None, rng=random) -> "ReviewQuiz":
+        return ReviewQuiz(self, player, category, rng)
+
+
+class ReviewQuiz:
+    """Hands out due questions first, then new ones, for a ``QuizSession`` picker."""
+
+    def __init__(self, scheduler: SpacedRepetition, player: str, category: Optional[str],
+                 rng=random, new_attempts: int = 64):
+        self.scheduler = scheduler
+        self.player = player
+        self.deck = scheduler.deck(player)
+        self.category = category
+        self.start, self.end = (scheduler.store.category_range(category) if category is not None
+                                else (0, len(scheduler.store)))
+        self.rng = rng
+        self.new_attempts = new_attempts
+        self.asked: set = set()
+        self.current: Optional[int] = None
+        self.due_reviews = 0
+        self.new_questions = 0
+
+    def _new_question(self) -> Optional[int]:
+        """A random question in range the player has never reviewed.
+
+        Random draws find one quickly while most of the range is unseen;
+        once ``new_attempts`` draws miss, the range is scanned from a random
+        start so a nearly reviewed range still yields its last questions.
+        """
+        if self.end <= self.start:
+            return None
+        for _ in range(self.new_attempts):
+            position = self.rng.randrange(self.start, self.end)
+            if position not in self.asked and self.deck.find(position) is None:
+                return position
+        offset = self.rng.randrange(self.start, self.end)
+        for position in itertools.chain(range(offset, self.end), range(self.start, offset)):
+            if position not in self.asked and self.deck.find(position) is None:
+                return position
+        return None
+
+    def next(self) -> Optional[Dict]:
+        # Without a category, draw from the deck's own heap rather than a copy of it.
+        end = self.end if self.category is not None else None
+        position = self.deck.next_due(now_minutes(), self.start, end, self.asked)
+        if position is not None:
+            self.due_reviews += 1
+        else:
+            position = self._new_question()
+            if position is None:
+                return None
+            self.new_questions += 1
+        self.current = position
+        self.asked.add(position)
+        return self.scheduler.store.quiz_question(position)
+
+    def record(self, question: Dict, correct: bool):
+        if self.current is not None:
+            self.scheduler.record(self.player, self.current, correct)
+
+    def summary(self) -> str:
+        still_due = self.deck.due_count(now_minutes())
+        return (f"Reviews: {self.due_reviews} due, {self.new_questions} new "
+                f"({still_due} still due, {len(self.deck)} questions in your deck)")
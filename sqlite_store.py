@@ -0,0 +1,466 @@
+"""SQLite storage for the question bank and the score history.
+
+One database file in WAL mode, so games keep reading while the question
+manager or a finishing game writes, holds:
+
+* ``questions`` - one row per question with its JSON in ``body``, indexed
+  by bucket ``(category, difficulty, pos)`` and by id within its bucket
+* ``buckets`` - category and difficulty order, empty buckets included
+* ``scores`` - one row per finished game, indexed by score overall and
+  per ``(category, difficulty)`` board
+* ``meta`` - the bank's write counter
+
+``SQLiteBank`` has the ``JSONFileStore`` interface of ``questions.json``,
+with each journal op (add, delete, update) applied as a single-row
+statement. ``SQLiteQuestionStore`` draws quizzes: opening it reads only
+ids and answer indexes, and the text of a question is fetched when it is
+drawn. ``SQLiteScores`` answers leaderboard queries with an index range
+scan of ``top_k`` rows.
+
+Select it with ``QUIZ_DB=quiz.db``. To convert the existing JSON files
+(this replaces the database's questions and scores):
+
+Usage: python sqlite_store.py [--db quiz.db] [--questions questions.json] [--scores high_scores.log]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from backends import default_questions
+from leaderboard import Leaderboard, entry
+from question_journal import DEFAULT_DIFFICULTIES, open_bank
+from question_store import QuestionRecord, QuestionStore, is_question_id, question_id
+from storage import VersionConflict, read_json_lines
+
+DEFAULT_DB_FILE = 'quiz.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS buckets (
+    category TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    ord INTEGER NOT NULL,
+    PRIMARY KEY (category, difficulty)
+);
+CREATE TABLE IF NOT EXISTS questions (
+    pos INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    correct INTEGER,
+    body TEXT NOT NULL,
+    UNIQUE (category, difficulty, id)
+);
+CREATE INDEX IF NOT EXISTS questions_bucket ON questions (category, difficulty, pos);
+CREATE INDEX IF NOT EXISTS questions_id ON questions (id);
+CREATE TABLE IF NOT EXISTS scores (
+    seq INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    category TEXT,
+    difficulty TEXT,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_overall ON scores (score DESC, seq);
+CREATE INDEX IF NOT EXISTS scores_board ON scores (category, difficulty, score DESC, seq);
+"""
+
+Version = Tuple[int, int]
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open ``path`` in WAL mode with the schema in place.
+
+    The connection is in autocommit mode; ``transaction`` opens explicit
+    transactions. It may be shared between threads if access is serialized.
+    """
+    db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=30)
+    db.execute("PRAGMA journal_mode=WAL")
+    # With WAL, NORMAL syncs at checkpoints only: a power cut may lose the
+    # last commits but never corrupts the database.
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(SCHEMA)
+    db.execute("INSERT OR IGNORE INTO meta VALUES ('created', ?)", (time.time_ns(),))
+    return db
+
+
+@contextmanager
+def transaction(db: sqlite3.Connection, write: bool = False) -> Iterator[sqlite3.Connection]:
+    """Run the block in one transaction; a write transaction takes the write lock up front."""
+    db.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+    try:
+        yield db
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    db.execute("COMMIT")
+
+
+def _row(category: str, difficulty: str, question: Mapping) -> Tuple:
+    correct = question.get("correct")
+    if not isinstance(correct, int) or isinstance(correct, bool):
+        correct = None
+    return (question_id(question), category, difficulty, correct,
+            json.dumps(question, separators=(",", ":"), ensure_ascii=False))
+
+
+class SQLiteBank:
+    """The question bank in SQLite, with the ``JSONFileStore`` interface of questions.json.
+
+    Versions are ``(database creation time, write counter)``; journal ops
+    touch only their own row.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_FILE):
+        self.path = path
+        self._db = connect(path)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _transaction(self, write: bool = False) -> Iterator[sqlite3.Connection]:
+        with self._lock, transaction(self._db, write) as db:
+            yield db
+
+    def _version(self, db: sqlite3.Connection) -> Optional[Version]:
+        rows = dict(db.execute("SELECT key, value FROM meta WHERE key IN ('created', 'version')"))
+        return (rows["created"], rows["version"]) if "version" in rows else None
+
+    def _bump(self, db: sqlite3.Connection) -> Version:
+        db.execute("INSERT INTO meta VALUES ('version', 1) "
+                   "ON CONFLICT (key) DO UPDATE SET value = value + 1")
+        return self._version(db)
+
+    def version(self) -> Optional[Version]:
+        """The current version, or None if the bank was never written."""
+        with self._transaction() as db:
+            return self._version(db)
+
+    def _load(self, db: sqlite3.Connection, default: Any) -> Tuple[Any, Optional[Version]]:
+        version = self._version(db)
+        if version is None:
+            return default, None
+        bank: Dict = {}
+        for category, difficulty in db.execute("SELECT category, difficulty FROM buckets ORDER BY ord"):
+            bank.setdefault(category, {})[difficulty] = []
+        for category, difficulty, body in db.execute(
+                "SELECT category, difficulty, body FROM questions ORDER BY pos"):
+            bank[category][difficulty].append(json.loads(body))
+        return bank, version
+
+    def _replace(self, db: sqlite3.Connection, data: Dict) -> Version:
+        db.execute("DELETE FROM questions")
+        db.execute("DELETE FROM buckets")
+        buckets = [(category, difficulty)
+                   for category, difficulties in data.items() for difficulty in difficulties]
+        db.executemany("INSERT INTO buckets VALUES (?, ?, ?)",
+                       [(category, difficulty, ord) for ord, (category, difficulty) in enumerate(buckets)])
+        try:
+            db.executemany("INSERT INTO questions (id, category, difficulty, correct, body) "
+                           "VALUES (?, ?, ?, ?, ?)",
+                           (_row(category, difficulty, question)
+                            for category, difficulty in buckets
+                            for question in data[category][difficulty]))
+        except sqlite3.IntegrityError as e:
+            raise ValueError(f"{self.path}: question ids must be unique within a "
+                             f"category and difficulty ({e})") from e
+        return self._bump(db)
+
+    def read(self, default: Any = None) -> Tuple[Any, Optional[Version]]:
+        """Return ``(bank, version)`` from one consistent snapshot; ``default`` if never written."""
+        with self._transaction() as db:
+            return self._load(db, default)
+
+    def write(self, data: Dict, expected_version: Optional[Version]) -> Version:
+        """Replace every question if the bank is still at ``expected_version``."""
+        with self._transaction(write=True) as db:
+            if self._version(db) != expected_version:
+                raise VersionConflict(f"{self.path} changed since it was read")
+            return self._replace(db, data)
+
+    def update(self, mutate: Callable[[Any], Any], default: Any = None):
+        """Apply ``mutate`` to the current bank in one write transaction."""
+        with self._transaction(write=True) as db:
+            data, _ = self._load(db, default)
+            data = mutate(data)
+            return data, self._replace(db, data)
+
+    def _bucket(self, db: sqlite3.Connection, category: str, difficulty: str):
+        db.execute("INSERT OR IGNORE INTO buckets "
+                   "SELECT ?, ?, COALESCE(MAX(ord), -1) + 1 FROM buckets", (category, difficulty))
+
+    def _apply(self, db: sqlite3.Connection, entry: Dict):
+        """Apply one ``question_journal`` op, with ``replay_journal``'s semantics."""
+        op = entry["op"]
+        category, difficulty = entry["category"], entry["difficulty"]
+        if op == "add":
+            if db.execute("SELECT 1 FROM buckets WHERE category = ? LIMIT 1", (category,)).fetchone() is None:
+                for level in DEFAULT_DIFFICULTIES:
+                    self._bucket(db, category, level)
+            self._bucket(db, category, difficulty)
+            row = _row(category, difficulty, entry["question"])
+            # Replaying an add whose id is already in the bucket is a no-op.
+            if db.execute("SELECT 1 FROM questions WHERE id = ? AND category = ? AND difficulty = ?",
+                          row[:3]).fetchone() is None:
+                db.execute("INSERT INTO questions (id, category, difficulty, correct, body) "
+                           "VALUES (?, ?, ?, ?, ?)", row)
+        elif op == "delete":
+            db.execute("DELETE FROM questions WHERE id = ? AND category = ? AND difficulty = ?",
+                       (entry["key"], category, difficulty))
+        elif op == "update":
+            key, _, _, correct, body = _row(category, difficulty, entry["question"])
+            db.execute("UPDATE questions SET id = ?, correct = ?, body = ? "
+                       "WHERE id = ? AND category = ? AND difficulty = ?",
+                       (key, correct, body, entry["key"], category, difficulty))
+        else:
+            raise ValueError(f"Unknown journal operation: {op}")
+
+    def append(self, entry: Dict) -> Tuple[Version, int]:
+        return self.append_many([entry])
+
+    def append_many(self, entries: List[Dict]) -> Tuple[Version, int]:
+        """Apply edit ops in one transaction.
+
+        Returns the new version and a journal size of 0: the ops are applied
+        in place, so there is never anything to ``compact``.
+        """
+        with self._transaction(write=True) as db:
+            for entry in entries:
+                self._apply(db, entry)
+            return self._bump(db), 0
+
+    def compact(self, default: Any = None):
+        return self.read(default)
+
+
+class SQLiteQuestionStore(QuestionStore):
+    """A ``QuestionStore`` over the questions table.
+
+    Opening reads each question's row number, id and answer index in bank
+    order; text is fetched one row at a time as questions are drawn. A
+    question deleted after the store was opened is skipped by ``sample``
+    until ``BankProvider`` swaps in a fresh store.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_FILE):
+        self.path = path
+        self._db = connect(path)
+        self._lock = threading.Lock()
+        self._rows = array("q")
+        self._ids = array("Q")
+        self._correct = array("b")
+        self._blobs = ()
+        self._extras: Dict[int, Dict] = {}
+
+        buckets = []
+        start = 0
+        with self._lock, transaction(self._db) as db:
+            order = db.execute("SELECT category, difficulty FROM buckets ORDER BY ord").fetchall()
+            for category, difficulty in order:
+                rows = db.execute("SELECT pos, id, correct FROM questions "
+                                  "WHERE category = ? AND difficulty = ? ORDER BY pos",
+                                  (category, difficulty))
+                for pos, key, correct in rows:
+                    index = len(self._rows)
+                    self._rows.append(pos)
+                    if is_question_id(key) and int(key, 16):
+                        self._ids.append(int(key, 16))
+                    else:
+                        self._ids.append(0)
+                        self._extras[index] = {"id": key}
+                    if correct is not None and -128 <= correct <= 127:
+                        self._correct.append(correct)
+                    else:
+                        self._correct.append(-1)
+                buckets.append((category, difficulty, start, len(self._rows)))
+                start = len(self._rows)
+        self._build_index(list(dict.fromkeys(category for category, _ in order)), buckets)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def question_dict(self, index: int) -> Optional[Dict]:
+        """The question at ``index`` as stored, or None if it has been deleted since."""
+        with self._lock:
+            row = self._db.execute("SELECT body FROM questions WHERE pos = ?",
+                                   (self._rows[index],)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def _question(self, index: int) -> Dict:
+        question = self.question_dict(index)
+        if question is None:
+            raise LookupError(f"Question {index} was deleted from {self.path}")
+        return question
+
+    def _fields(self, index: int) -> List[str]:
+        question = self._question(index)
+        return [question.get("question", ""), *question.get("options", ()),
+                question.get("explanation", "")]
+
+    def record(self, index: int) -> QuestionRecord:
+        question = self._question(index)
+        category, difficulty = self._bucket_at(index)
+        return QuestionRecord(question.get("question", ""), tuple(question.get("options", ())),
+                              question.get("correct"), question.get("explanation"),
+                              category, difficulty)
+
+    def answer_key(self, index: int) -> Tuple[int, str]:
+        correct = self._correct[index]
+        if correct == -1:
+            correct = self._question(index).get("correct")
+        return correct, self._bucket_at(index)[1]
+
+    def quiz_question(self, index: int) -> Optional[Mapping]:
+        question = self.question_dict(index)
+        if question is None:
+            return None
+        question["options"] = tuple(question.get("options", ()))
+        question["difficulty"] = self._bucket_at(index)[1]
+        return MappingProxyType(question)
+
+    def sample(self, *args, **kwargs) -> List[Mapping]:
+        return [question for question in super().sample(*args, **kwargs) if question is not None]
+
+
+class SQLiteScores:
+    """Finished games in SQLite, with ``ScoreStore``'s ``add``, ``top`` and ``leaderboard``."""
+
+    def __init__(self, path: str = DEFAULT_DB_FILE, top_k: int = 10):
+        self.path = path
+        self.top_k = top_k
+        self._db = connect(path)
+        self._lock = threading.Lock()
+        self._leaderboard: Optional[Leaderboard] = None
+        self._board_seq = 0
+
+    def add(self, record: Dict):
+        self.add_many([record])
+
+    def add_many(self, records: Iterable[Dict]):
+        rows = [(record.get('score', 0), record.get('category'), record.get('difficulty'),
+                 json.dumps(record, separators=(',', ':'), ensure_ascii=False))
+                for record in records]
+        with self._lock, transaction(self._db, write=True) as db:
+            db.executemany("INSERT INTO scores (score, category, difficulty, record) "
+                           "VALUES (?, ?, ?, ?)", rows)
+
+    def top(self, category: Optional[str] = None, difficulty: Optional[str] = None,
+            window: str = 'all') -> List[Dict]:
+        """Return the best scores for a board, highest first; older games win ties.
+
+        With no arguments this is the overall leaderboard. The all-time
+        boards are read from the score indexes.
+        """
+        if window != 'all':
+            games = self.leaderboard().top(self.top_k, category, difficulty, window)
+            return self.records(seq for _, seq in games)
+        if category is None and difficulty is None:
+            query, params = "SELECT record FROM scores ORDER BY score DESC, seq LIMIT ?", ()
+        else:
+            query = ("SELECT record FROM scores WHERE category = ? AND difficulty = ? "
+                     "ORDER BY score DESC, seq LIMIT ?")
+            params = (category, difficulty)
+        with self._lock:
+            rows = self._db.execute(query, (*params, self.top_k)).fetchall()
+        return [json.loads(record) for record, in rows]
+
+    def leaderboard(self) -> Leaderboard:
+        """Every game on ranked boards; later calls add only rows inserted since."""
+        with self._lock:
+            rows = self._db.execute("SELECT seq, record FROM scores WHERE seq > ? ORDER BY seq",
+                                    (self._board_seq,)).fetchall()
+        games = [entry(seq, json.loads(record)) for seq, record in rows]
+        if games:
+            self._board_seq = games[-1][0]
+        if self._leaderboard is None:
+            self._leaderboard = Leaderboard(games)
+        else:
+            for game in games:
+                self._leaderboard.add(*game)
+        return self._leaderboard
+
+    def records(self, seqs: Iterable[int]) -> List[Dict]:
+        """The records of games on the leaderboard, in the order given."""
+        seqs = list(seqs)
+        if not seqs:
+            return []
+        with self._lock:
+            rows = dict(self._db.execute(
+                f"SELECT seq, record FROM scores WHERE seq IN ({','.join('?' * len(seqs))})", seqs))
+        return [json.loads(rows[seq]) for seq in seqs]
+
+
+class SQLiteBackend:
+    """The storage backend for ``QUIZ_DB`` (see ``backends``)."""
+
+    compiled_path = None
+
+    def __init__(self, path: str = DEFAULT_DB_FILE):
+        self.path = path
+        self.bank = SQLiteBank(path)
+
+    def signature(self) -> Optional[Version]:
+        return self.bank.version()
+
+    def load_questions(self) -> Dict:
+        questions, _ = self.bank.read(default=None)
+        return default_questions() if questions is None else questions
+
+    def load_store(self) -> QuestionStore:
+        if self.bank.version() is None:
+            return QuestionStore(default_questions())
+        return SQLiteQuestionStore(self.path)
+
+    def open_scores(self) -> SQLiteScores:
+        return SQLiteScores(self.path)
+
+
+def read_score_log(log_path: str, legacy_path: str) -> List[Dict]:
+    """Every game in the JSON-lines score log, or the old top-10 file if there is no log."""
+    if not os.path.exists(log_path):
+        if not os.path.exists(legacy_path):
+            return []
+        with open(legacy_path, 'r') as f:
+            return json.load(f)
+    return [record for _, _, record in read_json_lines(log_path)]
+
+
+def migrate(db_path: str = DEFAULT_DB_FILE, questions_path: str = 'questions.json',
+            scores_path: str = 'high_scores.log',
+            legacy_scores_path: str = 'high_scores.json') -> Tuple[int, int]:
+    """Replace the database's questions and scores with the JSON files' contents.
+
+    Returns the number of questions and scores in the database afterwards.
+    """
+    questions, _ = open_bank(questions_path).read(default=None)
+    if questions is not None:
+        bank = SQLiteBank(db_path)
+        bank.write(questions, bank.version())
+    records = read_score_log(scores_path, legacy_scores_path)
+    scores = SQLiteScores(db_path)
+    with scores._lock, transaction(scores._db, write=True) as db:
+        db.execute("DELETE FROM scores")
+    scores.add_many(records)
+    with scores._lock, transaction(scores._db) as db:
+        return (db.execute("SELECT COUNT(*) FROM questions").fetchone()[0],
+                db.execute("SELECT COUNT(*) FROM scores").fetchone()[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy the JSON question bank and scores into SQLite.")
+    parser.add_argument("--db", default=DEFAULT_DB_FILE)
+    parser.add_argument("--questions", default="questions.json")
+    parser.add_argument("--scores", default="high_scores.log")
+    args = parser.parse_args()
+    questions, scores = migrate(args.db, args.questions, args.scores)
+    print(f"✅ Migrated {questions} questions and {scores} scores into {args.db}")
+    print(f"   Run with QUIZ_DB={args.db} to use it.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Process-safe JSON file storage.
+
+Several game processes and an admin running ``question_manager.py`` may share
+one directory. Every file written here is guarded by an advisory lock on a
+sidecar ``<file>.lock`` and replaced atomically, so readers never see a
+half-written file. The lock file also carries a write counter that, with the
+data file's size and mtime, forms the version used for optimistic checks.
+"""
+import json
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class VersionConflict(Exception):
+    """Raised when a file changed on disk since the caller last read it."""
+
+
+@contextmanager
+def file_lock(path: str, shared: bool = False):
+    """Hold an advisory lock on ``path`` for the duration of the block.
+
+    Shared locks let readers proceed together; writers take an exclusive
+    lock. Windows has no shared mode, so every lock is exclusive there.
+    """
+    fd = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        yield fd
+    finally:
+        if fcntl is None:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        os.close(fd)
+
+
+def _read_counter(fd: int) -> int:
+    os.lseek(fd, 0, os.SEEK_SET)
+    data = os.read(fd, 32)
+    try:
+        return int(data.strip() or 0)
+    except ValueError:
+        return 0
+
+
+def _bump_counter(fd: int) -> int:
+    counter = _read_counter(fd) + 1
+    os.lseek(fd, 0, os.SEEK_SET)
+    os.ftruncate(fd, 0)
+    os.write(fd, str(counter).encode("ascii"))
+    return counter
+
+
+def read_json_lines(path: str, offset: int = 0) -> Iterator[Tuple[int, int, Any]]:
+    """Yield ``(offset, end, record)`` for each complete JSON line from ``offset`` on.
+
+    ``end`` is where the next line starts, the offset to resume from. A
+    final line without its newline is a write still in progress and ends
+    the read; lines that are not valid JSON are skipped.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            start, offset = offset, offset + len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            yield start, offset, record
+
+
+def atomic_write(path: str, write: Callable, mode: str = "w"):
+    """Write ``path`` through a temporary file and ``os.replace`` it into place.
+
+    ``write`` is called with the open temporary file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", dir=directory)
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file owner-only; keep the target's permissions.
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class JSONFileStore:
+    """A JSON document on disk with locked, atomic, version-checked writes.
+
+    If ``replay`` is given the document also gets an append-only journal,
+    ``<file>.journal``: small edits are appended there as JSON lines with
+    ``append`` instead of rewriting the document, and every read applies
+    them with ``replay(data, entries)``, ``entries`` being an iterator over
+    the journal in order. Any full write folds the journal back into the
+    document and removes it.
+    """
+
+    def __init__(self, path: str, indent: Optional[int] = 2,
+                 replay: Optional[Callable[[Any, Iterator[Dict]], None]] = None):
+        self.path = path
+        self.indent = indent
+        self.replay = replay
+        self.journal_path = f"{path}.journal"
+
+    def _version(self, fd: int) -> Optional[Tuple[int, int, int]]:
+        try:
+            info = os.stat(self.path)
+        except FileNotFoundError:
+            if self.replay is not None and os.path.exists(self.journal_path):
+                return (_read_counter(fd), 0, -1)
+            return None
+        return (_read_counter(fd), info.st_mtime_ns, info.st_size)
+
+    def _load(self, fd: int, default: Any) -> Tuple[Any, Optional[Tuple[int, int, int]]]:
+        """Read the document and replay its journal; the lock must be held."""
+        version = self._version(fd)
+        data = default
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        if self.replay is not None and os.path.exists(self.journal_path):
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                # A line without its newline is an append cut short.
+                self.replay(data, (json.loads(line) for line in f if line.endswith("\n")))
+        return data, version
+
+    def read(self, default: Any = None) -> Tuple[Any, Optional[Tuple[int, int, int]]]:
+        """Return ``(data, version)``; ``default`` if the file does not exist.
+
+        Parse errors propagate so a damaged file is never mistaken for an
+        empty one.
+        """
+        with file_lock(self.path, shared=True) as fd:
+            return self._load(fd, default)
+
+    def read_with(self, probe: Callable[[], Any],
+                  default: Any = None) -> Tuple[Any, Optional[Tuple[int, int, int]], Any]:
+        """Like ``read``, but call ``probe`` first under the same shared lock.
+
+        Returns ``(data, version, probed)``. Lets callers stat or hash the
+        files consistently with the data they describe.
+        """
+        with file_lock(self.path, shared=True) as fd:
+            probed = probe()
+            data, version = self._load(fd, default)
+            return data, version, probed
+
+    def _dump(self, data: Any, fd: int):
+        atomic_write(self.path, lambda f: json.dump(data, f, indent=self.indent))
+        # The journal is folded into ``data`` now. Should we crash before it
+        # is removed, replaying it again must be harmless, which is why
+        # journal entries are expected to be idempotent.
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        _bump_counter(fd)
+        return self._version(fd)
+
+    def write(self, data: Any, expected_version: Optional[Tuple[int, int, int]]):
+        """Replace the file with ``data`` if it is still at ``expected_version``.
+
+        Returns the new version; raises ``VersionConflict`` if another writer
+        got there first.
+        """
+        with file_lock(self.path) as fd:
+            if self._version(fd) != expected_version:
+                raise VersionConflict(f"{self.path} changed on disk since it was read")
+            return self._dump(data, fd)
+
+    def update(self, mutate: Callable[[Any], Any], default: Any = None):
+        """Apply ``mutate`` to the current contents under an exclusive lock.
+
+        ``mutate`` receives the freshly read data and returns the data to
+        store. Returns ``(data, version)`` as written.
+        """
+        with file_lock(self.path) as fd:
+            data, _ = self._load(fd, default)
+            data = mutate(data)
+            return data, self._dump(data, fd)
+
+    def append(self, entry: Dict) -> Tuple[Optional[Tuple[int, int, int]], int]:
+        """Append one journal entry; O(1) I/O regardless of document size.
+
+        Returns the new version and the journal's size in bytes, so callers
+        can decide when to ``compact``.
+        """
+        return self.append_many([entry])
+
+    def append_many(self, entries: List[Dict]) -> Tuple[Optional[Tuple[int, int, int]], int]:
+        """Append several journal entries with a single write and fsync."""
+        if self.replay is None:
+            raise ValueError(f"{self.path} has no journal")
+        lines = "".join(json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n"
+                        for entry in entries)
+        with file_lock(self.path) as fd:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+                size = f.tell()
+            _bump_counter(fd)
+            return self._version(fd), size
+
+    def compact(self, default: Any = None):
+        """Fold the journal into the document; returns ``(data, version)``."""
+        return self.update(lambda data: data, default=default)